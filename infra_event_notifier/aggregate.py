@@ -0,0 +1,309 @@
+import fcntl
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from infra_event_notifier.backends import datadog
+from infra_event_notifier.backends.state import private_dir, runtime_path
+
+RUN_ID_ENV = "INFRA_EVENT_NOTIFIER_RUN_ID"
+
+# How long a run has to be quiet before its events are summarized, and how
+# long at most events wait while slices keep finishing.
+DEFAULT_WINDOW = 30.0
+MAX_WINDOWS = 10
+
+# One buffered slice: the event that would have been sent for it, plus the
+# fields the summary is built from ("region", "slice", "root", "user",
+# "cli_args").
+SliceRecord = Dict[str, Any]
+
+
+def default_run_id() -> str:
+    """
+    Identifies the terragrunt run a hook belongs to:
+    $INFRA_EVENT_NOTIFIER_RUN_ID if set, otherwise a UUID derived from the
+    parent process. Under `run-all` that is the one terragrunt process that
+    runs every slice. The UUID covers when the parent started, so a later
+    run whose terragrunt gets the same PID gets another one.
+    """
+    run_id = os.environ.get(RUN_ID_ENV)
+    if run_id:
+        return run_id
+    ppid = os.getppid()
+    return str(
+        uuid.uuid5(
+            uuid.NAMESPACE_OID, f"{_boot_id()}:{ppid}:{_start_time(ppid)}"
+        )
+    )
+
+
+def _boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as file:
+            return file.read().strip()
+    except OSError:
+        return ""
+
+
+def _start_time(pid: int) -> str:
+    """
+    When the process started, in some format that stays the same for its
+    lifetime, or "" if that cannot be found out.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            # The command name may contain spaces, but not ")"; the start
+            # time is the 20th field after it.
+            return file.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        pass
+    # No /proc, e.g. on macOS.
+    import subprocess
+
+    try:
+        return subprocess.run(
+            ["ps", "-o", "lstart=", "-p", str(pid)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def default_buffer_dir() -> str:
+    return runtime_path("runs")
+
+
+class RunBuffer:
+    """
+    Directory of slice events buffered for one terragrunt run.
+
+    Every hook invocation adds one file. Whichever invocation holds the
+    run's lock is the flusher: it waits for the run to go quiet, then sends
+    the summaries and removes the files it summarized. What it prints, e.g.
+    because a summary could not be sent, goes to `log_path`.
+
+    `directory` is created if needed and must be private to the current
+    user (see backends.state.private_dir()).
+
+    Args:
+        directory (str): Directory holding the buffers of all runs
+        run_id (str): Run the buffered events belong to
+    """
+
+    def __init__(self, directory: str, run_id: str) -> None:
+        safe_id = "".join(
+            c if c.isalnum() or c in "-_." else "_" for c in run_id
+        )
+        self.run_id = run_id
+        self.directory = directory
+        self.path = os.path.join(directory, safe_id)
+        self.log_path = f"{self.path}.log"
+        self._lock_fd = -1
+
+    def add(self, record: SliceRecord) -> None:
+        self._make_dirs()
+        name = f"{time.time_ns()}-{os.getpid()}.json"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(record, file)
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def read(self) -> Tuple[List[str], List[SliceRecord]]:
+        """
+        Returns the names and contents of the buffered events, oldest first.
+        """
+        names = []
+        records = []
+        for name in sorted(self._names()):
+            try:
+                with open(os.path.join(self.path, name)) as file:
+                    records.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+            names.append(name)
+        return names, records
+
+    def remove(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                os.unlink(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+    def last_added(self) -> float | None:
+        """
+        Time the newest buffered event was added, or None if there is none.
+        """
+        times = []
+        for name in self._names():
+            try:
+                times.append(os.stat(os.path.join(self.path, name)).st_mtime)
+            except FileNotFoundError:
+                continue
+        return max(times, default=None)
+
+    def try_lock(self) -> bool:
+        """
+        Becomes the run's flusher unless another process already is.
+        """
+        self._make_dirs()
+        fd = os.open(
+            f"{self.path}.lock",
+            os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC,
+            0o600,
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def unlock(self) -> None:
+        if self._lock_fd >= 0:
+            os.close(self._lock_fd)
+            self._lock_fd = -1
+
+    def _make_dirs(self) -> None:
+        private_dir(self.directory)
+        # Nobody else can write to the directory, so the run's own one
+        # needs no checks.
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+
+    def _names(self) -> List[str]:
+        try:
+            entries = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return [name for name in entries if name.endswith(".json")]
+
+
+def summarize(records: List[SliceRecord], run_id: str) -> List[Dict[str, Any]]:
+    """
+    Builds one Datadog event per region (and terragrunt root, command and
+    user) from the buffered slice events, listing the slices it covers.
+    Returns keyword arguments for backends.datadog.send_event(), without
+    the API key.
+    """
+    groups: Dict[Tuple[str, str, str, str], List[SliceRecord]] = {}
+    for record in records:
+        key = (
+            record["region"],
+            record["root"],
+            record["cli_args"],
+            record["user"],
+        )
+        groups.setdefault(key, []).append(record)
+
+    summaries = []
+    for (region, root, cli_args, user), group in groups.items():
+        slices = sorted({record["slice"] for record in group})
+        tags = dict(group[0]["event"]["tags"])
+        tags.pop("terragrunt_slice", None)
+        tags["terragrunt_run_id"] = run_id
+        tags["terragrunt_slice_count"] = str(len(slices))
+        slice_list = "\n".join(f"* {name}" for name in slices)
+        summaries.append(
+            {
+                "title": (
+                    f"terragrunt: Ran '{cli_args}' for {len(slices)} slices "
+                    f"in region '{region}'"
+                ),
+                "text": datadog.markdown_text(
+                    f"User **{user}** ran terragrunt '{cli_args}' under "
+                    f"{root} for:\n\n{slice_list}"
+                ),
+                "tags": tags,
+                "alert_type": "info",
+            }
+        )
+    return summaries
+
+
+def flush_run(
+    buffer: RunBuffer,
+    send: Callable[[Dict[str, Any]], None],
+    window: float = DEFAULT_WINDOW,
+    per_slice: bool = False,
+) -> None:
+    """
+    Run by the process holding the buffer's lock. Waits until no event was
+    added for `window` seconds (or `MAX_WINDOWS` windows have passed), then
+    calls send() with each summary event, and with every slice's own event
+    if `per_slice` is set.
+
+    Hooks that add an event while this is running do not take over, so
+    after releasing the lock the buffer is checked once more and flushed
+    again if anything is left.
+    """
+    while True:
+        started = time.time()
+        while True:
+            last_added = buffer.last_added()
+            now = time.time()
+            if last_added is None or now - last_added >= window:
+                break
+            if now - started >= window * MAX_WINDOWS:
+                break
+            time.sleep(max(0.0, last_added + window - now))
+
+        names, records = buffer.read()
+        events = summarize(records, buffer.run_id)
+        if per_slice:
+            events += [record["event"] for record in records]
+        for event in events:
+            send(event)
+        buffer.remove(names)
+        buffer.unlock()
+        if not buffer.read()[0] or not buffer.try_lock():
+            return
+
+
+def run_detached(fn: Callable[[], None], log_path: str) -> None:
+    """
+    Runs fn in a daemonized grandchild process and returns at once, so that
+    the hook does not wait for the aggregation window. The grandchild's
+    stdio is detached, so terragrunt does not wait on it either: what it
+    prints, and the traceback if fn raises, is appended to `log_path`
+    instead, which is removed again if nothing was.
+    """
+    # Or the grandchild would print what is still buffered a second time.
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        return
+    try:
+        os.setsid()
+        if os.fork():
+            os._exit(0)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        log = os.open(
+            log_path,
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_NOFOLLOW,
+            0o600,
+        )
+        os.dup2(devnull, 0)
+        os.dup2(log, 1)
+        os.dup2(log, 2)
+        # In case sys.stdout and sys.stderr were replaced and no longer
+        # write to file descriptors 1 and 2.
+        sys.stdout = sys.stderr = os.fdopen(log, "w", buffering=1)
+        try:
+            fn()
+        except BaseException:
+            traceback.print_exc()
+        sys.stdout.flush()
+        if os.fstat(log).st_size == 0:
+            os.unlink(log_path)
+    finally:
+        os._exit(0)
@@ -0,0 +1,298 @@
+import asyncio
+import http.client
+import io
+import ssl
+import time
+import weakref
+from email.message import Message
+from typing import Dict, List, Protocol, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+from infra_event_notifier.backends import metrics, timeouts
+from infra_event_notifier.backends.transport import (
+    _IDEMPOTENT_METHODS,
+    PoolKey,
+    Response,
+    _urllib_urlopen,
+    _uses_proxy,
+)
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+IdleConnections = Dict[PoolKey, List[Connection]]
+
+# Same idea as in transport: these mean an idle connection was closed by the
+# server. Only a request that never got to the server, or one that is safe
+# to repeat, is sent again.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+    asyncio.IncompleteReadError,
+)
+
+_MAX_LINE = 65536
+
+
+class AsyncConnectionPool:
+    """
+    asyncio counterpart of transport.ConnectionPool.
+
+    Speaks HTTP/1.1 over asyncio streams and keeps idle keep-alive
+    connections per (scheme, host, port). Any number of requests can be in
+    flight at once; each one uses its own connection. Streams belong to the
+    event loop that opened them, so idle connections are kept per loop.
+
+    Args:
+        maxsize (int, optional): Idle connections kept per host. Defaults
+            to 4.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self._idle: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, IdleConnections
+        ] = weakref.WeakKeyDictionary()
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def _idle_for_loop(self) -> IdleConnections:
+        loop = asyncio.get_running_loop()
+        return self._idle.setdefault(loop, {})
+
+    async def _new_connection(self, key: PoolKey) -> Connection:
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return await asyncio.open_connection(
+                host, port, ssl=self._ssl_context, limit=_MAX_LINE
+            )
+        return await asyncio.open_connection(host, port, limit=_MAX_LINE)
+
+    async def _acquire(self, key: PoolKey) -> Tuple[Connection, bool]:
+        idle = self._idle_for_loop().get(key)
+        while idle:
+            conn = idle.pop()
+            reader, writer = conn
+            # A server that timed the connection out has hung up by now;
+            # catch that here rather than after sending the request.
+            if not writer.is_closing() and not reader.at_eof():
+                return conn, True
+            writer.close()
+        return await self._new_connection(key), False
+
+    def _release(self, key: PoolKey, conn: Connection) -> None:
+        idle = self._idle_for_loop().setdefault(key, [])
+        if len(idle) < self.maxsize:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    async def clear(self) -> None:
+        """
+        Closes all idle connections opened by the running event loop.
+        """
+        idle = self._idle_for_loop()
+        conns = [conn for conns in idle.values() for conn in conns]
+        idle.clear()
+        for _, writer in conns:
+            writer.close()
+        for _, writer in conns:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def urlopen(self, req: Request) -> Response:
+        """
+        Sends the request over a pooled connection and returns the response.
+
+        Like urllib.request.urlopen(), raises HTTPError for 4xx/5xx statuses.
+        Requests that go through a proxy are handed to urllib in a worker
+        thread.
+
+        Connecting and waiting for the response are bounded by the timeouts
+        of the send in progress (see timeouts.Timeouts). Unlike in the
+        blocking transport, the read timeout bounds the whole exchange
+        rather than each wait on the socket. Timed calls (see
+        metrics.measure()) get the time spent connecting, which includes
+        resolving the host and the TLS handshake, and the time until the
+        response was read, as "server".
+        """
+        parts = urlsplit(req.full_url)
+        if parts.scheme not in ("http", "https") or _uses_proxy(req):
+            read_timeout = timeouts.request_timeouts()[1]
+            return await asyncio.to_thread(_urllib_urlopen, req, read_timeout)
+
+        default_port = 443 if parts.scheme == "https" else 80
+        key: PoolKey = (
+            parts.scheme,
+            parts.hostname or "",
+            parts.port or default_port,
+        )
+        data = req.data
+        assert data is None or isinstance(data, bytes), "body must be bytes"
+        head = _request_head(req, data)
+        method = req.get_method()
+        timing = metrics.current()
+
+        while True:
+            connect_timeout, read_timeout = timeouts.request_timeouts()
+            started = time.perf_counter()
+            try:
+                conn, reused = await asyncio.wait_for(
+                    self._acquire(key), connect_timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out connecting to {req.host}")
+            reader, writer = conn
+            connected = time.perf_counter()
+            if timing is not None and not reused:
+                timing.add("connect", connected - started)
+            sent = False
+
+            async def exchange() -> Tuple[int, str, Message, bytes, bool]:
+                nonlocal sent
+                writer.write(head)
+                if data is not None:
+                    writer.write(data)
+                await writer.drain()
+                sent = True
+                return await _read_response(reader, method)
+
+            try:
+                status, reason, headers, body, will_close = (
+                    await asyncio.wait_for(exchange(), read_timeout)
+                )
+            except _STALE_CONNECTION_ERRORS:
+                writer.close()
+                if reused and (not sent or method in _IDEMPOTENT_METHODS):
+                    continue
+                raise
+            except asyncio.TimeoutError:
+                writer.close()
+                raise TimeoutError(f"Timed out waiting for {req.host}")
+            except BaseException:
+                writer.close()
+                raise
+            break
+
+        if timing is not None:
+            timing.add("server", time.perf_counter() - connected)
+        if will_close:
+            writer.close()
+        else:
+            self._release(key, conn)
+
+        response = Response(req.full_url, status, reason, headers, body)
+        if status >= 400:
+            raise HTTPError(
+                url=req.full_url,
+                code=status,
+                msg=reason,
+                hdrs=headers,
+                fp=io.BytesIO(body),
+            )
+        return response
+
+
+def _request_head(req: Request, data: bytes | None) -> bytes:
+    headers = dict(req.header_items())
+    headers.setdefault("Host", req.host)
+    if data is not None:
+        headers.setdefault("Content-Length", str(len(data)))
+    lines = [f"{req.get_method()} {req.selector} HTTP/1.1"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, method: str
+) -> Tuple[int, str, Message, bytes, bool]:
+    """
+    Reads one HTTP/1.1 response. Returns status, reason, headers, body and
+    whether the server will close the connection afterwards.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise http.client.RemoteDisconnected(
+            "Remote end closed connection without response"
+        )
+    try:
+        version, status_text, *rest = status_line.decode("latin-1").split(
+            None, 2
+        )
+        status = int(status_text)
+    except ValueError:
+        raise http.client.BadStatusLine(status_line.decode("latin-1"))
+    reason = rest[0].strip() if rest else ""
+
+    header_lines = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        header_lines.append(line)
+    headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines)))
+
+    connection = headers.get("Connection", "").lower()
+    will_close = connection == "close" or (
+        version == "HTTP/1.0" and connection != "keep-alive"
+    )
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        return status, reason, headers, b"", will_close
+
+    if headers.get("Transfer-Encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # Skip trailers up to the terminating blank line.
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "Content-Length" in headers:
+        body = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        body = await reader.read()
+        will_close = True
+
+    return status, reason, headers, body, will_close
+
+
+class AsyncTransport(Protocol):
+    """
+    Counterpart of transport.Transport for the async backends.
+    """
+
+    async def urlopen(self, req: Request) -> Response: ...
+
+
+# Shared by every async backend call, so all sends made from the same event
+# loop reuse the same connections.
+_POOL = AsyncConnectionPool()
+_TRANSPORT: AsyncTransport = _POOL
+
+
+def set_transport(transport: AsyncTransport | None) -> AsyncTransport:
+    """
+    Same as transport.set_transport(), for the async backends.
+    """
+    global _TRANSPORT
+    previous = _TRANSPORT
+    _TRANSPORT = _POOL if transport is None else transport
+    return previous
+
+
+async def urlopen(req: Request) -> Response:
+    """
+    Sends the request through the current async transport, by default the
+    process-wide asyncio connection pool.
+    """
+    return await _TRANSPORT.urlopen(req)
@@ -1,14 +1,30 @@
 import os
 import json
 import time
-import urllib.request
-from typing import Mapping
-from urllib.error import HTTPError
+from typing import TYPE_CHECKING, Mapping
+
+from infra_event_notifier.backends import limits, metrics
+
+if TYPE_CHECKING:
+    import urllib.request
+
+    from infra_event_notifier.backends import transport
 
 # This category is supposed to be shared by other Sentry tools (terraform,
 # salt, etc.) that report event to DataDog.
 DEFAULT_EVENT_SOURCE_CATEGORY = "infra-tools"
 
+# The events API rejects longer texts.
+MAX_DATADOG_TEXT_LENGTH = 4000
+
+SITE_ENV = "DD_SITE"
+# US1. Other sites are e.g. "datadoghq.eu", "us3.datadoghq.com",
+# "us5.datadoghq.com" and "ap1.datadoghq.com".
+DEFAULT_SITE = "datadoghq.com"
+
+_MARKDOWN_START = "%%%\n"
+_MARKDOWN_END = "\n%%%"
+
 
 def api_key_from_env() -> str:
     dd_api_key = os.getenv("DATADOG_API_KEY") or os.getenv("DD_API_KEY")
@@ -20,8 +36,198 @@ def api_key_from_env() -> str:
     return dd_api_key
 
 
+def site_from_env() -> str:
+    """
+    Datadog site the events go to: $DD_SITE, as the Datadog agent and
+    libraries read it, or US1. A URL such as "https://app.datadoghq.eu/" is
+    accepted too.
+    """
+    site = os.environ.get(SITE_ENV) or DEFAULT_SITE
+    site = site.strip().rstrip("/")
+    site = site.split("://", 1)[-1]
+    if site.startswith(("app.", "api.")):
+        site = site.split(".", 1)[1]
+    return site
+
+
+def events_url(site: str | None = None) -> str:
+    """
+    URL of the events API of a Datadog site, by default the one from
+    site_from_env(). API keys belong to one site, so events must go to the
+    site of the key's organization.
+    """
+    if site is None:
+        site = site_from_env()
+    return f"https://api.{site}/api/v1/events"
+
+
 def markdown_text(text: str) -> str:
-    return f"%%%\n{text}\n%%%"
+    return f"{_MARKDOWN_START}{text}{_MARKDOWN_END}"
+
+
+def _fit_text(text: str) -> str:
+    """
+    Truncates text the events API would reject, keeping the markers of a
+    markdown_text() intact.
+    """
+    if len(text) <= MAX_DATADOG_TEXT_LENGTH:
+        return text
+    if text.startswith(_MARKDOWN_START) and text.endswith(_MARKDOWN_END):
+        start, end = len(_MARKDOWN_START), len(text) - len(_MARKDOWN_END)
+        inner = text[start:end]
+        return markdown_text(
+            limits.truncate(
+                inner,
+                MAX_DATADOG_TEXT_LENGTH
+                - len(_MARKDOWN_START)
+                - len(_MARKDOWN_END),
+            )
+        )
+    return limits.truncate(text, MAX_DATADOG_TEXT_LENGTH)
+
+
+def _encode_event(
+    title: str,
+    text: str,
+    tags: Mapping[str, str],
+    alert_type: str,
+    date_happened: int,
+) -> bytes:
+    # API docs: https://docs.datadoghq.com/api/latest/events/#post-an-event
+    payload = {
+        "title": title,
+        "text": _fit_text(text),
+        "tags": [f"{k}:{v}" for k, v in tags.items()],
+        "date_happened": date_happened,
+        "alert_type": alert_type,
+    }
+    json_data = json.dumps(payload)
+    return json_data.encode("utf-8")
+
+
+_quote = json.encoder.encode_basestring_ascii
+
+
+class EventTemplate:
+    """
+    Pre-encoded payload for many events that share tags, e.g. every event
+    of a bulk ingestion or of a daemon serving one tool.
+
+    The shared tags and alert type are encoded once; render() only encodes
+    the title, text and remaining tags of each event and splices them in,
+    keeping the tags in the event's order. Events that do not carry every
+    shared tag with the same value are encoded in full, so a template never
+    changes what is sent, only how fast it is encoded.
+
+    Args:
+        tags (Mapping[str, str]): Tags shared by the events
+        alert_type (str, optional): Alert type of most events.
+            Defaults to "info".
+    """
+
+    def __init__(
+        self, tags: Mapping[str, str], alert_type: str = "info"
+    ) -> None:
+        self.tags = dict(tags)
+        self.alert_type = alert_type
+        self._tags = {k: _quote(f"{k}:{v}") for k, v in self.tags.items()}
+        self._alert_type = _quote(alert_type)
+
+    def render(
+        self,
+        title: str,
+        text: str,
+        tags: Mapping[str, str],
+        alert_type: str | None = None,
+        date_happened: int | None = None,
+    ) -> bytes:
+        """
+        Encodes an event, the same way send_event() would. `tags` are all
+        of the event's tags, shared ones included.
+        """
+        if alert_type is None:
+            alert_type = self.alert_type
+        if date_happened is None:
+            date_happened = int(time.time())
+        shared = self.tags
+        for key, value in shared.items():
+            if tags.get(key) != value:
+                return _encode_event(
+                    title, text, tags, alert_type, date_happened
+                )
+
+        # Quoting the strings directly is what json.dumps() ends up doing,
+        # without its per-call overhead, which would cost more than the
+        # template saves.
+        parts = [
+            '{"title": ',
+            _quote(title),
+            ', "text": ',
+            _quote(_fit_text(text)),
+            ', "tags": [',
+            ", ".join(
+                [
+                    self._tags.get(key) or _quote(f"{key}:{value}")
+                    for key, value in tags.items()
+                ]
+            ),
+        ]
+        parts += [
+            '], "date_happened": ',
+            str(date_happened),
+            ', "alert_type": ',
+            (
+                self._alert_type
+                if alert_type == self.alert_type
+                else _quote(alert_type)
+            ),
+            "}",
+        ]
+        # Quoted strings are ASCII.
+        return "".join(parts).encode("ascii")
+
+
+def _event_request(
+    title: str,
+    text: str,
+    tags: Mapping[str, str],
+    datadog_api_key: str,
+    alert_type: str,
+    template: EventTemplate | None = None,
+    site: str | None = None,
+    date_happened: int | None = None,
+) -> "urllib.request.Request":
+    # Imported here, like the transports, so that the CLI does not load
+    # urllib.request, http.client and ssl unless it sends an event itself
+    # (rather than through the daemon, or not at all on a dry run).
+    import urllib.request
+
+    if template is not None:
+        data = template.render(title, text, tags, alert_type, date_happened)
+    else:
+        if date_happened is None:
+            date_happened = int(time.time())
+        data = _encode_event(title, text, tags, alert_type, date_happened)
+    req = urllib.request.Request(events_url(site), data=data)
+    req.add_header("DD-API-KEY", datadog_api_key)
+    req.add_header("Content-Type", "application/json; charset=utf-8")
+    return req
+
+
+def _check_response(response: "transport.Response") -> None:
+    from urllib.error import HTTPError
+
+    status = response.status
+    # XXX(ben): docs say events API returns 200,
+    # in practice I was getting 202s
+    if status > 202:
+        raise HTTPError(
+            url=response.url,
+            code=status,
+            msg=f"Recieved {status} response from Datadog",
+            hdrs=response.headers,
+            fp=None,
+        )
 
 
 def send_event(
@@ -30,6 +236,9 @@ def send_event(
     tags: Mapping[str, str],
     datadog_api_key: str,
     alert_type: str,
+    template: EventTemplate | None = None,
+    site: str | None = None,
+    date_happened: int | None = None,
 ) -> None:
     """
     Sends an event to Datadog.
@@ -40,31 +249,62 @@ def send_event(
     :param datadog_api_key: DD API key for sending events
     :param alert_type: Type of event if using an event monitor,
         see https://docs.datadoghq.com/api/latest/events/
+    :param template: Encodes the event faster if it has the template's
+        tags, see EventTemplate
+    :param site: Datadog site to send the event to, e.g. "datadoghq.eu".
+        Defaults to $DD_SITE or US1, see site_from_env()
+    :param date_happened: When the event happened, as a Unix timestamp,
+        e.g. for an event sent late. Defaults to now.
     """
-    # API docs: https://docs.datadoghq.com/api/latest/events/#post-an-event
-    payload = {
-        "title": title,
-        "text": text,
-        "tags": [f"{k}:{v}" for k, v in tags.items()],
-        "date_happened": int(time.time()),
-        "alert_type": alert_type,
-    }
-    json_data = json.dumps(payload)
-    data = json_data.encode("utf-8")
-    req = urllib.request.Request(
-        "https://api.datadoghq.com/api/v1/events", data=data
-    )
-    req.add_header("DD-API-KEY", datadog_api_key)
-    req.add_header("Content-Type", "application/json; charset=utf-8")
-    with urllib.request.urlopen(req) as response:
-        status = response.status
-        # XXX(ben): docs say events API returns 200,
-        # in practice I was getting 202s
-        if status > 202:
-            raise HTTPError(
-                url=response.url,
-                code=status,
-                msg=f"Recieved {status} response from Datadog",
-                hdrs=response.headers,
-                fp=None,
+    from infra_event_notifier.backends import transport
+
+    with metrics.measure("datadog", "events") as timing:
+        with timing.phase("encode"):
+            req = _event_request(
+                title,
+                text,
+                tags,
+                datadog_api_key,
+                alert_type,
+                template,
+                site,
+                date_happened,
+            )
+        with transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_response(response)
+
+
+async def send_event_async(
+    title: str,
+    text: str,
+    tags: Mapping[str, str],
+    datadog_api_key: str,
+    alert_type: str,
+    template: EventTemplate | None = None,
+    site: str | None = None,
+    date_happened: int | None = None,
+) -> None:
+    """
+    Sends an event to Datadog without blocking the event loop.
+    Takes the same arguments as send_event().
+    """
+    # Imported here so that the CLI, which only sends synchronously, does
+    # not pay for importing asyncio.
+    from infra_event_notifier.backends import async_transport
+
+    with metrics.measure("datadog", "events") as timing:
+        with timing.phase("encode"):
+            req = _event_request(
+                title,
+                text,
+                tags,
+                datadog_api_key,
+                alert_type,
+                template,
+                site,
+                date_happened,
             )
+        with await async_transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_response(response)
@@ -0,0 +1,189 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, TypeVar
+
+from infra_event_notifier.backends.state import StateFile, runtime_path
+
+T = TypeVar("T")
+
+WINDOW_ENV = "INFRA_EVENT_NOTIFIER_DEDUP_WINDOW"
+
+# Long enough to swallow a burst of retries of the same command, short
+# enough that a problem that is still there gets reported again.
+DEFAULT_WINDOW = 60.0
+DEFAULT_MAXSIZE = 1024
+
+# Bumped if the on-disk layout changes; files with another version are
+# ignored.
+_FILE_VERSION = 1
+
+
+class Deduplicator:
+    """
+    Suppresses notifications identical to one sent less than `window`
+    seconds ago.
+
+    Notifications are identified by a fingerprint of the backend, title,
+    tags and, with `include_body`, body. The fingerprints of the last
+    `maxsize` notifications sent are kept, oldest first, and forgotten once
+    their window is over; a repeat does not extend the window, so something
+    that keeps happening is still reported once per window. Suppressed
+    notifications are counted per backend in `suppressed`.
+
+    If `path` is given, fingerprints are kept in that JSON file instead, so
+    that separate processes, e.g. one CLI invocation per terragrunt slice,
+    share them; the file is locked while it is read and rewritten.
+
+    Args:
+        window (float, optional): Seconds during which repeats are
+            suppressed. Defaults to 60.
+        maxsize (int, optional): Fingerprints kept. Defaults to 1024.
+        path (str, optional): JSON file shared between processes.
+            Defaults to None (in memory only).
+        include_body (bool, optional): Only suppress repeats whose body is
+            identical too. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        maxsize: int = DEFAULT_MAXSIZE,
+        path: str | None = None,
+        include_body: bool = True,
+    ) -> None:
+        assert window > 0, "window must be positive"
+        assert maxsize > 0, "maxsize must be positive"
+        self.window = window
+        self.maxsize = maxsize
+        self.path = path
+        self.include_body = include_body
+        self._file = None if path is None else StateFile(path, _FILE_VERSION)
+        self.suppressed: Counter[str] = Counter()
+        # Fingerprint -> when its window ends, in the order they were sent.
+        self._sent: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint(
+        self, backend: str, title: str, body: str, tags: Mapping[str, str]
+    ) -> str:
+        """
+        Identifies a notification. Tags are sorted, so their order does not
+        matter. The backend is kept readable, as the prefix.
+        """
+        fields = [backend, title, sorted(tags.items())]
+        if self.include_body:
+            fields.append(body)
+        digest = hashlib.sha256(json.dumps(fields).encode("utf-8"))
+        return f"{backend}:{digest.hexdigest()}"
+
+    def admit(self, fingerprint: str) -> bool:
+        """
+        Returns True, and starts the window of the fingerprint, if the
+        notification should be sent. Returns False and counts it as
+        suppressed if an identical one was sent within the window.
+        """
+        now = time.time()
+        with self._lock:
+            if self._file is None:
+                admitted = self._admit(self._sent, fingerprint, now)
+            else:
+                with self._file.lock():
+                    sent = _read_sent(self._file)
+                    admitted = self._admit(sent, fingerprint, now)
+                    if admitted:
+                        self._file.write({"sent": sent})
+            if not admitted:
+                self.suppressed[fingerprint.split(":", 1)[0]] += 1
+            return admitted
+
+    def forget(self, fingerprint: str) -> None:
+        """
+        Ends the window of the fingerprint, e.g. because sending the
+        notification failed and a retry should not be suppressed.
+        """
+        with self._lock:
+            self._sent.pop(fingerprint, None)
+            if self._file is None:
+                return
+            with self._file.lock():
+                sent = _read_sent(self._file)
+                if sent.pop(fingerprint, None) is not None:
+                    self._file.write({"sent": sent})
+
+    def wrap(self, fn: Callable[..., T], fingerprint: str) -> Callable[..., T]:
+        """
+        Returns a version of fn that forgets the fingerprint if it raises.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                self.forget(fingerprint)
+                raise
+
+        return wrapper
+
+    def wrap_async(
+        self, fn: Callable[..., Awaitable[T]], fingerprint: str
+    ) -> Callable[..., Awaitable[T]]:
+        """
+        Same as wrap(), for coroutine functions.
+        """
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException:
+                self.forget(fingerprint)
+                raise
+
+        return wrapper
+
+    def _admit(
+        self, sent: "OrderedDict[str, float]", fingerprint: str, now: float
+    ) -> bool:
+        # All windows are equally long, so the oldest ones end first.
+        while sent and next(iter(sent.values())) <= now:
+            sent.popitem(last=False)
+        if fingerprint in sent:
+            return False
+        sent[fingerprint] = now + self.window
+        while len(sent) > self.maxsize:
+            sent.popitem(last=False)
+        return True
+
+
+def _read_sent(file: StateFile) -> "OrderedDict[str, float]":
+    entries: Dict[str, float] = file.read().get("sent", {})
+    # Processes may use different windows, so restore the order.
+    return OrderedDict(sorted(entries.items(), key=lambda e: e[1]))
+
+
+def window_from_env() -> float:
+    """
+    Deduplication window configured in the environment, 0 if disabled.
+    """
+    value = os.environ.get(WINDOW_ENV)
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(
+            f"${WINDOW_ENV} must be a number of seconds, not {value!r}"
+        )
+
+
+def default_state_path() -> str:
+    """
+    Per-user file shared by every notifier process on the host.
+    """
+    return runtime_path("dedup")
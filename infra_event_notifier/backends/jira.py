@@ -1,11 +1,35 @@
+import contextvars
+import hashlib
 import json
-import urllib.request  # must use urllib.request.urlopen() in order to do tests
 from base64 import b64encode
 from enum import Enum
-from typing import Any, Dict, Mapping
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
 from urllib.request import Request
 
+from infra_event_notifier.backends import (
+    limits,
+    metrics,
+    rate_limit,
+    transport,
+)
+from infra_event_notifier.backends.jira_cache import IssueKeyCache
+
 MAX_JIRA_DESCRIPTION_LENGTH = 32000
+MAX_JIRA_COMMENT_LENGTH = 32000
+# Ends a description cut to MAX_JIRA_DESCRIPTION_LENGTH; the rest of it is
+# added as comments.
+CONTINUED_MARKER = "\n\n[... {} more characters continued in comments]"
+# Jira's bulk-create endpoint takes at most this many issues per request.
+MAX_BULK_CREATE = 50
+# Issues updated at once by create_or_update_issues().
+DEFAULT_MAX_WORKERS = 8
+# Issues fetched per page of search results.
+SEARCH_PAGE_SIZE = 100
+# Longest JQL query find_issues() sends. Jira rejects overly long or complex
+# queries, so many tag sets are split over several searches.
+MAX_JQL_LENGTH = 6000
 
 
 class JiraApiException(Exception):
@@ -21,15 +45,23 @@ class JiraConfig:
         project_key (str): Project ID of the project to create events for
         user_email (str): Email of the User sending Jira issues
         api_key (str): Jira API Key
+        issue_cache (IssueKeyCache, optional): Cache of issue keys found by
+            earlier searches. Defaults to None.
     """
 
     def __init__(
-        self, url: str, project_key: str, user_email: str, api_key: str
+        self,
+        url: str,
+        project_key: str,
+        user_email: str,
+        api_key: str,
+        issue_cache: IssueKeyCache | None = None,
     ) -> None:
         self.url = url
         self.project_key = project_key
         self.user_email = user_email
         self.api_key = api_key
+        self.issue_cache = issue_cache
 
 
 class IssueType(Enum):
@@ -80,6 +112,13 @@ def http_basic_auth(username: str, api_key: str, req: Request) -> Request:
     return req
 
 
+# Wraps the requests create_or_update_issues() can safely send again, e.g.
+# with a RetryPolicy: searches, and updates of a description that carry no
+# comment. Comments are never sent twice, and creating issues is retried by
+# searching for them again and creating only those still missing.
+Wrapper = Callable[[Callable[..., Any]], Callable[..., Any]]
+
+
 def create_or_update_issue(
     jira: JiraConfig,
     fields: JiraFields,
@@ -89,7 +128,8 @@ def create_or_update_issue(
     """
     Attempts to create a Jira issue with the given title/text/tags.
     If an issue matching that title and tags already exists, optionally update
-    that issue's text body and add a comment.
+    that issue's text body and add a comment. A text body identical to the
+    issue's current one is not sent again.
 
     Args:
         jira (JiraConfig): Config containing URL/project/email/API Key
@@ -100,12 +140,43 @@ def create_or_update_issue(
             body of an existing Jira issue with whatever is passed
             as the `text` parameter. Defaults to False.
     """
-    key = _find_jira_issue(jira, fields.title, fields.tags)
-    if key is not None:
-        if update_text_body:
-            _update_jira_issue(jira, key, fields.text)
-        if fallback_comment_text:
-            _add_jira_comment(jira, key, fallback_comment_text)
+    cache = jira.issue_cache
+    if cache is not None:
+        cached = cache.lookup(jira.project_key, fields.tags)
+        if cached is not None:
+            key, known_hash = cached
+            try:
+                content_hash = _update_existing_issue(
+                    jira,
+                    key,
+                    fields,
+                    fallback_comment_text,
+                    update_text_body,
+                    known_hash,
+                )
+            except HTTPError as e:
+                # The issue was deleted or moved since we cached its key.
+                if e.code != 404:
+                    raise
+                cache.invalidate(jira.project_key, fields.tags)
+            else:
+                if content_hash != known_hash:
+                    cache.set(jira.project_key, fields.tags, key, content_hash)
+                return
+
+    found = _find_open_issue(jira, fields.tags, update_text_body)
+    if found is not None:
+        key, known_hash = found
+        content_hash = _update_existing_issue(
+            jira,
+            key,
+            fields,
+            fallback_comment_text,
+            update_text_body,
+            known_hash,
+        )
+        if cache is not None:
+            cache.set(jira.project_key, fields.tags, key, content_hash)
     else:
         _create_jira_issue(
             jira,
@@ -116,6 +187,188 @@ def create_or_update_issue(
         )
 
 
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _update_existing_issue(
+    jira: JiraConfig,
+    key: str,
+    fields: JiraFields,
+    fallback_comment_text: str | None,
+    update_text_body: bool,
+    known_hash: str | None = None,
+    wrap: Wrapper | None = None,
+) -> str | None:
+    """
+    Updates an existing issue, leaving out the description if it matches
+    `known_hash`, the hash of the issue's current one. Returns the hash of
+    the issue's description after the update, if known. A request that
+    only replaces the description is sent through `wrap`, if given.
+    """
+    if update_text_body:
+        description, comments = _split_body(fields.text)
+        # Jira only stores the description, so that is what is hashed, like
+        # the descriptions searches return.
+        content_hash = _content_hash(description)
+        if content_hash != known_hash:
+            if fallback_comment_text:
+                comments.append(fallback_comment_text)
+            # The first comment rides along with the new description, which
+            # makes the request unsafe to send twice.
+            send = send_request
+            if wrap is not None and not comments:
+                send = wrap(send_request)
+            send(
+                *_update_issue_args(
+                    jira, key, description, comments[0] if comments else None
+                )
+            )
+            for comment in comments[1:]:
+                _add_jira_comment(jira, key, comment)
+            return content_hash
+    if fallback_comment_text:
+        _add_jira_comment(jira, key, fallback_comment_text)
+    return known_hash
+
+
+async def create_or_update_issue_async(
+    jira: JiraConfig,
+    fields: JiraFields,
+    fallback_comment_text: str | None,
+    update_text_body: bool = False,
+) -> None:
+    """
+    Same as create_or_update_issue(), without blocking the event loop.
+    """
+    cache = jira.issue_cache
+    if cache is not None:
+        cached = cache.lookup(jira.project_key, fields.tags)
+        if cached is not None:
+            key, known_hash = cached
+            try:
+                content_hash = await _update_existing_issue_async(
+                    jira,
+                    key,
+                    fields,
+                    fallback_comment_text,
+                    update_text_body,
+                    known_hash,
+                )
+            except HTTPError as e:
+                if e.code != 404:
+                    raise
+                cache.invalidate(jira.project_key, fields.tags)
+            else:
+                if content_hash != known_hash:
+                    cache.set(jira.project_key, fields.tags, key, content_hash)
+                return
+
+    found = await _find_open_issue_async(jira, fields.tags, update_text_body)
+    if found is not None:
+        key, known_hash = found
+        content_hash = await _update_existing_issue_async(
+            jira,
+            key,
+            fields,
+            fallback_comment_text,
+            update_text_body,
+            known_hash,
+        )
+        if cache is not None:
+            cache.set(jira.project_key, fields.tags, key, content_hash)
+    else:
+        await _create_jira_issue_async(
+            jira,
+            fields.title,
+            fields.text,
+            fields.tags,
+            fields.issue_type.value,
+        )
+
+
+async def _update_existing_issue_async(
+    jira: JiraConfig,
+    key: str,
+    fields: JiraFields,
+    fallback_comment_text: str | None,
+    update_text_body: bool,
+    known_hash: str | None = None,
+) -> str | None:
+    if update_text_body:
+        description, comments = _split_body(fields.text)
+        # Jira only stores the description, so that is what is hashed, like
+        # the descriptions searches return.
+        content_hash = _content_hash(description)
+        if content_hash != known_hash:
+            if fallback_comment_text:
+                comments.append(fallback_comment_text)
+            await send_request_async(
+                *_update_issue_args(
+                    jira, key, description, comments[0] if comments else None
+                )
+            )
+            for comment in comments[1:]:
+                await send_request_async(
+                    *_add_comment_args(jira, key, comment)
+                )
+            return content_hash
+    if fallback_comment_text:
+        await send_request_async(
+            *_add_comment_args(jira, key, fallback_comment_text)
+        )
+    return known_hash
+
+
+# Arguments for send_request(): url, payload, method, expected status,
+# user email and API key.
+RequestArgs = Tuple[str, str, str, int, str, str]
+
+
+def _split_body(body: str) -> Tuple[str, List[str]]:
+    """
+    Returns a description that fits in MAX_JIRA_DESCRIPTION_LENGTH and the
+    comments, if any, that carry the rest of the body.
+    """
+    description, overflow = limits.fit(
+        body, MAX_JIRA_DESCRIPTION_LENGTH, CONTINUED_MARKER
+    )
+    return description, limits.chunks(overflow, MAX_JIRA_COMMENT_LENGTH)
+
+
+def _labels(tags: Mapping[str, str]) -> List[str]:
+    return [f"{k}:{v}" for k, v in tags.items()]
+
+
+def _issue_fields(
+    jira: JiraConfig,
+    title: str,
+    body: str,
+    tags: Mapping[str, str],
+    issue_type: str,
+) -> Dict[str, Any]:
+    return {
+        "project": {"key": jira.project_key},
+        "summary": title,
+        "description": body,
+        "issuetype": {"name": issue_type},
+        "labels": _labels(tags),
+    }
+
+
+def _create_issue_args(
+    jira: JiraConfig,
+    title: str,
+    body: str,
+    tags: Mapping[str, str],
+    issue_type: str,
+) -> RequestArgs:
+    api_url = f"{jira.url}/rest/api/2/issue"
+    payload = {"fields": _issue_fields(jira, title, body, tags, issue_type)}
+    json_data = json.dumps(payload)
+    return api_url, json_data, "POST", 201, jira.user_email, jira.api_key
+
+
 def _create_jira_issue(
     jira: JiraConfig,
     title: str,
@@ -124,44 +377,95 @@ def _create_jira_issue(
     issue_type: str,
 ) -> None:
     """
-    Attempts to create a new jira issue.
+    Attempts to create a new jira issue. A body too long for a description
+    is continued in comments.
     """
-    api_url = f"{jira.url}/rest/api/2/issue"
-    payload = {
-        "fields": {
-            "project": {"key": jira.project_key},
-            "summary": title,
-            "description": body,
-            "issuetype": {"name": issue_type},
-            "labels": [f"{k}:{v}" for k, v in tags.items()],
-        }
-    }
-    json_data = json.dumps(payload)
-    send_request(
-        api_url, json_data, "POST", 201, jira.user_email, jira.api_key
+    description, comments = _split_body(body)
+    response = send_request(
+        *_create_issue_args(jira, title, description, tags, issue_type)
     )
+    if comments:
+        key = json.loads(response.read().decode())["key"]
+        _add_comments(jira, key, comments)
+
+
+async def _create_jira_issue_async(
+    jira: JiraConfig,
+    title: str,
+    body: str,
+    tags: Mapping[str, str],
+    issue_type: str,
+) -> None:
+    """
+    Same as _create_jira_issue(), without blocking the event loop.
+    """
+    description, comments = _split_body(body)
+    response = await send_request_async(
+        *_create_issue_args(jira, title, description, tags, issue_type)
+    )
+    if comments:
+        key = json.loads(response.read().decode())["key"]
+        for comment in comments:
+            await send_request_async(*_add_comment_args(jira, key, comment))
+
+
+def _update_issue_args(
+    jira: JiraConfig, issue_key: str, body: str, comment: str | None = None
+) -> RequestArgs:
+    """
+    Arguments for replacing the description of an issue and, if `comment`
+    is given, adding that comment in the same request.
+    """
+    api_url = f"{jira.url}/rest/api/2/issue/{issue_key}"
+    payload: Dict[str, Any] = {"fields": {"description": body}}
+    if comment:
+        comment = limits.truncate(comment, MAX_JIRA_COMMENT_LENGTH)
+        payload["update"] = {"comment": [{"add": {"body": comment}}]}
+    json_data = json.dumps(payload)
+    return api_url, json_data, "PUT", 204, jira.user_email, jira.api_key
 
 
 def _update_jira_issue(jira: JiraConfig, issue_key: str, body: str) -> None:
     """
     Attempts to update a jira issue given the issue key.
     """
-    api_url = f"{jira.url}/rest/api/2/issue/{issue_key}"
-    payload = {"fields": {"description": body}}
+    send_request(*_update_issue_args(jira, issue_key, body))
+
+
+def _add_comment_args(
+    jira: JiraConfig, issue_key: str, comment: str
+) -> RequestArgs:
+    api_url = f"{jira.url}/rest/api/2/issue/{issue_key}/comment"
+    payload = {"body": limits.truncate(comment, MAX_JIRA_COMMENT_LENGTH)}
     json_data = json.dumps(payload)
-    send_request(api_url, json_data, "PUT", 204, jira.user_email, jira.api_key)
+    return api_url, json_data, "POST", 201, jira.user_email, jira.api_key
 
 
 def _add_jira_comment(jira: JiraConfig, issue_key: str, comment: str) -> None:
     """
     Adds a comment to the given jira issue.
     """
-    api_url = f"{jira.url}/rest/api/2/issue/{issue_key}/comment"
-    payload = {"body": comment}
-    json_data = json.dumps(payload)
-    send_request(
-        api_url, json_data, "POST", 201, jira.user_email, jira.api_key
-    )
+    send_request(*_add_comment_args(jira, issue_key, comment))
+
+
+def _build_request(
+    url: str, payload: str, method: str, user_email: str, api_key: str
+) -> Request:
+    data = payload.encode("utf-8")
+    req = Request(url, data=data, method=method)
+    req = http_basic_auth(user_email, api_key, req)
+    req.add_header("Content-Type", "application/json")
+    return req
+
+
+def _check_status(response: transport.Response, expected_status: int) -> None:
+    status = response.status
+
+    if status != expected_status:
+        raise JiraApiException(
+            f"Failed to create or update issue: "
+            f"{status}, {response.reason}"
+        )
 
 
 def send_request(
@@ -171,24 +475,117 @@ def send_request(
     expected_status: int,
     user_email: str,
     api_key: str,
-) -> None:
+) -> transport.Response:
     """
-    Sends an HTTP request using urllib. Raises a JiraApiException
+    Sends an HTTP request over a pooled connection. Raises a JiraApiException
     if the returned status does not match the expected status.
     """
-    data = payload.encode("utf-8")
-    req = Request(url, data=data, method=method)
-    req = http_basic_auth(user_email, api_key, req)
+    rate_limit.acquire_for_request()
+    with metrics.measure("jira", _endpoint(method, url)) as timing:
+        with timing.phase("encode"):
+            req = _build_request(url, payload, method, user_email, api_key)
+        with transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_status(response, expected_status)
+            return response
+
+
+async def send_request_async(
+    url: str,
+    payload: str,
+    method: str,
+    expected_status: int,
+    user_email: str,
+    api_key: str,
+) -> transport.Response:
+    """
+    Same as send_request(), without blocking the event loop.
+    """
+    # Imported lazily: it pulls in asyncio.
+    from infra_event_notifier.backends import async_transport
+
+    await rate_limit.acquire_for_request_async()
+    with metrics.measure("jira", _endpoint(method, url)) as timing:
+        with timing.phase("encode"):
+            req = _build_request(url, payload, method, user_email, api_key)
+        with await async_transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_status(response, expected_status)
+            return response
+
+
+def _endpoint(method: str, url: str) -> str:
+    """
+    Names the API a request goes to in metrics, leaving out issue keys so
+    that every issue is counted under the same name.
+    """
+    path = urlsplit(url).path
+    if path.endswith("/comment"):
+        return "comment"
+    if path.endswith("/issue/bulk"):
+        return "bulk_create"
+    if path.endswith("/issue"):
+        return "create_issue"
+    if "/issue/" in path:
+        return "update_issue" if method == "PUT" else "issue"
+    return path
+
+
+_SEARCH_FIELDS = ["id", "key", "summary", "status"]
+
+
+def _search_request(
+    jira: JiraConfig, tags: Mapping[str, str], with_description: bool = False
+) -> Request:
+    api_url = f"{jira.url}/rest/api/2/search"
+
+    jql = _jql_prefix(jira)
+    for key in tags:
+        jql += f" AND labels = {key}:{tags[key]}"
+
+    fields = _SEARCH_FIELDS
+    if with_description:
+        fields = fields + ["description"]
+    payload = {"jql": jql, "fields": fields}
+
+    data = json.dumps(payload)
+    data_bytes = data.encode("utf-8")
+    req = Request(api_url, data=data_bytes, method="POST")
+    req = http_basic_auth(jira.user_email, jira.api_key, req)
+    req.add_header("Accept", "application/json")
     req.add_header("Content-Type", "application/json")
+    return req
 
-    with urllib.request.urlopen(req) as response:
-        status = response.status
 
-        if status != expected_status:
-            raise JiraApiException(
-                f"Failed to create or update issue: "
-                f"{response.status_code}, {response.text}"
-            )
+def _parse_search_response(response: transport.Response) -> Any:
+    """
+    Returns the first issue found, or None.
+    """
+    res_body = json.loads(response.read().decode())
+    status = response.status
+
+    if status == 200:
+        issues = res_body["issues"]
+        if issues:
+            return issues[0]
+        return None
+    else:
+        raise JiraApiException(
+            f"Failed to search issues: {status}, {response.reason}"
+        )
+
+
+# Key of an existing issue and, if fetched, the hash of its description.
+FoundIssue = Tuple[str, str | None]
+
+
+def _found_issue(issue: Any, with_description: bool) -> FoundIssue | None:
+    if issue is None:
+        return None
+    if not with_description:
+        return issue["key"], None
+    description = issue.get("fields", {}).get("description")
+    return issue["key"], _content_hash(description or "")
 
 
 # Find the jira issue using only the tags
@@ -200,36 +597,511 @@ def _find_jira_issue(
     Looks for an open existing jira issue. Return issue key if issue exists,
     otherwise return nothing.
     """
-    api_key = jira.api_key
-    api_url = f"{jira.url}/rest/api/2/search"
+    found = _find_open_issue(jira, tags, False)
+    return None if found is None else found[0]
+
+
+def _find_open_issue(
+    jira: JiraConfig, tags: Mapping[str, str], with_description: bool
+) -> FoundIssue | None:
+    """
+    Same as _find_jira_issue(), also returning the hash of the issue's
+    description if `with_description` is set.
+    """
+    rate_limit.acquire_for_request()
+    with metrics.measure("jira", "search") as timing:
+        with timing.phase("encode"):
+            req = _search_request(jira, tags, with_description)
+        with transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            issue = _parse_search_response(response)
+    return _found_issue(issue, with_description)
+
+
+async def _find_open_issue_async(
+    jira: JiraConfig, tags: Mapping[str, str], with_description: bool
+) -> FoundIssue | None:
+    """
+    Same as _find_open_issue(), without blocking the event loop.
+    """
+    from infra_event_notifier.backends import async_transport
+
+    await rate_limit.acquire_for_request_async()
+    with metrics.measure("jira", "search") as timing:
+        with timing.phase("encode"):
+            req = _search_request(jira, tags, with_description)
+        with await async_transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            issue = _parse_search_response(response)
+    return _found_issue(issue, with_description)
+
+
+def create_or_update_issues(
+    jira: JiraConfig,
+    issues: Sequence[JiraFields],
+    fallback_comment_text: str | None,
+    update_text_body: bool = False,
+    wrap: Wrapper | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> List[Exception | None]:
+    """
+    Same as calling create_or_update_issue() for every issue, in a handful
+    of requests: issues not in the issue cache are looked up with one
+    combined search, the missing ones are created with Jira's bulk-create
+    endpoint, `MAX_BULK_CREATE` at a time, and existing issues are updated
+    `max_workers` issues at a time. Issues with the same tags are created
+    once; the later ones update it. Updates of the same issue are sent one
+    after the other, in the order of `issues`.
+
+    Returns, for every issue in order, None if it was created or updated,
+    or the exception that prevented it.
+    """
+    if wrap is None:
+        wrap = _no_wrap
+    cache = jira.issue_cache
+    results: List[Exception | None] = [None] * len(issues)
+    keys: List[str | None] = [None] * len(issues)
+
+    # Hash of the description of every issue being updated, as of the last
+    # update. Updates of one issue run in order, in a single thread, so
+    # each one sees what the one before left.
+    hashes: Dict[str, str | None] = {}
+
+    def update(index: int, key: str, cached: bool) -> None:
+        known_hash = hashes.get(key)
+        content_hash = _update_existing_issue(
+            jira,
+            key,
+            issues[index],
+            fallback_comment_text,
+            update_text_body,
+            known_hash,
+            wrap,
+        )
+        hashes[key] = content_hash
+        if cache is not None and (not cached or content_hash != known_hash):
+            cache.set(jira.project_key, issues[index].tags, key, content_hash)
 
-    jql = (
+    # What to do to each issue, in the order of the issues it comes from.
+    steps: Dict[str, List[Tuple[int, Callable[[], Any]]]] = {}
+
+    def run_steps() -> List[Tuple[int, Exception | None]]:
+        """
+        Runs the steps of different issues concurrently and those of the
+        same issue one after the other, so that when several issues resolve
+        to the same Jira issue, the last one's description wins and the
+        comments are added in order, like with create_or_update_issue().
+        """
+        groups = list(steps.values())
+        steps.clear()
+        outcomes = _run_concurrently(
+            [_bind(_run_in_order, group) for group in groups], max_workers
+        )
+        return [
+            (i, error)
+            for group, errors in zip(groups, outcomes)
+            for (i, _), error in zip(group, errors)
+        ]
+
+    if cache is not None:
+        for i, fields in enumerate(issues):
+            entry = cache.lookup(jira.project_key, fields.tags)
+            if entry is not None:
+                key, known_hash = entry
+                keys[i] = key
+                hashes.setdefault(key, known_hash)
+                steps.setdefault(key, []).append(
+                    (i, _bind(update, i, key, True))
+                )
+        for i, error in run_steps():
+            if isinstance(error, HTTPError) and error.code == 404:
+                # The issue was deleted or moved since we cached its key.
+                cache.invalidate(jira.project_key, issues[i].tags)
+                keys[i] = None
+            else:
+                results[i] = error
+
+    unresolved = [i for i, key in enumerate(keys) if key is None]
+    if not unresolved:
+        return results
+    try:
+        index: IssueIndex = wrap(find_issues)(
+            jira, [issues[i].tags for i in unresolved], update_text_body
+        )
+    except Exception as e:
+        for i in unresolved:
+            results[i] = e
+        return results
+    found = [index.find(issues[i].tags) for i in unresolved]
+
+    # First issue of every label set that has no Jira issue yet, and the
+    # issues that repeat its label set.
+    to_create: Dict[frozenset[str], List[int]] = {}
+    for i, existing in zip(unresolved, found):
+        if existing is not None:
+            hashes[existing] = index.content_hashes.get(existing)
+            steps.setdefault(existing, []).append(
+                (i, _bind(update, i, existing, False))
+            )
+        else:
+            labels = frozenset(_labels(issues[i].tags))
+            to_create.setdefault(labels, []).append(i)
+
+    firsts = [indices[0] for indices in to_create.values()]
+    chunks: List[List[int]] = []
+    for start in range(0, len(firsts), MAX_BULK_CREATE):
+        end = start + MAX_BULK_CREATE
+        chunks.append(firsts[start:end])
+    created: Dict[int, str | Exception] = {}
+
+    def create(chunk: List[int]) -> List[str | Exception]:
+        fields = [issues[i] for i in chunk]
+        attempts = 0
+
+        def attempt() -> List[str | Exception]:
+            nonlocal attempts
+            attempts += 1
+            # We just searched for these issues the first time round.
+            return _create_missing(jira, fields, search=attempts > 1)
+
+        result: List[str | Exception] = wrap(attempt)()
+        return result
+
+    outcomes = _run_concurrently(
+        [_bind(create, chunk) for chunk in chunks], max_workers
+    )
+    for chunk, outcome in zip(chunks, outcomes):
+        for n, i in enumerate(chunk):
+            if isinstance(outcome, Exception):
+                created[i] = outcome
+            else:
+                created[i] = outcome[n]
+
+    for indices in to_create.values():
+        result = created[indices[0]]
+        if isinstance(result, Exception):
+            for i in indices:
+                results[i] = result
+            continue
+        description, overflow = _split_body(issues[indices[0]].text)
+        content_hash = _content_hash(description)
+        hashes[result] = content_hash
+        if cache is not None:
+            cache.set(
+                jira.project_key, issues[indices[0]].tags, result, content_hash
+            )
+        # The rest of a body too long for the description goes in comments
+        # before the issues that repeat the label set update it.
+        issue_steps = steps.setdefault(result, [])
+        if overflow:
+            issue_steps.append(
+                (indices[0], _bind(_add_comments, jira, result, overflow))
+            )
+        issue_steps.extend(
+            (i, _bind(update, i, result, False)) for i in indices[1:]
+        )
+
+    for i, error in run_steps():
+        if error is not None:
+            results[i] = error
+    return results
+
+
+def _run_in_order(
+    steps: List[Tuple[int, Callable[[], Any]]],
+) -> List[Exception | None]:
+    """
+    Runs the steps one after the other, and returns the exception each one
+    raised, or None. A failed step does not stop the ones after it.
+    """
+    errors: List[Exception | None] = []
+    for _, step in steps:
+        try:
+            step()
+        except Exception as e:
+            errors.append(e)
+        else:
+            errors.append(None)
+    return errors
+
+
+def _add_comments(jira: JiraConfig, key: str, comments: List[str]) -> None:
+    for comment in comments:
+        _add_jira_comment(jira, key, comment)
+
+
+def _no_wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+    return fn
+
+
+def _bind(fn: Callable[..., Any], *args: Any) -> Callable[[], Any]:
+    return lambda: fn(*args)
+
+
+def _run_concurrently(
+    calls: List[Callable[[], Any]], max_workers: int
+) -> List[Any]:
+    """
+    Runs the calls `max_workers` at a time and returns, in order, what each
+    returned or the exception it raised. Every call runs in a copy of the
+    caller's context, so the deadline of the send in progress applies.
+    """
+    if not calls:
+        return []
+
+    def run(call: Callable[[], Any]) -> Any:
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, run, call)
+            for call in calls
+        ]
+        return [future.result() for future in futures]
+
+
+def _jql_prefix(jira: JiraConfig) -> str:
+    return (
         f"project = {jira.project_key} "
         "AND status != Closed "
         "AND status != DONE"
     )
-    for key in tags:
-        jql += f" AND labels = {key}:{tags[key]}"
 
-    payload = {"jql": jql, "fields": ["id", "key", "summary", "status"]}
 
-    data = json.dumps(payload)
-    data_bytes = data.encode("utf-8")
-    req = Request(api_url, data=data_bytes, method="POST")
-    req = http_basic_auth(jira.user_email, api_key, req)
+def _labels_clause(tags: Mapping[str, str]) -> str:
+    return "(%s)" % " AND ".join(
+        f"labels = {label}" for label in _labels(tags)
+    )
+
+
+def _batch_queries(
+    jira: JiraConfig, tag_sets: Sequence[Mapping[str, str]]
+) -> List[str]:
+    """
+    ORs the label clauses of the tag sets into as few JQL queries as fit in
+    MAX_JQL_LENGTH characters each.
+    """
+    prefix = _jql_prefix(jira)
+    # A tag set without tags matches every open issue, so one query without
+    # any label clause finds the issues of all the others too.
+    if not all(tag_sets):
+        return [prefix]
+
+    def query(clauses: List[str]) -> str:
+        return f"{prefix} AND ({' OR '.join(clauses)})"
+
+    queries = []
+    clauses: List[str] = []
+    length = len(query([]))
+    for clause in dict.fromkeys(_labels_clause(tags) for tags in tag_sets):
+        added = len(clause) + (len(" OR ") if clauses else 0)
+        if clauses and length + added > MAX_JQL_LENGTH:
+            queries.append(query(clauses))
+            clauses = []
+            length = len(query([]))
+            added = len(clause)
+        clauses.append(clause)
+        length += added
+    queries.append(query(clauses))
+    return queries
+
+
+def _search_page_request(
+    jira: JiraConfig, jql: str, start_at: int, with_description: bool
+) -> Request:
+    api_url = f"{jira.url}/rest/api/2/search"
+    fields = ["key", "labels"]
+    if with_description:
+        fields.append("description")
+    payload = {
+        "jql": jql,
+        "fields": fields,
+        "startAt": start_at,
+        "maxResults": SEARCH_PAGE_SIZE,
+    }
+
+    req = Request(
+        api_url, data=json.dumps(payload).encode("utf-8"), method="POST"
+    )
+    req = http_basic_auth(jira.user_email, jira.api_key, req)
     req.add_header("Accept", "application/json")
     req.add_header("Content-Type", "application/json")
+    return req
 
-    with urllib.request.urlopen(req) as response:
-        res_body = json.loads(response.read().decode())
-        status = response.status
 
-        if status == 200:
-            issues = res_body["issues"]
-            if issues:
-                return issues[0]["key"]
-            return None
-        else:
-            raise JiraApiException(
-                f"Failed to search issues: {status}, {response.reason}"
+class IssueIndex:
+    """
+    Open issues found by find_issues(), indexed by label so that finding
+    the issues of a tag set does not scan all of them.
+
+    Args:
+        issues (Sequence[Tuple[str, Sequence[str]]]): Key and labels of
+            every issue, in the order Jira returned them
+        content_hashes (Mapping[str, str], optional): Hash of the
+            description of every issue, by key, if it was fetched.
+            Defaults to None.
+    """
+
+    def __init__(
+        self,
+        issues: Sequence[Tuple[str, Sequence[str]]],
+        content_hashes: Mapping[str, str] | None = None,
+    ) -> None:
+        self.keys = [key for key, _ in issues]
+        self.content_hashes = dict(content_hashes or {})
+        self._by_label: Dict[str, List[int]] = {}
+        for position, (_, labels) in enumerate(issues):
+            for label in set(labels):
+                self._by_label.setdefault(label, []).append(position)
+
+    def matches(self, tags: Mapping[str, str]) -> List[str]:
+        """
+        Returns the keys of every issue carrying all the labels of `tags`,
+        in search order. More than one means the tags have duplicates.
+        """
+        labels = _labels(tags)
+        if not labels:
+            return list(self.keys)
+        postings = sorted(
+            (self._by_label.get(label, []) for label in labels), key=len
+        )
+        positions = set(postings[0]).intersection(*postings[1:])
+        return [self.keys[position] for position in sorted(positions)]
+
+    def find(self, tags: Mapping[str, str]) -> str | None:
+        """
+        Returns the key _find_jira_issue() would for `tags`: the first
+        match, or None.
+        """
+        matches = self.matches(tags)
+        return matches[0] if matches else None
+
+
+def find_issues(
+    jira: JiraConfig,
+    tag_sets: Sequence[Mapping[str, str]],
+    with_description: bool = False,
+) -> IssueIndex:
+    """
+    Looks up the open issues of many tag sets at once. The tag sets are
+    ORed into as few JQL searches as length limits allow, usually one, and
+    every page of results is fetched. Look up the issues of each tag set in
+    the returned index. If `with_description` is set, the index also holds
+    the hash of every issue's description.
+    """
+    issues: Dict[str, Sequence[str]] = {}
+    content_hashes: Dict[str, str] = {}
+    for jql in _batch_queries(jira, tag_sets):
+        fetched = 0
+        while True:
+            rate_limit.acquire_for_request()
+            with metrics.measure("jira", "search") as timing:
+                with timing.phase("encode"):
+                    req = _search_page_request(
+                        jira, jql, fetched, with_description
+                    )
+                with transport.urlopen(req) as response:
+                    timing.status = str(response.status)
+                    if response.status != 200:
+                        raise JiraApiException(
+                            f"Failed to search issues: {response.status}, "
+                            f"{response.reason}"
+                        )
+                    page = json.loads(response.read().decode())
+            for issue in page["issues"]:
+                issues.setdefault(
+                    issue["key"], issue["fields"].get("labels", [])
+                )
+                if with_description:
+                    description = issue["fields"].get("description")
+                    content_hashes[issue["key"]] = _content_hash(
+                        description or ""
+                    )
+            fetched += len(page["issues"])
+            if not page["issues"] or fetched >= page.get("total", 0):
+                break
+    return IssueIndex(list(issues.items()), content_hashes)
+
+
+def _create_missing(
+    jira: JiraConfig, issues: Sequence[JiraFields], search: bool
+) -> List[str | Exception]:
+    """
+    Same as _bulk_create(), but with `search`, first looks for the issues
+    and only creates those not found. An attempt that failed, e.g. with a
+    timeout, may have created them all the same.
+    """
+    if not search:
+        return _bulk_create(jira, issues)
+    index = find_issues(jira, [fields.tags for fields in issues])
+    keys = [index.find(fields.tags) for fields in issues]
+    missing = [fields for fields, key in zip(issues, keys) if key is None]
+    created = iter(_bulk_create(jira, missing) if missing else [])
+    return [key if key is not None else next(created) for key in keys]
+
+
+def _bulk_create(
+    jira: JiraConfig, issues: Sequence[JiraFields]
+) -> List[str | Exception]:
+    """
+    Creates up to MAX_BULK_CREATE issues in one request. Returns the key of
+    every issue in order, or the error Jira reported for it.
+    """
+    assert len(issues) <= MAX_BULK_CREATE, "Too many issues for one request"
+    payload = {
+        "issueUpdates": [
+            {
+                "fields": _issue_fields(
+                    jira,
+                    fields.title,
+                    _split_body(fields.text)[0],
+                    fields.tags,
+                    fields.issue_type.value,
+                )
+            }
+            for fields in issues
+        ]
+    }
+    rate_limit.acquire_for_request()
+    try:
+        with metrics.measure("jira", "bulk_create") as timing:
+            with timing.phase("encode"):
+                req = _build_request(
+                    f"{jira.url}/rest/api/2/issue/bulk",
+                    json.dumps(payload),
+                    "POST",
+                    jira.user_email,
+                    jira.api_key,
+                )
+            with transport.urlopen(req) as response:
+                timing.status = str(response.status)
+                _check_status(response, 201)
+                body = json.loads(response.read().decode())
+    except HTTPError as e:
+        # Jira answers 400 when it created none of the issues, with the
+        # reason for each in the body.
+        if e.code != 400:
+            raise
+        body = json.loads(e.read().decode() or "{}")
+
+    errors = {
+        error.get("failedElementNumber"): error
+        for error in body.get("errors", [])
+    }
+    created = iter(body.get("issues", []))
+    results: List[str | Exception] = []
+    for n in range(len(issues)):
+        issue = None if n in errors else next(created, None)
+        if issue is None:
+            details = errors.get(n, {}).get("elementErrors", {})
+            results.append(
+                JiraApiException(f"Failed to create issue: {details}")
             )
+        else:
+            results.append(issue["key"])
+    return results
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Any, Dict, Mapping, Tuple
+
+from infra_event_notifier.backends.state import StateFile
+
+# Long enough to cover a burst of events for the same alert, short enough
+# that an issue closed by hand is noticed soon after.
+DEFAULT_TTL = 600.0
+
+# Bumped if the on-disk layout changes; files with another version are
+# ignored.
+_FILE_VERSION = 1
+
+
+def _cache_key(project: str, tags: Mapping[str, str]) -> str:
+    labels = ",".join(sorted(f"{k}:{v}" for k, v in tags.items()))
+    return f"{project}|{labels}"
+
+
+class IssueKeyCache:
+    """
+    Remembers which Jira issue a (project, tags) pair resolved to, so that
+    repeat events can skip the JQL search, and optionally a hash of that
+    issue's description, so that they can skip rewriting an unchanged one.
+
+    Entries expire after `ttl` seconds. If `path` is given, entries are also
+    kept in that JSON file so that separate processes share them; the file
+    is locked while it is rewritten.
+
+    Args:
+        ttl (float, optional): Seconds an entry stays valid.
+            Defaults to 600.
+        path (str, optional): JSON file shared between processes.
+            Defaults to None (in memory only).
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_TTL, path: str | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.path = path
+        self._file = None if path is None else StateFile(path, _FILE_VERSION)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project: str, tags: Mapping[str, str]) -> str | None:
+        """
+        Returns the cached issue key, or None if there is no live entry.
+        """
+        entry = self.lookup(project, tags)
+        return None if entry is None else entry[0]
+
+    def lookup(
+        self, project: str, tags: Mapping[str, str]
+    ) -> Tuple[str, str | None] | None:
+        """
+        Returns the cached issue key and description hash (None if not
+        known), or None if there is no live entry.
+        """
+        key = _cache_key(project, tags)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] <= now:
+                entry = self._read_file().get(key)
+                if entry is None or entry["expires"] <= now:
+                    return None
+                self._entries[key] = entry
+            return str(entry["key"]), entry.get("hash")
+
+    def set(
+        self,
+        project: str,
+        tags: Mapping[str, str],
+        issue: str,
+        content_hash: str | None = None,
+    ) -> None:
+        """
+        Records that the (project, tags) pair resolved to `issue`, whose
+        description has the given hash if known.
+        """
+        entry: Dict[str, Any] = {
+            "key": issue,
+            "expires": time.time() + self.ttl,
+        }
+        if content_hash is not None:
+            entry["hash"] = content_hash
+        self._update(_cache_key(project, tags), entry)
+
+    def invalidate(self, project: str, tags: Mapping[str, str]) -> None:
+        """
+        Forgets the (project, tags) pair, e.g. because its issue is gone.
+        """
+        self._update(_cache_key(project, tags), None)
+
+    def _update(self, key: str, entry: Dict[str, Any] | None) -> None:
+        with self._lock:
+            if entry is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = entry
+            if self._file is None:
+                return
+            with self._file.lock():
+                entries = self._read_file()
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+                now = time.time()
+                live = {k: v for k, v in entries.items() if v["expires"] > now}
+                self._file.write({"entries": live})
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        if self._file is None:
+            return {}
+        entries: Dict[str, Dict[str, Any]] = self._file.read().get(
+            "entries", {}
+        )
+        return entries
@@ -0,0 +1,45 @@
+from typing import List, Tuple
+
+# APIs limit the text of a field in characters, not bytes, and len() of a
+# str is constant-time, so nothing below encodes the text or copies it
+# unless it actually has to be cut.
+
+TRUNCATED_MARKER = "\n\n[... {} more characters truncated]"
+
+
+def fit(
+    text: str, limit: int, marker: str = TRUNCATED_MARKER
+) -> Tuple[str, str]:
+    """
+    Splits text into a head of at most `limit` characters and the overflow
+    that did not fit. If there is overflow, the head ends with `marker`,
+    formatted with the number of characters cut, unless `limit` is too
+    small to hold even the marker; then the text is just cut.
+    """
+    if len(text) <= limit:
+        return text, ""
+    # The marker for the whole text is at least as long as the final one,
+    # so the head is sure to fit.
+    end = limit - len(marker.format(len(text)))
+    if end < 0:
+        return text[:limit], text[limit:]
+    return text[:end] + marker.format(len(text) - end), text[end:]
+
+
+def truncate(text: str, limit: int) -> str:
+    """
+    Returns text cut to at most `limit` characters, ending with a marker
+    saying how many were cut if any were.
+    """
+    return fit(text, limit)[0]
+
+
+def chunks(text: str, limit: int) -> List[str]:
+    """
+    Splits text into pieces of at most `limit` characters.
+    """
+    pieces = []
+    for start in range(0, len(text), limit):
+        end = start + limit
+        pieces.append(text[start:end])
+    return pieces
@@ -0,0 +1,217 @@
+import contextvars
+import os
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+STATSD_HOST_ENV = "DD_AGENT_HOST"
+STATSD_PORT_ENV = "DD_DOGSTATSD_PORT"
+
+DEFAULT_STATSD_HOST = "127.0.0.1"
+DEFAULT_STATSD_PORT = 8125
+DEFAULT_METRIC_PREFIX = "infra_event_notifier.request"
+
+# Phases in the order a request goes through them. Phases a request skipped
+# (e.g. connecting, on a reused connection) are left out of its Timing.
+PHASES = ("encode", "dns", "connect", "tls", "server", "read")
+
+
+class Timing:
+    """
+    How long one call to a backend took, and where the time went.
+
+    `phases` maps the phases in PHASES to seconds: encoding the payload,
+    resolving the host name, opening the TCP connection, the TLS handshake,
+    waiting for the server to answer, and reading the response body.
+    `status` is the HTTP status of the response, or "error" if there was
+    none.
+
+    Args:
+        backend (str): Backend that made the call, e.g. "jira"
+        endpoint (str): API the call went to, e.g. "search"
+    """
+
+    def __init__(self, backend: str, endpoint: str) -> None:
+        self.backend = backend
+        self.endpoint = endpoint
+        self.status = "error"
+        self.total = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """
+        Counts seconds spent in `phase`, adding to any time already spent
+        in it (e.g. when a stale connection had to be opened again).
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    @property
+    def tags(self) -> Dict[str, str]:
+        return {
+            "backend": self.backend,
+            "endpoint": self.endpoint,
+            "status": self.status,
+        }
+
+    def __str__(self) -> str:
+        phases = ", ".join(
+            f"{phase} {self.phases[phase] * 1000:.1f}ms"
+            for phase in PHASES
+            if phase in self.phases
+        )
+        return (
+            f"{self.backend} {self.endpoint} {self.status}: "
+            f"{self.total * 1000:.1f}ms ({phases})"
+        )
+
+
+# Receives the Timing of every backend call once it completed.
+Sink = Callable[[Timing], None]
+
+_SINK: Sink | None = None
+
+_timing: contextvars.ContextVar[Timing | None] = contextvars.ContextVar(
+    "infra_event_notifier_timing", default=None
+)
+
+
+def set_sink(sink: Sink | None) -> Sink | None:
+    """
+    Reports the Timing of every backend call to `sink`, or stops timing
+    calls if it is None. Returns the sink it replaces, so that callers can
+    restore it.
+    """
+    global _SINK
+    previous = _SINK
+    _SINK = sink
+    return previous
+
+
+def current() -> Timing | None:
+    """
+    Returns the Timing of the backend call in progress, if calls are timed.
+    The transports add the phases of the request they send to it.
+    """
+    return _timing.get()
+
+
+@contextmanager
+def measure(backend: str, endpoint: str) -> Iterator[Timing]:
+    """
+    Times a backend call made in the body of the with statement, and
+    reports it to the sink once the body is done. Without a sink the
+    Timing is still returned, so that call sites need no checks, but is
+    neither filled in by the transports nor reported.
+    """
+    timing = Timing(backend, endpoint)
+    sink = _SINK
+    if sink is None:
+        yield timing
+        return
+
+    token = _timing.set(timing)
+    started = time.perf_counter()
+    try:
+        yield timing
+    except Exception as e:
+        # Not imported at the top: the CLI imports this module on every
+        # invocation, even those that never send anything.
+        from urllib.error import HTTPError
+
+        if isinstance(e, HTTPError):
+            timing.status = str(e.code)
+        raise
+    finally:
+        timing.total = time.perf_counter() - started
+        _timing.reset(token)
+        _report(sink, timing)
+
+
+def _report(sink: Sink, timing: Timing) -> None:
+    # Metrics must never fail the send they describe.
+    try:
+        sink(timing)
+    except Exception as e:
+        print("!! Could not report request timings:", file=sys.stderr)
+        print(e, file=sys.stderr)
+
+
+def print_timing(timing: Timing) -> None:
+    """
+    Sink that prints every Timing to stderr.
+    """
+    print(f"timing: {timing}", file=sys.stderr)
+
+
+class DogStatsdSink:
+    """
+    Sink that sends every Timing to DogStatsD over UDP: the total as
+    `<prefix>.total` and every phase as `<prefix>.<phase>`, in milliseconds,
+    tagged with the backend, endpoint and status. Datagrams that cannot be
+    sent are dropped, like any other StatsD client does.
+
+    Args:
+        host (str, optional): Defaults to $DD_AGENT_HOST or 127.0.0.1.
+        port (int, optional): Defaults to $DD_DOGSTATSD_PORT or 8125.
+        prefix (str, optional): Prefix of the metric names. Defaults to
+            "infra_event_notifier.request".
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        prefix: str = DEFAULT_METRIC_PREFIX,
+    ) -> None:
+        if host is None:
+            host = os.environ.get(STATSD_HOST_ENV) or DEFAULT_STATSD_HOST
+        if port is None:
+            port = int(os.environ.get(STATSD_PORT_ENV) or DEFAULT_STATSD_PORT)
+        self.address: Tuple[str, int] = (host, port)
+        self.prefix = prefix
+        self._socket: socket.socket | None = None
+
+    def _connect(self) -> socket.socket:
+        if self._socket is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            self._socket = sock
+        return self._socket
+
+    def datagram(self, timing: Timing) -> bytes:
+        """
+        Encodes a Timing as DogStatsD metrics, one per line.
+        """
+        tags = ",".join(f"{k}:{v}" for k, v in timing.tags.items())
+        values = [("total", timing.total)] + list(timing.phases.items())
+        return "\n".join(
+            f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms|#{tags}"
+            for name, seconds in values
+        ).encode()
+
+    def __call__(self, timing: Timing) -> None:
+        try:
+            self._connect().sendto(self.datagram(timing), self.address)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self) -> "DogStatsdSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,258 @@
+import contextvars
+import functools
+import hashlib
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+from infra_event_notifier.backends import timeouts
+from infra_event_notifier.backends.state import StateFile, runtime_path
+
+T = TypeVar("T")
+
+# Comfortably below the documented limits of the Datadog events API, the
+# Jira Cloud REST API and eng-pipes, while letting a short burst of events
+# from one deploy through at once.
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+# The Datadog events API takes far more than that. Used by the CLI and the
+# daemon, which only send to Datadog, so that bulk ingestion is not held to
+# the conservative default.
+DATADOG_RATE = 25.0
+DATADOG_BURST = 50
+
+# Bumped if the on-disk layout changes; files with another version are
+# ignored.
+_FILE_VERSION = 1
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter that paces requests to a backend API.
+
+    Each bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second; every send takes one token, or with wrap_requests() every HTTP
+    request of a send does, and waits until one is available.
+    Buckets are named, so one limiter can pace several backends
+    independently; with `per_key`, each API key of a backend gets its own
+    bucket too.
+
+    If `path` is given, bucket state lives in that file and is updated under
+    an exclusive lock, so that every process on the host using the same
+    path shares one budget.
+
+    Args:
+        rate (float, optional): Tokens added per second. Defaults to 5.
+        burst (int, optional): Bucket capacity. Defaults to 10.
+        path (str, optional): State file shared between processes.
+            Defaults to None (this process only).
+        per_key (bool, optional): Give every API key its own bucket rather
+            than sharing one per backend. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        path: str | None = None,
+        per_key: bool = False,
+    ) -> None:
+        assert rate > 0, "rate must be positive"
+        assert burst > 0, "burst must be positive"
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self.per_key = per_key
+        self._file = None if path is None else StateFile(path, _FILE_VERSION)
+        self._buckets: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, backend: str, api_key: str | None = None) -> str:
+        """
+        Name of the bucket that sends to `backend` with `api_key` draw from.
+        Keys are hashed so that they never end up in the state file.
+        """
+        if not self.per_key or api_key is None:
+            return backend
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        return f"{backend}:{digest[:16]}"
+
+    def acquire(self, bucket: str, timeout: float | None = None) -> None:
+        """
+        Takes a token from `bucket`, sleeping until one is available.
+
+        Raises RateLimitTimeout, without taking a token, if that would mean
+        waiting longer than `timeout` seconds, or than the time left before
+        the deadline of the send in progress.
+        """
+        wait = self._reserve(bucket, timeout)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(
+        self, bucket: str, timeout: float | None = None
+    ) -> None:
+        """
+        Same as acquire(), but waits without blocking the event loop.
+        """
+        import asyncio
+
+        wait = self._reserve(bucket, timeout)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def wrap(
+        self, fn: Callable[..., T], bucket: str, timeout: float | None = None
+    ) -> Callable[..., T]:
+        """
+        Returns a version of fn that takes a token from `bucket` before
+        every call.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            self.acquire(bucket, timeout)
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    def wrap_async(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        bucket: str,
+        timeout: float | None = None,
+    ) -> Callable[..., Awaitable[T]]:
+        """
+        Same as wrap(), for coroutine functions.
+        """
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            await self.acquire_async(bucket, timeout)
+            return await fn(*args, **kwargs)
+
+        return wrapper
+
+    def wrap_requests(
+        self, fn: Callable[..., T], bucket: str, timeout: float | None = None
+    ) -> Callable[..., T]:
+        """
+        Returns a version of fn that takes a token from `bucket` before
+        every HTTP request it makes, rather than once per call, for backends
+        that make several requests per send (see acquire_for_request()).
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = _SCOPE.set((self, bucket, timeout))
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+
+        return wrapper
+
+    def wrap_requests_async(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        bucket: str,
+        timeout: float | None = None,
+    ) -> Callable[..., Awaitable[T]]:
+        """
+        Same as wrap_requests(), for coroutine functions.
+        """
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = _SCOPE.set((self, bucket, timeout))
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+
+        return wrapper
+
+    def _reserve(self, bucket: str, timeout: float | None) -> float:
+        """
+        Takes a token and returns how long the caller must wait before
+        using it. Tokens may go negative: each waiter reserves its own slot
+        in the future, so nobody needs to retry under the lock.
+        """
+        left = timeouts.remaining()
+        if left is not None:
+            timeout = left if timeout is None else min(timeout, left)
+        with self._lock:
+            if self._file is None:
+                return self._take(self._buckets, bucket, timeout)
+            # An empty or damaged file just means every bucket starts out
+            # full.
+            with self._file.lock():
+                buckets = self._file.read().get("buckets", {})
+                wait = self._take(buckets, bucket, timeout)
+                self._file.write({"buckets": buckets})
+                return wait
+
+    def _take(
+        self,
+        buckets: Dict[str, Dict[str, float]],
+        bucket: str,
+        timeout: float | None,
+    ) -> float:
+        # Wall-clock time, since the state may be shared with processes
+        # that have their own monotonic clock.
+        now = time.time()
+        state = buckets.get(bucket)
+        if state is None:
+            tokens = float(self.burst)
+        else:
+            elapsed = max(0.0, now - state["updated"])
+            tokens = min(self.burst, state["tokens"] + elapsed * self.rate)
+        wait = max(0.0, (1 - tokens) / self.rate)
+        if timeout is not None and wait > timeout:
+            raise RateLimitTimeout(
+                f"No {bucket} rate limit token available within {timeout}s"
+            )
+        buckets[bucket] = {"tokens": tokens - 1, "updated": now}
+        return wait
+
+
+# The limiter, bucket and timeout every request of the send in progress
+# takes a token from, if it is paced per request. A context variable for the
+# same reasons as the scope of timeouts.Timeouts.
+_SCOPE: contextvars.ContextVar[
+    Tuple[RateLimiter, str, float | None] | None
+] = contextvars.ContextVar("infra_event_notifier_rate_limit", default=None)
+
+
+def acquire_for_request() -> None:
+    """
+    Takes a token for the next request of the send in progress if it is
+    paced per request (see RateLimiter.wrap_requests()). Called by backends
+    right before every request they make.
+    """
+    scope = _SCOPE.get()
+    if scope is not None:
+        limiter, bucket, timeout = scope
+        limiter.acquire(bucket, timeout)
+
+
+async def acquire_for_request_async() -> None:
+    """
+    Same as acquire_for_request(), but waits without blocking the event
+    loop.
+    """
+    scope = _SCOPE.get()
+    if scope is not None:
+        limiter, bucket, timeout = scope
+        await limiter.acquire_async(bucket, timeout)
+
+
+def default_state_path() -> str:
+    """
+    Per-user state file shared by every notifier process on the host.
+    """
+    return runtime_path("ratelimit")
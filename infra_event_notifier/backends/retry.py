@@ -0,0 +1,185 @@
+import functools
+import http.client
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, TypeVar
+from urllib.error import HTTPError, URLError
+
+from infra_event_notifier.backends import timeouts
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_DEADLINE = 15.0
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 5.0
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed send is tried again.
+
+    Retries on 429 and 5xx responses and on connection errors, up to
+    `max_attempts` tries in total and never past `deadline` seconds after the
+    first try, nor past the deadline of the send in progress (see
+    timeouts.Timeouts). Waits between tries grow exponentially from
+    `backoff` up to `max_backoff`, randomised with full jitter unless
+    `jitter` is False.
+    A server's Retry-After or X-RateLimit-Reset header takes precedence over
+    the computed wait.
+
+    Args:
+        max_attempts (int, optional): Maximum number of tries. Defaults to 3.
+        deadline (float, optional): Seconds after the first try after which
+            no new try is started. Defaults to 15.
+        backoff (float, optional): Wait before the first retry, in seconds.
+            Defaults to 0.5.
+        max_backoff (float, optional): Upper bound on the computed wait, in
+            seconds. Defaults to 5.
+        jitter (bool, optional): Randomise waits so that many clients
+            retrying at once spread out. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        deadline: float = DEFAULT_DEADLINE,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        jitter: bool = True,
+    ) -> None:
+        assert max_attempts > 0, "max_attempts must be positive"
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, timeouts.DeadlineExceeded):
+            return False
+        if isinstance(error, HTTPError):
+            return error.code == 429 or error.code >= 500
+        return isinstance(
+            error, (URLError, http.client.HTTPException, OSError)
+        )
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """
+        Seconds to wait after the given (1-based) failed attempt.
+        """
+        if isinstance(error, HTTPError) and error.headers is not None:
+            server_delay = _server_delay(error.headers, error.code == 429)
+            if server_delay is not None:
+                return server_delay
+        delay = min(self.max_backoff, self.backoff * 2.0 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _next_delay(
+        self, attempt: int, error: BaseException, started: float
+    ) -> float | None:
+        """
+        Returns how long to wait before trying again, or None to give up.
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        delay = self.delay(attempt, error)
+        if time.monotonic() + delay - started > self.deadline:
+            return None
+        # No point waiting for a try the send's own deadline would cut off.
+        left = timeouts.remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Calls fn(*args, **kwargs), retrying according to the policy.
+        The last error is raised if every try fails.
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(
+        self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        Same as call(), for coroutine functions.
+        """
+        import asyncio
+
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """
+        Returns a version of fn that retries according to the policy.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return self.call(fn, *args, **kwargs)
+
+        return wrapper
+
+    def wrap_async(
+        self, fn: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        """
+        Same as wrap(), for coroutine functions.
+        """
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call_async(fn, *args, **kwargs)
+
+        return wrapper
+
+
+def _server_delay(headers: Any, rate_limited: bool) -> float | None:
+    """
+    Reads how long the server asked us to wait from Retry-After (seconds or
+    an HTTP date) or, on a 429, Datadog's X-RateLimit-Reset (seconds until
+    the rate limit window resets).
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            when = None
+        if when is not None:
+            return max(0.0, when.timestamp() - time.time())
+
+    reset = headers.get("X-RateLimit-Reset")
+    if rate_limited and reset:
+        try:
+            return max(0.0, float(reset))
+        except ValueError:
+            pass
+    return None
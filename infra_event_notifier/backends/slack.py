@@ -2,11 +2,100 @@ import hashlib
 import hmac
 import json
 import urllib.request
+from typing import Tuple
 from urllib.error import HTTPError
 
+from infra_event_notifier.backends import metrics, transport
+
+_SOURCE = "infra-event-notifier"
+
+
+def _sign(eng_pipes_key: str, data: bytes) -> str:
+    return hmac.new(
+        bytes(eng_pipes_key, "utf-8"), msg=data, digestmod=hashlib.sha256
+    ).hexdigest()
+
+
+class NotificationTemplate:
+    """
+    Encodes and signs notifications for one eng-pipes key faster than
+    send_notification() does on its own, for senders of many of them.
+
+    The constant start of the payload is encoded once, and the HMAC is
+    keyed and fed that start once; every notification copies that state and
+    only hashes the rest. The signature still covers the whole body, and
+    both are the same as without the template.
+
+    Args:
+        eng_pipes_key (str): Secret Key used to HMAC sign requests
+    """
+
+    _START = b'{"source":' + json.dumps(_SOURCE).encode("utf-8") + b',"title":'
+
+    def __init__(self, eng_pipes_key: str) -> None:
+        self.eng_pipes_key = eng_pipes_key
+        self._mac = hmac.new(
+            bytes(eng_pipes_key, "utf-8"),
+            msg=self._START,
+            digestmod=hashlib.sha256,
+        )
+
+    def render(self, title: str, text: str) -> Tuple[bytes, str]:
+        """
+        Returns the payload of a notification and its signature.
+        """
+        # What json.dumps() does with a string, minus its per-call overhead.
+        quote = json.encoder.encode_basestring_ascii
+        rest = f'{quote(title)},"body":{quote(text)}}}'.encode("ascii")
+        mac = self._mac.copy()
+        mac.update(rest)
+        return self._START + rest, mac.hexdigest()
+
+
+def _notification_request(
+    title: str,
+    text: str,
+    eng_pipes_key: str,
+    eng_pipes_url: str,
+    template: NotificationTemplate | None = None,
+) -> urllib.request.Request:
+    if template is None:
+        payload = {"source": _SOURCE, "title": title, "body": text}
+        json_data = json.dumps(
+            payload, separators=(",", ":")
+        )  # must not allow whitespace in json string
+        data = json_data.encode("utf-8")
+        signature = _sign(eng_pipes_key, data)
+    else:
+        # Not an assert: it must hold under python -O too, or the request
+        # would be signed with the template's key.
+        if template.eng_pipes_key != eng_pipes_key:
+            raise ValueError("Template is for another eng-pipes key")
+        data, signature = template.render(title, text)
+    req = urllib.request.Request(eng_pipes_url, data=data)
+    req.add_header("x-infra-event-notifier-signature", signature)
+    req.add_header("Content-Type", "application/json; charset=utf-8")
+    return req
+
+
+def _check_response(response: transport.Response) -> None:
+    status = response.status
+    if status > 202:
+        raise HTTPError(
+            url=response.url,
+            code=status,
+            msg=f"Recieved {status} response from eng-pipes",
+            hdrs=response.headers,
+            fp=None,
+        )
+
 
 def send_notification(
-    title: str, text: str, eng_pipes_key: str, eng_pipes_url: str
+    title: str,
+    text: str,
+    eng_pipes_key: str,
+    eng_pipes_url: str,
+    template: NotificationTemplate | None = None,
 ) -> None:
     """
     Sends an event to Slack via eng-pipes.
@@ -17,25 +106,38 @@ def send_notification(
     :param channel_id: ID of the Slack channel to send the message to
     :param eng_pipes_key: Secret Key used to HMAC sign request
     :param eng_pipes_url: Full URL for eng-pipes slack webhooks
+    :param template: Signs the message faster, see NotificationTemplate.
+        Must be for `eng_pipes_key`, or ValueError is raised.
     """
-    payload = {"source": "infra-event-notifier", "title": title, "body": text}
-    json_data = json.dumps(
-        payload, separators=(",", ":")
-    )  # must not allow whitespace in json string
-    data = json_data.encode("utf-8")
-    req = urllib.request.Request(eng_pipes_url, data=data)
-    signature = hmac.new(
-        bytes(eng_pipes_key, "utf-8"), msg=data, digestmod=hashlib.sha256
-    ).hexdigest()
-    req.add_header("x-infra-event-notifier-signature", signature)
-    req.add_header("Content-Type", "application/json; charset=utf-8")
-    with urllib.request.urlopen(req) as response:
-        status = response.status
-        if status > 202:
-            raise HTTPError(
-                url=response.url,
-                code=status,
-                msg=f"Recieved {status} response from Datadog",
-                hdrs=response.headers,
-                fp=None,
+    with metrics.measure("slack", "notification") as timing:
+        with timing.phase("encode"):
+            req = _notification_request(
+                title, text, eng_pipes_key, eng_pipes_url, template
+            )
+        with transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_response(response)
+
+
+async def send_notification_async(
+    title: str,
+    text: str,
+    eng_pipes_key: str,
+    eng_pipes_url: str,
+    template: NotificationTemplate | None = None,
+) -> None:
+    """
+    Sends an event to Slack via eng-pipes without blocking the event loop.
+    Takes the same arguments as send_notification().
+    """
+    # Pulls in asyncio, which synchronous callers should not pay for.
+    from infra_event_notifier.backends import async_transport
+
+    with metrics.measure("slack", "notification") as timing:
+        with timing.phase("encode"):
+            req = _notification_request(
+                title, text, eng_pipes_key, eng_pipes_url, template
             )
+        with await async_transport.urlopen(req) as response:
+            timing.status = str(response.status)
+            _check_response(response)
@@ -0,0 +1,139 @@
+import fcntl
+import json
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+RUNTIME_DIR_ENV = "INFRA_EVENT_NOTIFIER_RUNTIME_DIR"
+
+
+class StateFile:
+    """
+    JSON file holding state shared by the notifier processes on a host.
+
+    Writers take `lock()` around reading, changing and writing the state,
+    so that concurrent updates are not lost. The file is replaced rather
+    than rewritten, so read() never sees a half-written file and needs no
+    lock. A missing or damaged file, or one written with another `version`,
+    reads as empty.
+
+    The directory of the file is created if needed and must be private to
+    the current user (see private_dir()), and neither the file nor its lock
+    file may be a symlink, so that other users can neither plant nor read
+    the state.
+
+    Args:
+        path (str): Path of the file
+        version (int): Version of the layout of the state. Bumped when it
+            changes, so that files in the old layout are ignored.
+    """
+
+    def __init__(self, path: str, version: int) -> None:
+        self.path = path
+        self.version = version
+        self._directory: str | None = None
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Holds an exclusive lock on the state for the body of the with
+        statement.
+        """
+        self._check_directory()
+        fd = os.open(
+            f"{self.path}.lock",
+            os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC,
+            0o600,
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def read(self) -> Dict[str, Any]:
+        self._check_directory()
+        try:
+            fd = os.open(self.path, os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC)
+            with os.fdopen(fd) as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return {}
+        del data["version"]
+        return data
+
+    def write(self, data: Dict[str, Any]) -> None:
+        directory = self._check_directory()
+        # Write to a temporary file and rename it over the old one so that
+        # readers never see a half-written file.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump({"version": self.version, **data}, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _check_directory(self) -> str:
+        # Checked once: a directory cannot change owners behind our back.
+        if self._directory is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            self._directory = private_dir(directory)
+        return self._directory
+
+
+def runtime_dir() -> str:
+    """
+    Per-user directory of the files shared by every notifier process on
+    the host: $INFRA_EVENT_NOTIFIER_RUNTIME_DIR if set, otherwise a
+    directory in $XDG_RUNTIME_DIR or, failing that, in /tmp. Only created
+    once something is written to it.
+    """
+    path = os.environ.get(RUNTIME_DIR_ENV)
+    if path:
+        return path
+    xdg_runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg_runtime_dir:
+        return os.path.join(xdg_runtime_dir, "infra-event-notifier")
+    return f"/tmp/infra-event-notifier-{os.getuid()}"
+
+
+def runtime_path(name: str) -> str:
+    """
+    Path of `name` in runtime_dir().
+    """
+    return os.path.join(runtime_dir(), name)
+
+
+def check_private_dir(path: str) -> None:
+    """
+    Raises PermissionError unless `path` is a directory, not a symlink to
+    one, owned by the current user and writable by nobody else. Anyone else
+    who can write to a directory can swap the files in it.
+    """
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(
+            f"{path} must be owned by the current user and writable by "
+            "nobody else"
+        )
+
+
+def private_dir(path: str) -> str:
+    """
+    Creates the directory `path`, readable by the current user only, unless
+    it exists, then checks it with check_private_dir(). Returns the path.
+
+    A directory with a guessable name in /tmp may have been created by
+    another user first; it is refused rather than used.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    check_private_dir(path)
+    return path
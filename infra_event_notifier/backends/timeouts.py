@@ -0,0 +1,146 @@
+import contextvars
+import functools
+import os
+import time
+from typing import Any, Awaitable, Callable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CONNECT_TIMEOUT_ENV = "INFRA_EVENT_NOTIFIER_CONNECT_TIMEOUT"
+READ_TIMEOUT_ENV = "INFRA_EVENT_NOTIFIER_READ_TIMEOUT"
+DEADLINE_ENV = "INFRA_EVENT_NOTIFIER_DEADLINE"
+
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 10.0
+# Upper bound on a whole send, retries and rate limiting included. Picked to
+# fit in the latency budget of a terragrunt hook.
+DEFAULT_DEADLINE = 30.0
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def _from_env(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"${name} must be a number of seconds, not {value!r}")
+
+
+class Timeouts:
+    """
+    Time limits for sends.
+
+    `connect` bounds opening a connection (including the TLS handshake) and
+    `read` bounds each wait for the server once connected. `deadline` bounds
+    a whole send: every request it makes, the retries between them and any
+    wait for a rate limit token. Limits left as None are read from
+    $INFRA_EVENT_NOTIFIER_CONNECT_TIMEOUT, $INFRA_EVENT_NOTIFIER_READ_TIMEOUT
+    and $INFRA_EVENT_NOTIFIER_DEADLINE, falling back to the defaults.
+
+    Args:
+        connect (float, optional): Seconds. Defaults to 3.
+        read (float, optional): Seconds. Defaults to 10.
+        deadline (float, optional): Seconds. Defaults to 30.
+    """
+
+    def __init__(
+        self,
+        connect: float | None = None,
+        read: float | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        if connect is None:
+            connect = _from_env(CONNECT_TIMEOUT_ENV, DEFAULT_CONNECT_TIMEOUT)
+        if read is None:
+            read = _from_env(READ_TIMEOUT_ENV, DEFAULT_READ_TIMEOUT)
+        if deadline is None:
+            deadline = _from_env(DEADLINE_ENV, DEFAULT_DEADLINE)
+        assert connect > 0, "connect timeout must be positive"
+        assert read > 0, "read timeout must be positive"
+        assert deadline > 0, "deadline must be positive"
+        self.connect = connect
+        self.read = read
+        self.deadline = deadline
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """
+        Returns a version of fn whose requests use these limits, and which
+        fails with DeadlineExceeded once `deadline` seconds have passed.
+        """
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = self._start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+
+        return wrapper
+
+    def wrap_async(
+        self, fn: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        """
+        Same as wrap(), for coroutine functions.
+        """
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = self._start()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+
+        return wrapper
+
+    def _start(self) -> "contextvars.Token[Tuple[Timeouts, float] | None]":
+        expires = time.monotonic() + self.deadline
+        current = _SCOPE.get()
+        # A nested send never outlives the one it is part of.
+        if current is not None:
+            expires = min(expires, current[1])
+        return _SCOPE.set((self, expires))
+
+
+# The limits of the send in progress and the monotonic time its deadline
+# expires at. A context variable so that the backends do not have to pass
+# them down through every helper; it follows asyncio tasks and
+# asyncio.to_thread() calls.
+_SCOPE: contextvars.ContextVar[Tuple[Timeouts, float] | None] = (
+    contextvars.ContextVar("infra_event_notifier_timeouts", default=None)
+)
+
+
+def remaining() -> float | None:
+    """
+    Seconds left before the deadline of the send in progress, or None if
+    there is no deadline.
+    """
+    scope = _SCOPE.get()
+    if scope is None:
+        return None
+    return scope[1] - time.monotonic()
+
+
+def request_timeouts() -> Tuple[float, float]:
+    """
+    Connect and read timeouts for the next request, shortened to the time
+    left before the deadline. Raises DeadlineExceeded if there is none left.
+    """
+    scope = _SCOPE.get()
+    timeouts = Timeouts() if scope is None else scope[0]
+    left = remaining()
+    if left is None:
+        return timeouts.connect, timeouts.read
+    if left <= 0:
+        raise DeadlineExceeded(
+            f"Send did not finish within {timeouts.deadline}s"
+        )
+    return min(timeouts.connect, left), min(timeouts.read, left)
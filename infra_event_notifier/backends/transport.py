@@ -0,0 +1,340 @@
+import http.client
+import io
+import select
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.request
+from email.message import Message
+from typing import Any, Dict, List, Protocol, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+from infra_event_notifier.backends import metrics, timeouts
+
+# Errors raised by http.client when the server has closed an idle keep-alive
+# connection behind our back. If sending the request failed this way, the
+# server never got it, so it is safe to send it again. If only reading the
+# response did, the server may have acted on the request before closing the
+# connection, so only requests that are safe to repeat are sent again.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_IDEMPOTENT_METHODS = frozenset(
+    ["GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"]
+)
+
+PoolKey = Tuple[str, str, int]
+
+
+class Response:
+    """
+    Fully read HTTP response returned by urlopen().
+
+    Mirrors the parts of the urllib response object that the backends use,
+    including being usable as a context manager, so that call sites read the
+    same whether the request went through the pool or through urllib.
+    """
+
+    def __init__(
+        self, url: str, status: int, reason: str, headers: Message, body: bytes
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class Transport(Protocol):
+    """
+    What the backends send their requests through. ConnectionPool is the
+    default; tests and benchmarks install others with set_transport().
+    """
+
+    def urlopen(self, req: Request) -> Response: ...
+
+
+class ConnectionPool:
+    """
+    Keeps idle keep-alive connections per (scheme, host, port) so that
+    consecutive requests to the same API skip the TCP and TLS handshakes.
+
+    Connections are checked out for the duration of a single request, so the
+    pool is safe to share between threads. At most `maxsize` idle connections
+    are kept per host; extra ones are closed when they are returned.
+
+    Args:
+        maxsize (int, optional): Idle connections kept per host. Defaults
+            to 4.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self._idle: Dict[PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, key: PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return _TimedHTTPSConnection(host, port)
+        return _TimedHTTPConnection(host, port)
+
+    def _acquire(
+        self, key: PoolKey
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Returns an idle connection for the host if there is one, otherwise a
+        new one. The second element tells whether the connection was reused.
+        Idle connections the server has closed in the meantime are dropped.
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    break
+                conn = idle.pop()
+            if not _closed_by_server(conn):
+                return conn, True
+            conn.close()
+        return self._new_connection(key), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self) -> None:
+        """
+        Closes all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def urlopen(self, req: Request) -> Response:
+        """
+        Sends the request over a pooled connection and returns the response.
+
+        Like urllib.request.urlopen(), raises HTTPError for 4xx/5xx statuses.
+        Requests that go through a proxy are handed to urllib, which knows how
+        to talk to it.
+
+        Connecting and every wait on the socket are bounded by the timeouts
+        of the send in progress (see timeouts.Timeouts). If the call is
+        timed (see metrics.measure()), the time spent in every phase of the
+        request is added to its Timing.
+        """
+        parts = urlsplit(req.full_url)
+        if parts.scheme not in ("http", "https") or _uses_proxy(req):
+            return _urllib_urlopen(req, timeouts.request_timeouts()[1])
+
+        default_port = 443 if parts.scheme == "https" else 80
+        key: PoolKey = (
+            parts.scheme,
+            parts.hostname or "",
+            parts.port or default_port,
+        )
+        path = req.selector
+        headers = dict(req.header_items())
+        timing = metrics.current()
+
+        method = req.get_method()
+        while True:
+            connect_timeout, read_timeout = timeouts.request_timeouts()
+            conn, reused = self._acquire(key)
+            sent = False
+            try:
+                if conn.sock is None:
+                    conn.timeout = connect_timeout
+                    conn.connect()
+                conn.sock.settimeout(read_timeout)
+                started = time.perf_counter()
+                conn.request(method, path, body=req.data, headers=headers)
+                sent = True
+                raw = conn.getresponse()
+                answered = time.perf_counter()
+                body = raw.read()
+                if timing is not None:
+                    timing.add("server", answered - started)
+                    timing.add("read", time.perf_counter() - answered)
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and (not sent or method in _IDEMPOTENT_METHODS):
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if raw.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        response = Response(
+            req.full_url, raw.status, raw.reason, raw.headers, body
+        )
+        if raw.status >= 400:
+            raise HTTPError(
+                url=req.full_url,
+                code=raw.status,
+                msg=raw.reason,
+                hdrs=raw.headers,
+                fp=io.BytesIO(body),
+            )
+        return response
+
+
+class _TimedHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTPConnection that, when the call in progress is timed (see
+    metrics.measure()), adds the time spent resolving the host and opening
+    the socket to its Timing.
+    """
+
+    def connect(self) -> None:
+        timing = metrics.current()
+        if timing is None:
+            super().connect()
+            return
+        sys.audit("http.client.connect", self, self.host, self.port)
+        self.sock = _timed_socket(timing, self.host, self.port, self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _TimedHTTPSConnection(http.client.HTTPSConnection):
+    """
+    Same as _TimedHTTPConnection, also timing the TLS handshake.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        # Kept here, since HTTPSConnection only keeps it privately.
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.set_alpn_protocols(["http/1.1"])
+        super().__init__(host, port, context=self.ssl_context)
+
+    def connect(self) -> None:
+        timing = metrics.current()
+        if timing is None:
+            super().connect()
+            return
+        sys.audit("http.client.connect", self, self.host, self.port)
+        sock = _timed_socket(timing, self.host, self.port, self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with timing.phase("tls"):
+            self.sock = self.ssl_context.wrap_socket(
+                sock, server_hostname=self.host
+            )
+
+
+def _timed_socket(
+    timing: metrics.Timing, host: str, port: int, timeout: float | None
+) -> socket.socket:
+    """
+    Opens a socket like socket.create_connection(), adding the time spent
+    resolving the host and connecting to timing.
+    """
+    with timing.phase("dns"):
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    with timing.phase("connect"):
+        return _connect_any(addresses, timeout)
+
+
+def _connect_any(
+    addresses: List[Tuple[Any, ...]], timeout: float | None
+) -> socket.socket:
+    """
+    Connects to the first of the resolved addresses that accepts, like
+    socket.create_connection() does.
+    """
+    error: OSError | None = None
+    for family, kind, proto, _, sockaddr in addresses:
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    assert error is not None, "getaddrinfo() returned no addresses"
+    raise error
+
+
+def _closed_by_server(conn: http.client.HTTPConnection) -> bool:
+    """
+    Tells whether the server has closed an idle connection. Nothing is due
+    on an idle connection, so if its socket is readable, the server either
+    closed it or sent something unasked; either way it cannot be reused.
+    """
+    if conn.sock is None:
+        return False
+    poller = select.poll()
+    poller.register(conn.sock, select.POLLIN)
+    return bool(poller.poll(0))
+
+
+def _uses_proxy(req: Request) -> bool:
+    proxies = urllib.request.getproxies()
+    if req.type not in proxies:
+        return False
+    return not urllib.request.proxy_bypass(req.host)
+
+
+def _urllib_urlopen(req: Request, timeout: float) -> Response:
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return Response(
+            response.url,
+            response.status,
+            response.reason,
+            response.headers,
+            response.read(),
+        )
+
+
+# Shared by every backend, so all sends in a process reuse the same
+# connections.
+_POOL = ConnectionPool()
+_TRANSPORT: Transport = _POOL
+
+
+def set_transport(transport: Transport | None) -> Transport:
+    """
+    Makes every backend send through `transport`, or through the
+    process-wide connection pool again if it is None. Returns the transport
+    it replaces, so that callers can restore it.
+    """
+    global _TRANSPORT
+    previous = _TRANSPORT
+    _TRANSPORT = _POOL if transport is None else transport
+    return previous
+
+
+def urlopen(req: Request) -> Response:
+    """
+    Sends the request through the current transport, by default the
+    process-wide connection pool.
+    """
+    return _TRANSPORT.urlopen(req)
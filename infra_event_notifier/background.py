@@ -0,0 +1,171 @@
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+DEFAULT_WORKERS = 1
+# How long the interpreter waits at exit for queued sends to go out.
+DEFAULT_EXIT_TIMEOUT = 5.0
+
+Task = Tuple[Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+
+
+class QueueFullPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+
+
+class BackgroundSender:
+    """
+    Sends notifications from worker threads fed by a bounded queue, so that
+    callers do not wait on the remote API.
+
+    Pass an instance as `background` to a notifier to make its send() return
+    as soon as the event is queued. Queued sends are drained for up to
+    `exit_timeout` seconds when the interpreter exits. Failed sends are
+    reported on stderr and counted in `errors`; sends discarded because the
+    queue was full are counted in `dropped`.
+
+    Args:
+        maxsize (int, optional): Maximum number of queued sends.
+            Defaults to 1000.
+        workers (int, optional): Number of worker threads. Defaults to 1.
+        policy (QueueFullPolicy, optional): What submit() does when the
+            queue is full: discard the oldest queued send, discard the new
+            one, or wait for room. Defaults to DROP_OLDEST.
+        exit_timeout (float, optional): Seconds to wait at exit for queued
+            sends. Defaults to 5.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAX_QUEUE_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        policy: QueueFullPolicy = QueueFullPolicy.DROP_OLDEST,
+        exit_timeout: float = DEFAULT_EXIT_TIMEOUT,
+    ) -> None:
+        assert maxsize > 0, "maxsize must be positive"
+        assert workers > 0, "workers must be positive"
+        self.maxsize = maxsize
+        self.workers = workers
+        self.policy = policy
+        self.exit_timeout = exit_timeout
+        self.dropped = 0
+        self.errors = 0
+        self._queue: Deque[Task] = deque()
+        # Queued sends plus sends currently running in a worker.
+        self._unfinished = 0
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self._cond = threading.Condition()
+        atexit.register(self._drain_at_exit)
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> bool:
+        """
+        Queues fn(*args, **kwargs) to run on a worker thread.
+
+        Returns False if the call was discarded because the queue was full
+        or the sender was closed.
+        """
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.policy == QueueFullPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.policy == QueueFullPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.maxsize:
+                        self._cond.wait()
+                        if self._closed:
+                            self.dropped += 1
+                            return False
+            self._queue.append((fn, args, kwargs))
+            self._unfinished += 1
+            self._start_workers()
+            self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Waits until every queued send has finished.
+
+        Returns False if sends were still pending after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._unfinished:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None) -> bool:
+        """
+        Stops accepting sends, waits up to `timeout` seconds for the queued
+        ones, and stops the workers.
+
+        Returns False if sends were still pending after `timeout` seconds.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        drained = self.flush(timeout)
+        atexit.unregister(self._drain_at_exit)
+        return drained
+
+    def _drain_at_exit(self) -> None:
+        if not self.close(self.exit_timeout):
+            print(
+                f"!! Exited with {self._unfinished} notifications unsent.",
+                file=sys.stderr,
+            )
+
+    def _start_workers(self) -> None:
+        # Called with self._cond held.
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name="infra-event-notifier", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                fn, args, kwargs = self._queue.popleft()
+                # Wake submitters blocked on a full queue.
+                self._cond.notify_all()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                with self._cond:
+                    self.errors += 1
+                print(
+                    "!! Could not send a background notification:",
+                    file=sys.stderr,
+                )
+                print(e, file=sys.stderr)
+            finally:
+                with self._cond:
+                    self._unfinished -= 1
+                    self._cond.notify_all()
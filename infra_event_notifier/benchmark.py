@@ -0,0 +1,174 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from infra_event_notifier.backends import transport
+from infra_event_notifier.backends.jira import IssueType
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.datadog_notifier import DatadogNotifier
+from infra_event_notifier.fake_api import FakeApiServer
+from infra_event_notifier.jira_notifier import JiraNotifier
+from infra_event_notifier.slack_notifier import SlackNotifier
+
+# Sends the n-th event of a benchmark run.
+Sender = Callable[[int], None]
+
+BACKENDS = ("datadog", "slack", "jira")
+
+
+class BenchmarkResult:
+    """
+    Outcome of driving one notifier with run().
+
+    Args:
+        backend (str): Name of the backend
+        latencies (List[float]): Seconds every successful send took
+        failed (int): Number of sends that raised
+        elapsed (float): Seconds the whole run took
+    """
+
+    def __init__(
+        self, backend: str, latencies: List[float], failed: int, elapsed: float
+    ) -> None:
+        self.backend = backend
+        self.latencies = sorted(latencies)
+        self.failed = failed
+        self.elapsed = elapsed
+
+    def percentile(self, q: float) -> float:
+        """
+        Latency in seconds below which a fraction `q` of sends completed.
+        """
+        if not self.latencies:
+            return 0.0
+        rank = max(0, round(q * len(self.latencies)) - 1)
+        return self.latencies[min(rank, len(self.latencies) - 1)]
+
+    @property
+    def events_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.backend}: {len(self.latencies)} sent, {self.failed} "
+            f"failed, p50 {self.percentile(0.5) * 1000:.1f}ms, "
+            f"p99 {self.percentile(0.99) * 1000:.1f}ms, "
+            f"{self.events_per_second:.1f} events/s"
+        )
+
+
+def run(
+    backend: str, send: Sender, events: int, concurrency: int
+) -> BenchmarkResult:
+    """
+    Calls send(n) for n in range(events), `concurrency` at a time, and
+    measures how long each call takes.
+    """
+    latencies: List[float] = []
+    failed = 0
+
+    def timed(n: int) -> float | None:
+        started = time.perf_counter()
+        try:
+            send(n)
+        except Exception:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(timed, range(events)):
+            if latency is None:
+                failed += 1
+            else:
+                latencies.append(latency)
+    return BenchmarkResult(
+        backend, latencies, failed, time.perf_counter() - started
+    )
+
+
+def senders(server: FakeApiServer) -> Dict[str, Sender]:
+    """
+    Returns a sender for every backend, each going through its notifier
+    with a default RetryPolicy. Requests must be sent to `server`, e.g. by
+    installing its transport().
+    """
+    datadog = DatadogNotifier("fake-api-key", retry_policy=RetryPolicy())
+    slack = SlackNotifier(
+        "fake-eng-pipes-key",
+        f"{server.url}/eng-pipes",
+        retry_policy=RetryPolicy(),
+    )
+    jira = JiraNotifier(
+        "fake-api-key",
+        server.url,
+        "FAKE",
+        "benchmark@example.com",
+        retry_policy=RetryPolicy(),
+    )
+    return {
+        "datadog": lambda n: datadog.send(
+            title=f"Benchmark event {n}", body="body", tags={"n": str(n)}
+        ),
+        "slack": lambda n: slack.send(
+            title=f"Benchmark event {n}", body="body"
+        ),
+        "jira": lambda n: jira.send(
+            title=f"Benchmark event {n}",
+            body="body",
+            issue_type=IssueType.TASK,
+            tags={"n": str(n)},
+        ),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m infra_event_notifier.benchmark",
+        description=(
+            "Drives the notifiers against a local fake of Datadog, Jira and "
+            "eng-pipes, and reports p50/p99 latency and throughput."
+        ),
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, action="append", dest="backends"
+    )
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds the fake API waits before every response.",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with a 429.",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with a 503.",
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    with FakeApiServer(
+        args.latency, args.throttle_rate, args.error_rate, args.seed
+    ) as server:
+        previous = transport.set_transport(server.transport())
+        try:
+            for backend, send in senders(server).items():
+                if args.backends and backend not in args.backends:
+                    continue
+                print(run(backend, send, args.events, args.concurrency))
+        finally:
+            transport.set_transport(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import argparse
+import time
 from abc import ABC, abstractmethod
-from typing import Any, TypeAlias
+from typing import Any, Callable, TypeAlias
+
+# Everything that talks to the network, the spool or the daemon is imported
+# inside the functions that need it: this module is loaded by every
+# invocation before argparse has picked a subcommand.
 
 Subparsers: TypeAlias = "argparse._SubParsersAction[argparse.ArgumentParser]"
 
@@ -26,6 +31,236 @@ def add_dryrun(parser: argparse.ArgumentParser, submenu: bool) -> None:
     )
 
 
+def add_timings(parser: argparse.ArgumentParser, submenu: bool) -> None:
+    """
+    Helper function to register the flags that report how long every
+    request to a backend took. Like --dry-run, they are accepted before or
+    after the subcommand.
+    """
+    add_arg_kwargs: dict[str, Any] = {}
+    if submenu:
+        add_arg_kwargs["default"] = argparse.SUPPRESS
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "Print how long every request took, broken down into DNS, "
+            "connect, TLS, server time and encoding, to stderr."
+        ),
+        **add_arg_kwargs,
+    )
+    parser.add_argument(
+        "--statsd",
+        action="store_true",
+        help=(
+            "Send request timings to DogStatsD at $DD_AGENT_HOST and "
+            "$DD_DOGSTATSD_PORT, by default 127.0.0.1:8125."
+        ),
+        **add_arg_kwargs,
+    )
+
+
+def install_timings(args: argparse.Namespace) -> None:
+    """
+    Reports request timings where the flags registered by add_timings()
+    asked for them.
+    """
+    if not (args.timings or args.statsd):
+        return
+    from infra_event_notifier.backends import metrics
+
+    sinks: list[metrics.Sink] = []
+    if args.timings:
+        sinks.append(metrics.print_timing)
+    if args.statsd:
+        sinks.append(metrics.DogStatsdSink())
+
+    def report(timing: metrics.Timing) -> None:
+        for sink in sinks:
+            sink(timing)
+
+    metrics.set_sink(report)
+
+
+def add_socket(parser: argparse.ArgumentParser) -> None:
+    """
+    Helper function to register the flag that hands events to a running
+    `infra-event-notifier serve` daemon.
+    """
+    from infra_event_notifier.daemon import SOCKET_ENV, default_socket_path
+
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=default_socket_path(),
+        help=(
+            "Hand the event to the daemon listening on this Unix socket, "
+            "sending it directly if no daemon is running. Defaults to "
+            f"${SOCKET_ENV}, or else the socket `serve` listens on by "
+            'default. Pass "" to always send directly.'
+        ),
+    )
+
+
+def add_spool(parser: argparse.ArgumentParser) -> None:
+    """
+    Helper function to register the flag that picks the spool of
+    undelivered events.
+    """
+    from infra_event_notifier.spool import SPOOL_ENV, default_spool_path
+
+    parser.add_argument(
+        "--spool",
+        type=str,
+        default=default_spool_path(),
+        help=(
+            "File that keeps events until Datadog accepted them, for "
+            "`flush-spool` to replay. Pass an empty string to disable. "
+            f"Defaults to ${SPOOL_ENV} or a per-user file."
+        ),
+    )
+
+
+def add_dedup(parser: argparse.ArgumentParser) -> None:
+    """
+    Helper function to register the flag that suppresses repeats of an
+    event sent shortly before, by this or another invocation.
+    """
+    from infra_event_notifier.backends.dedup import WINDOW_ENV, window_from_env
+
+    parser.add_argument(
+        "--dedup-window",
+        type=float,
+        default=window_from_env(),
+        help=(
+            "Skip an event if an identical one was reported less than this "
+            "many seconds ago, by this or another invocation. "
+            f"Defaults to ${WINDOW_ENV} or 0 (disabled)."
+        ),
+    )
+
+
+def datadog_sender() -> Callable[..., None]:
+    """
+    Returns backends.datadog.send_event() wrapped the way the CLI sends
+    events: paced by a rate limiter shared by every invocation on the host,
+    so that parallel runs do not trip Datadog's rate limit, retried when
+    throttled or failed, and bounded by Timeouts(), so that a hung API
+    cannot stall the caller (see backends.timeouts for the environment
+    variables that configure it). Events go to the Datadog site in
+    $DD_SITE, US1 by default.
+    """
+    from infra_event_notifier.backends import datadog
+    from infra_event_notifier.backends.rate_limit import (
+        DATADOG_BURST,
+        DATADOG_RATE,
+        RateLimiter,
+        default_state_path,
+    )
+    from infra_event_notifier.backends.retry import RetryPolicy
+    from infra_event_notifier.backends.timeouts import Timeouts
+
+    limiter = RateLimiter(
+        DATADOG_RATE, DATADOG_BURST, path=default_state_path()
+    )
+    send = limiter.wrap(datadog.send_event, limiter.bucket("datadog"))
+    return Timeouts().wrap(RetryPolicy().wrap(send))
+
+
+def report_event(
+    args: argparse.Namespace, api_key: str, send_kwargs: dict[str, Any]
+) -> None:
+    """
+    Sends a Datadog event built by a subcommand, or prints it on a dry run.
+
+    Reporting is best-effort: failed sends are printed, not raised, so that
+    they never fail the tool that invoked us (see datadog_sender() for how
+    events are sent). The event is written to the spool first and only
+    removed from it once Datadog accepted it, so a failed send is replayed
+    by `flush-spool` later. With --dedup-window, an event identical to one
+    reported shortly before is skipped, with a note saying so.
+    """
+    if args.dry_run:
+        import pprint
+
+        print("Would admit the following event:")
+        pprint.pp(send_kwargs)
+        return
+
+    deduplicator = None
+    if args.dedup_window > 0:
+        from infra_event_notifier.backends import dedup
+
+        deduplicator = dedup.Deduplicator(
+            args.dedup_window, path=dedup.default_state_path()
+        )
+        fingerprint = deduplicator.fingerprint(
+            "datadog",
+            send_kwargs["title"],
+            send_kwargs["text"],
+            send_kwargs["tags"],
+        )
+        if not deduplicator.admit(fingerprint):
+            print(
+                "Not reporting the event: an identical one was reported in "
+                f"the last {args.dedup_window:g}s."
+            )
+            return
+
+    from infra_event_notifier.spool import Spool
+
+    spool = Spool(args.spool) if args.spool else None
+    in_flight = None
+    entry_id = None
+    if spool is not None:
+        # Stamped now, so that a replay says when the event happened, and
+        # does not take it for an identical event from another time.
+        send_kwargs = {"date_happened": int(time.time()), **send_kwargs}
+        try:
+            # Keeps `flush-spool` from sending the event too while it is
+            # sent from here.
+            in_flight = spool.in_flight()
+            entry_id = spool.append(send_kwargs)
+        except OSError as e:
+            print("!! Could not write the event to the spool:")
+            print(e)
+
+    try:
+        if args.socket:
+            from infra_event_notifier.daemon import send_event_via_daemon
+
+            if send_event_via_daemon(
+                args.socket,
+                spool_entry=(args.spool, entry_id) if entry_id else None,
+                datadog_api_key=api_key,
+                **send_kwargs,
+            ):
+                return
+
+        try:
+            datadog_sender()(datadog_api_key=api_key, **send_kwargs)
+        except Exception as e:
+            print("!! Could not report an event to DataDog:")
+            print(e)
+            if entry_id is not None:
+                print(f"The event was kept in {args.spool} for `flush-spool`.")
+            elif deduplicator is not None:
+                # Nothing will replay it, so let the next invocation try
+                # again.
+                deduplicator.forget(fingerprint)
+            return
+
+        if spool is not None and entry_id is not None:
+            try:
+                spool.ack(entry_id)
+            except OSError as e:
+                print("!! Could not remove the sent event from the spool:")
+                print(e)
+    finally:
+        if in_flight is not None:
+            in_flight.release()
+
+
 class BaseCommand(ABC):
 
     @classmethod
@@ -41,6 +276,7 @@ class BaseCommand(ABC):
             self.name(), description=self.description()
         )
         parser.set_defaults(func=self.execute)
+        add_timings(parser, True)
         return parser
 
     @abstractmethod
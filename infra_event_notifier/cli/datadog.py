@@ -1,6 +1,5 @@
 import argparse
 import sys
-import pprint
 from typing import Any
 
 if sys.version_info >= (3, 12):
@@ -11,7 +10,11 @@ else:
 from infra_event_notifier.cli.command import (
     BaseCommand,
     Subparsers,
+    add_dedup,
     add_dryrun,
+    add_socket,
+    add_spool,
+    report_event,
 )
 from infra_event_notifier.backends import datadog
 
@@ -43,6 +46,9 @@ class DatadogCommand(BaseCommand):
             action="append",
         )
         add_dryrun(parser, True)
+        add_socket(parser)
+        add_spool(parser)
+        add_dedup(parser)
 
         return parser
 
@@ -85,12 +91,4 @@ class DatadogCommand(BaseCommand):
         }
         api_key = datadog.api_key_from_env()
 
-        if args.dry_run:
-            print("Would admit the following event:")
-            pprint.pp(send_kwargs)
-        else:
-            try:
-                datadog.send_event(datadog_api_key=api_key, **send_kwargs)
-            except Exception as e:
-                print("!! Could not report an event to DataDog:")
-                print(e)
+        report_event(args, api_key, send_kwargs)
@@ -0,0 +1,68 @@
+import argparse
+import sys
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import override
+
+from infra_event_notifier import spool
+from infra_event_notifier.backends import datadog
+from infra_event_notifier.cli.command import (
+    BaseCommand,
+    Subparsers,
+    add_dryrun,
+    add_spool,
+    datadog_sender,
+)
+
+
+class FlushSpoolCommand(BaseCommand):
+    @classmethod
+    @override
+    def name(cls) -> str:
+        return "flush-spool"
+
+    @classmethod
+    @override
+    def description(cls) -> str:
+        return "Send the events that earlier invocations could not deliver"
+
+    @override
+    def submenu(self, subparsers: Subparsers) -> argparse.ArgumentParser:
+        parser = super().submenu(subparsers)
+        add_spool(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of events sent concurrently.",
+        )
+        add_dryrun(parser, True)
+
+        return parser
+
+    @override
+    def execute(self, args: argparse.Namespace) -> None:
+        """
+        Replays the spool, exiting with status 1 if events are left in it.
+        """
+        if args.dry_run:
+            pending = spool.Spool(args.spool).pending()
+            print(f"Would send {len(pending)} spooled events.")
+            return
+
+        api_key = datadog.api_key_from_env()
+        send = datadog_sender()
+        try:
+            delivered, failed = spool.replay(
+                spool.Spool(args.spool),
+                lambda **kwargs: send(datadog_api_key=api_key, **kwargs),
+                args.workers,
+            )
+        except spool.SpoolBusy as e:
+            print(f"!! {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Sent {delivered} spooled events, {failed} left.")
+        if failed:
+            sys.exit(1)
@@ -0,0 +1,253 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Iterable, Iterator, Set, TextIO, Tuple
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import override
+
+from infra_event_notifier.backends import datadog
+from infra_event_notifier.cli.command import (
+    BaseCommand,
+    Subparsers,
+    add_dryrun,
+    datadog_sender,
+)
+from infra_event_notifier.cli.datadog import DEFAULT_EVENT_SOURCE
+
+DEFAULT_MAX_IN_FLIGHT = 16
+# Datadog drops tags longer than this.
+MAX_TAG_LENGTH = 200
+
+ALERT_TYPES = ("error", "warning", "info", "success", "")
+
+# A line number and either the keyword arguments for send_event() parsed
+# from that line, or the reason it could not be parsed.
+ParsedLine = Tuple[int, Dict[str, Any] | ValueError]
+
+
+def validate_tags(tags: Any) -> Dict[str, str]:
+    """
+    Checks the tags of an event, given either as an object or as a list of
+    "tag=value" strings like the datadog subcommand's -t flags, and returns
+    them as a dict. Raises ValueError for tags Datadog would reject or
+    mangle.
+    """
+    if isinstance(tags, list):
+        pairs = []
+        for tag in tags:
+            if not isinstance(tag, str) or "=" not in tag:
+                raise ValueError(f"Tag {tag!r} is not of the form tag=value")
+            pairs.append(tag.split("=", 1))
+        tags = dict(pairs)
+    if not isinstance(tags, dict):
+        raise ValueError("tags must be an object or a list of tag=value")
+
+    validated: Dict[str, str] = {}
+    for key, value in tags.items():
+        if not key or ":" in key or "," in key:
+            raise ValueError(f"Invalid tag name {key!r}")
+        if isinstance(value, (dict, list)) or value is None:
+            raise ValueError(f"Tag {key!r} must have a scalar value")
+        value = str(value)
+        if "," in value:
+            raise ValueError(f"Tag {key!r} must not contain commas")
+        if len(f"{key}:{value}") > MAX_TAG_LENGTH:
+            raise ValueError(
+                f"Tag {key!r} is longer than {MAX_TAG_LENGTH} characters"
+            )
+        validated[key] = value
+    return validated
+
+
+def _source_tags(source: str) -> Dict[str, str]:
+    """
+    Tags every ingested event has.
+    """
+    return {
+        "source": source,
+        "source_tool": source,
+        "source_category": datadog.DEFAULT_EVENT_SOURCE_CATEGORY,
+    }
+
+
+def _parse_event(line: str, source: str) -> Dict[str, Any]:
+    try:
+        event = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(event, dict):
+        raise ValueError("Expected a JSON object")
+    title = event.get("title")
+    if not isinstance(title, str) or not title:
+        raise ValueError("title is required")
+    text = event.get("text", event.get("message", ""))
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+    alert_type = event.get("alert_type", "info")
+    if alert_type not in ALERT_TYPES:
+        raise ValueError(f"Unknown alert_type {alert_type!r}")
+
+    tags = _source_tags(source)
+    tags.update(validate_tags(event.get("tags", {})))
+    return {
+        "title": title,
+        "text": text,
+        "tags": tags,
+        "alert_type": alert_type,
+    }
+
+
+def parse_events(lines: Iterable[str], source: str) -> Iterator[ParsedLine]:
+    """
+    Lazily parses NDJSON events, one per line, skipping blank lines. Each
+    event is an object with a "title" and optional "text" (or "message"),
+    "tags" and "alert_type". Lines are read only as fast as they are
+    consumed, so arbitrarily large inputs use constant memory.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, _parse_event(line, source)
+        except ValueError as e:
+            yield number, e
+
+
+def send_events(
+    parsed: Iterable[ParsedLine],
+    send: Callable[..., Any],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+) -> Iterator[Tuple[int, Exception | None]]:
+    """
+    Sends parsed events with send(**kwargs), at most `max_in_flight` at a
+    time, and yields (line number, None or the error) for every line as it
+    completes. Input is pulled only when a slot frees up, so a slow API
+    applies back-pressure instead of events piling up in memory.
+    """
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        in_flight: Dict[Future[Any], int] = {}
+
+        def completed(
+            futures: Set[Future[Any]],
+        ) -> Iterator[Tuple[int, Exception | None]]:
+            for future in futures:
+                error = future.exception()
+                yield in_flight.pop(future), (
+                    error if isinstance(error, Exception) else None
+                )
+
+        for number, event in parsed:
+            if isinstance(event, ValueError):
+                yield number, event
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+            in_flight[executor.submit(send, **event)] = number
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from completed(done)
+
+
+class IngestCommand(BaseCommand):
+    @classmethod
+    @override
+    def name(cls) -> str:
+        return "ingest"
+
+    @classmethod
+    @override
+    def description(cls) -> str:
+        return (
+            "Send many events to Datadog, read as newline-delimited JSON "
+            'objects like {"title": ..., "text": ..., "tags": {...}}'
+        )
+
+    @override
+    def submenu(self, subparsers: Subparsers) -> argparse.ArgumentParser:
+        parser = super().submenu(subparsers)
+        parser.add_argument(
+            "input",
+            nargs="?",
+            type=argparse.FileType("r", encoding="utf-8"),
+            default=sys.stdin,
+            help="File to read events from. Defaults to stdin.",
+        )
+        parser.add_argument("--source", type=str)
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=DEFAULT_MAX_IN_FLIGHT,
+            help="Maximum number of events being sent at once.",
+        )
+        add_dryrun(parser, True)
+
+        return parser
+
+    @override
+    def execute(self, args: argparse.Namespace) -> None:
+        """
+        Sends every event and prints one JSON report line per input line,
+        followed by a summary on stderr. Exits with status 1 if any line
+        failed.
+        """
+        source = args.source or DEFAULT_EVENT_SOURCE
+        parsed = parse_events(args.input, source)
+        if args.dry_run:
+            results: Iterable[Tuple[int, Exception | None]] = (
+                (number, event if isinstance(event, ValueError) else None)
+                for number, event in parsed
+            )
+        else:
+            api_key = datadog.api_key_from_env()
+            send = datadog_sender()
+            # Encodes the tags all events share once, not for every event.
+            template = datadog.EventTemplate(_source_tags(source))
+            results = send_events(
+                parsed,
+                lambda **kwargs: send(
+                    datadog_api_key=api_key, template=template, **kwargs
+                ),
+                args.max_in_flight,
+            )
+        _, failed = _report(
+            results, sys.stdout, time.monotonic(), args.dry_run
+        )
+        if failed:
+            sys.exit(1)
+
+
+def _report(
+    results: Iterable[Tuple[int, Exception | None]],
+    out: TextIO,
+    started: float,
+    dry_run: bool = False,
+) -> Tuple[int, int]:
+    sent = failed = 0
+    for number, error in results:
+        line: Dict[str, Any] = {"line": number, "ok": error is None}
+        if error is None:
+            sent += 1
+        else:
+            failed += 1
+            line["error"] = str(error) or type(error).__name__
+        print(json.dumps(line), file=out)
+    elapsed = time.monotonic() - started
+    rate = sent / elapsed if elapsed > 0 else 0.0
+    verb = "Would send" if dry_run else "Sent"
+    print(
+        f"{verb} {sent} events, {failed} failed in {elapsed:.2f}s "
+        f"({rate:.1f} events/s)",
+        file=sys.stderr,
+    )
+    return sent, failed
@@ -0,0 +1,50 @@
+import argparse
+import sys
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import override
+
+from infra_event_notifier import daemon
+from infra_event_notifier.cli.command import BaseCommand, Subparsers
+
+
+class ServeCommand(BaseCommand):
+    @classmethod
+    @override
+    def name(cls) -> str:
+        return "serve"
+
+    @classmethod
+    @override
+    def description(cls) -> str:
+        return (
+            "Run a daemon that accepts events from other invocations over a "
+            "Unix socket and sends them over warm connections"
+        )
+
+    @override
+    def submenu(self, subparsers: Subparsers) -> argparse.ArgumentParser:
+        parser = super().submenu(subparsers)
+        parser.add_argument(
+            "--socket",
+            type=str,
+            default=daemon.default_socket_path(),
+            help=(
+                "Unix socket to listen on. Point clients at it with "
+                f"--socket or ${daemon.SOCKET_ENV}."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of events sent concurrently.",
+        )
+
+        return parser
+
+    @override
+    def execute(self, args: argparse.Namespace) -> None:
+        daemon.serve(args.socket, args.workers)
@@ -1,10 +1,10 @@
 import argparse
-import functools
 import getpass
+import hashlib
 import json
 import os
-import pprint
 import sys
+import tempfile
 from typing import Any
 
 if sys.version_info >= (3, 12):
@@ -15,7 +15,11 @@ else:
 from infra_event_notifier.cli.command import (
     BaseCommand,
     Subparsers,
+    add_dedup,
     add_dryrun,
+    add_socket,
+    add_spool,
+    report_event,
 )
 from infra_event_notifier.backends import datadog
 
@@ -27,6 +31,9 @@ TERRAGRUNT_EVENT_SOURCE = "terragrunt"
 UNKNOWN_SENTRY_REGION = "unknown"
 
 
+REGION_MAP_CACHE_ENV = "INFRA_EVENT_NOTIFIER_REGION_MAP_CACHE"
+
+
 class RegionsConfig:
     """
     In order to properly log Terragrunt events, we need to map the region from
@@ -44,11 +51,101 @@ class RegionsConfig:
                 "terragrunt_to_sentry_region"
             ]
 
+    @classmethod
+    def from_mapping(
+        cls, terragrunt_to_sentry_region: dict[str, str]
+    ) -> "RegionsConfig":
+        config = cls.__new__(cls)
+        config.terragrunt_to_sentry_region = terragrunt_to_sentry_region
+        return config
+
+
+# Identifies one version of a region map file: real path, mtime and size.
+RegionMapKey = tuple[str, int, int]
+
+# Region maps already parsed by this process, e.g. by a daemon or a batch
+# of events.
+_REGIONS_CACHE: dict[RegionMapKey, RegionsConfig] = {}
+
+
+def load_regions_config(
+    config_file: str, cache_dir: str | None = None
+) -> RegionsConfig:
+    """
+    Returns the RegionsConfig for a region map file, parsing the file only
+    if this version of it has not been seen before.
+
+    Parsed maps are memoized in-process. If `cache_dir` is given, the part
+    of the map we use is also kept there in a compact file, so that
+    separate hook invocations skip parsing the full ops config. Both are
+    keyed by the file's path, mtime and size, so an edited map is reread.
+    """
+    path = os.path.realpath(config_file)
+    stat = os.stat(path)
+    key: RegionMapKey = (path, stat.st_mtime_ns, stat.st_size)
+    config = _REGIONS_CACHE.get(key)
+    if config is not None:
+        return config
+
+    cache_file = None
+    if cache_dir:
+        digest = hashlib.sha256(path.encode("utf-8")).hexdigest()[:16]
+        cache_file = os.path.join(cache_dir, f"region-map-{digest}.json")
+        config = _read_cached_map(cache_file, key)
+    if config is None:
+        config = RegionsConfig(path)
+        if cache_file is not None:
+            _write_cached_map(cache_file, key, config)
+    _REGIONS_CACHE[key] = config
+    return config
+
+
+def _read_cached_map(
+    cache_file: str, key: RegionMapKey
+) -> RegionsConfig | None:
+    try:
+        with open(cache_file) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != list(key):
+        return None
+    # A cache written by another version, or damaged, is a miss too.
+    mapping = cached.get("terragrunt_to_sentry_region")
+    if not isinstance(mapping, dict):
+        return None
+    return RegionsConfig.from_mapping(mapping)
+
+
+def _write_cached_map(
+    cache_file: str, key: RegionMapKey, config: RegionsConfig
+) -> None:
+    # The cache only saves time, so failing to write it is not an error.
+    cached = {
+        "key": list(key),
+        "terragrunt_to_sentry_region": config.terragrunt_to_sentry_region,
+    }
+    try:
+        directory = os.path.dirname(cache_file)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(cached, file, separators=(",", ":"))
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
 
 class TerragruntCommand(BaseCommand):
 
-    @functools.cache
-    def _load_ops_config(self): ...
+    def _load_ops_config(
+        self, region_map: str, cache_dir: str | None
+    ) -> RegionsConfig:
+        return load_regions_config(region_map, cache_dir)
 
     @classmethod
     @override
@@ -65,7 +162,52 @@ class TerragruntCommand(BaseCommand):
         parser = super().submenu(subparsers)
         parser.add_argument("--cli-args", type=str, required=True)
         parser.add_argument("--region-map", type=str, required=True)
+        parser.add_argument(
+            "--region-map-cache",
+            type=str,
+            default=os.environ.get(REGION_MAP_CACHE_ENV),
+            help=(
+                "Directory in which to keep a compact copy of the parsed "
+                "region map, so that later runs skip parsing it. "
+                f"Defaults to ${REGION_MAP_CACHE_ENV}; off if unset."
+            ),
+        )
+        parser.add_argument(
+            "--aggregate",
+            action="store_true",
+            help=(
+                "Buffer the event with those of the other slices of the same "
+                "run (e.g. `run-all`), and send one summary event per region "
+                "once the run has been quiet for --aggregate-window seconds. "
+                "Summaries that cannot be sent are logged next to the "
+                "buffered events, in <runtime dir>/runs/<run id>.log."
+            ),
+        )
+        parser.add_argument(
+            "--run-id",
+            type=str,
+            default=None,
+            help=(
+                "Run to aggregate the event with. Defaults to "
+                "$INFRA_EVENT_NOTIFIER_RUN_ID, or an ID derived from the "
+                "parent terragrunt process."
+            ),
+        )
+        parser.add_argument(
+            "--aggregate-window",
+            type=float,
+            default=None,
+            help="Seconds a run must be quiet before it is summarized.",
+        )
+        parser.add_argument(
+            "--per-slice-events",
+            action="store_true",
+            help="With --aggregate, also send every slice's own event.",
+        )
         add_dryrun(parser, True)
+        add_socket(parser)
+        add_spool(parser)
+        add_dedup(parser)
 
         return parser
 
@@ -76,8 +218,15 @@ class TerragruntCommand(BaseCommand):
     # Separation for unit testing. This preserves the execute() function
     # signature while enabling dependency injection for testing.
     def _execute_impl(
-        self, args: argparse.Namespace, cwd=os.getcwd(), user=getpass.getuser()
+        self,
+        args: argparse.Namespace,
+        cwd: str | None = None,
+        user: str | None = None,
     ) -> None:
+        if cwd is None:
+            cwd = os.getcwd()
+        if user is None:
+            user = getpass.getuser()
         cli_args = args.cli_args
         region_map = args.region_map
 
@@ -103,7 +252,7 @@ class TerragruntCommand(BaseCommand):
         # the event is best-effort -- send_event() below already swallows its
         # own failures -- so an unmapped slice must not fail the terragrunt
         # run that invoked this hook.
-        regions = RegionsConfig(region_map)
+        regions = self._load_ops_config(region_map, args.region_map_cache)
         sentry_region = regions.terragrunt_to_sentry_region.get(region)
         if sentry_region is None:
             print(
@@ -139,12 +288,58 @@ class TerragruntCommand(BaseCommand):
         }
         api_key = datadog.api_key_from_env()
 
-        if args.dry_run:
-            print("Would admit the following event:")
-            pprint.pp(send_kwargs)
-        else:
-            try:
-                datadog.send_event(datadog_api_key=api_key, **send_kwargs)
-            except Exception as e:
-                print("!! Could not report an event to DataDog:")
-                print(e)
+        if args.aggregate and not args.dry_run:
+            self._aggregate(
+                args,
+                api_key,
+                {
+                    "region": sentry_region,
+                    "slice": tgslice,
+                    "root": tgroot,
+                    "user": user,
+                    "cli_args": cli_args,
+                    "event": send_kwargs,
+                },
+            )
+            return
+
+        report_event(args, api_key, send_kwargs)
+
+    def _aggregate(
+        self, args: argparse.Namespace, api_key: str, record: dict[str, Any]
+    ) -> None:
+        """
+        Buffers the slice's event for its run. The first hook of a run to
+        get here becomes its flusher: it forks a detached process that
+        sends the run's summaries once the run goes quiet, and returns so
+        as not to hold up terragrunt. Other hooks only buffer their event.
+        """
+        from infra_event_notifier import aggregate
+
+        buffer = aggregate.RunBuffer(
+            aggregate.default_buffer_dir(),
+            args.run_id or aggregate.default_run_id(),
+        )
+        try:
+            buffer.add(record)
+        except OSError as e:
+            print("!! Could not buffer the event, sending it now:")
+            print(e)
+            report_event(args, api_key, record["event"])
+            return
+        if not buffer.try_lock():
+            return
+        window = args.aggregate_window
+        if window is None:
+            window = aggregate.DEFAULT_WINDOW
+        aggregate.run_detached(
+            lambda: aggregate.flush_run(
+                buffer,
+                lambda event: report_event(args, api_key, event),
+                window,
+                args.per_slice_events,
+            ),
+            buffer.log_path,
+        )
+        # The detached process holds the lock now.
+        buffer.unlock()
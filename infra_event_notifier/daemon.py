@@ -0,0 +1,221 @@
+import json
+import os
+import socket
+import socketserver
+import sys
+from typing import Any, Callable, Dict, Tuple
+
+SOCKET_ENV = "INFRA_EVENT_NOTIFIER_SOCKET"
+# How long a client waits for the daemon before sending the event itself.
+CLIENT_TIMEOUT = 2.0
+
+
+def default_socket_path() -> str:
+    """
+    Socket the daemon listens on and clients connect to, unless told
+    otherwise: $INFRA_EVENT_NOTIFIER_SOCKET if set, otherwise a per-user
+    path.
+    """
+    from infra_event_notifier.backends.state import runtime_path
+
+    return os.environ.get(SOCKET_ENV) or runtime_path("sock")
+
+
+class DaemonError(Exception):
+    pass
+
+
+def send_event_via_daemon(
+    socket_path: str,
+    spool_entry: Tuple[str, str] | None = None,
+    **send_kwargs: Any,
+) -> bool:
+    """
+    Hands a Datadog event to a running daemon. Takes the same keyword
+    arguments as backends.datadog.send_event(). If the event was spooled,
+    `spool_entry` is the spool path and entry id, and the daemon marks the
+    entry delivered once Datadog accepted the event.
+
+    Returns False if no daemon is listening on `socket_path`, its directory
+    is not private to the current user, talking to it failed or it did not
+    accept the event, in which case the caller should send the event itself.
+    A daemon that times out after reading the event may still deliver it, so
+    falling back can duplicate an event but never loses one.
+    """
+    from infra_event_notifier.backends.state import check_private_dir
+
+    message: Dict[str, Any] = {"type": "datadog_event", "kwargs": send_kwargs}
+    if spool_entry is not None:
+        message["spool"] = {"path": spool_entry[0], "id": spool_entry[1]}
+    request = json.dumps(message)
+    try:
+        # The event carries the API key: only hand it to a socket no other
+        # user could have put there.
+        check_private_dir(os.path.dirname(os.path.abspath(socket_path)))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(request.encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        reply = json.loads(line)
+    except (OSError, ValueError):
+        # Anything from no daemon to a garbled reply: send it directly.
+        return False
+    return isinstance(reply, dict) and reply.get("ok") is True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "NotifierDaemon"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                self.server.enqueue(json.loads(line))
+                reply: Dict[str, Any] = {"ok": True}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class NotifierDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Long-lived process that accepts events over a Unix socket and delivers
+    them from a background queue, reusing warm connections.
+
+    Events are acknowledged as soon as they are queued, so a client only
+    pays for a local socket round-trip.
+
+    Args:
+        socket_path (str): Path of the Unix socket to listen on
+        workers (int, optional): Number of delivery threads. Defaults to 4.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, workers: int = 4) -> None:
+        # Imported here so that the client functions above stay cheap to
+        # import.
+        from infra_event_notifier.backends.rate_limit import (
+            DATADOG_BURST,
+            DATADOG_RATE,
+            RateLimiter,
+            default_state_path,
+        )
+        from infra_event_notifier.backends.retry import RetryPolicy
+        from infra_event_notifier.backends.state import private_dir
+        from infra_event_notifier.backends.timeouts import Timeouts
+        from infra_event_notifier.background import (
+            BackgroundSender,
+            QueueFullPolicy,
+        )
+
+        private_dir(os.path.dirname(os.path.abspath(socket_path)))
+        _remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        # Reject events when full rather than dropping queued ones, so that
+        # the client knows to send them itself.
+        self.sender = BackgroundSender(
+            workers=workers, policy=QueueFullPolicy.DROP_NEWEST
+        )
+        self.retry_policy = RetryPolicy()
+        self.timeouts = Timeouts()
+        # Shares its budget with CLI invocations that send directly.
+        self.rate_limiter = RateLimiter(
+            DATADOG_RATE, DATADOG_BURST, path=default_state_path()
+        )
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def enqueue(self, message: Dict[str, Any]) -> None:
+        from infra_event_notifier.backends import datadog
+
+        if message.get("type") != "datadog_event":
+            raise ValueError(f"Unknown message type: {message.get('type')}")
+        send = self.rate_limiter.wrap(
+            datadog.send_event, self.rate_limiter.bucket("datadog")
+        )
+        send = self.timeouts.wrap(self.retry_policy.wrap(send))
+        spool_entry = message.get("spool")
+        in_flight = None
+        if spool_entry is not None:
+            from infra_event_notifier.spool import InFlight
+
+            # Taken before the client, which holds one too, is answered, so
+            # that `flush-spool` never sees the event unclaimed.
+            in_flight = InFlight(spool_entry["path"])
+            send = _acking(
+                send, spool_entry["path"], spool_entry["id"], in_flight.release
+            )
+        if not self.sender.submit(send, **message["kwargs"]):
+            if in_flight is not None:
+                in_flight.release()
+            raise DaemonError("Delivery queue is full")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.sender.close(self.sender.exit_timeout)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _acking(
+    send: Callable[..., None],
+    spool_path: str,
+    entry_id: str,
+    release: Callable[[], None],
+) -> Callable[..., None]:
+    """
+    Wraps send so that the spool entry of the event is marked delivered
+    once it was sent, and calls release() once it was sent or failed.
+    """
+    from infra_event_notifier.spool import Spool
+
+    def send_and_ack(**send_kwargs: Any) -> None:
+        try:
+            send(**send_kwargs)
+            Spool(spool_path).ack(entry_id)
+        finally:
+            release()
+
+    return send_and_ack
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Removes a socket file left behind by a daemon that is no longer running.
+    Raises DaemonError if another daemon is still listening on it.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+    raise DaemonError(f"A daemon is already listening on {socket_path}")
+
+
+def serve(socket_path: str, workers: int = 4) -> None:
+    """
+    Runs the daemon until interrupted.
+    """
+    import signal
+
+    with NotifierDaemon(socket_path, workers) as server:
+
+        def _stop(signum: int, frame: Any) -> None:
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, _stop)
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
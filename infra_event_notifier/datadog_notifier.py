@@ -1,16 +1,87 @@
-from typing import Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
 
-from infra_event_notifier.backends.datadog import send_event
+from infra_event_notifier.backends.datadog import (
+    EventTemplate,
+    send_event,
+    send_event_async,
+)
+from infra_event_notifier.backends.dedup import Deduplicator
+from infra_event_notifier.backends.rate_limit import RateLimiter
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.backends.timeouts import Timeouts
+from infra_event_notifier.background import BackgroundSender
+
+# Datadog's v1 events API takes a single event per request, so batches are
+# sent as concurrent requests over the shared connection pool.
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+class DatadogEvent:
+    """
+    Contains the fields for a Datadog event
+
+    Args:
+        title (str): Title of the event
+        body (str): Main body of the event
+        tags (Dict[str, str], Optional): List of tags to add to event.
+            Defaults to {}.
+        alert_type (str, Optional): Alert type for Datadog event
+            Defaults to "".
+    """
+
+    def __init__(
+        self,
+        title: str,
+        body: str,
+        tags: Dict[str, str] = {},
+        alert_type: str = "",
+    ) -> None:
+        self.title = title
+        self.body = body
+        self.tags = tags
+        self.alert_type = alert_type
 
 
 class DatadogNotifier:
     """
     Class that supports sending Datadog notifications.
     A Datadog API key is required.
+
+    If a BackgroundSender is given, send() queues the event on it and returns
+    without waiting for Datadog. If a RetryPolicy is given, throttled and
+    failed sends are retried according to it. If a RateLimiter is given,
+    every request first waits for a token from its "datadog" bucket.
+    Every send is bounded by `timeouts`, which defaults to Timeouts()
+    (configured from the environment). If a Deduplicator is given, events
+    identical to one sent within its window are suppressed. If an
+    EventTemplate is given, events with its tags are encoded from it.
+    Events go to the Datadog `site` of the API key's organization, e.g.
+    "datadoghq.eu", which defaults to $DD_SITE or US1.
     """
 
-    def __init__(self, datadog_api_key: str) -> None:
+    def __init__(
+        self,
+        datadog_api_key: str,
+        background: BackgroundSender | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
+        deduplicator: Deduplicator | None = None,
+        template: EventTemplate | None = None,
+        site: str | None = None,
+    ) -> None:
         self.datadog_api_key = datadog_api_key
+        self.background = background
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
+        self.deduplicator = deduplicator
+        self.template = template
+        self.site = site
 
     def send(
         self,
@@ -30,11 +101,220 @@ class DatadogNotifier:
             alert_type (str, Optional): Alert type for Datadog event
                 Defaults to "".
         """
-        if self.datadog_api_key is not None:
-            send_event(
-                title=title,
-                text=body,
-                tags=tags,
-                datadog_api_key=self.datadog_api_key,
-                alert_type=alert_type,
+        if self.datadog_api_key is None:
+            return
+        send_kwargs: Dict[str, Any] = {
+            "title": title,
+            "text": body,
+            "tags": tags,
+            "datadog_api_key": self.datadog_api_key,
+            "alert_type": alert_type,
+        }
+        if self.template is not None:
+            send_kwargs["template"] = self.template
+        if self.site is not None:
+            send_kwargs["site"] = self.site
+        send: Callable[..., None] = send_event
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("datadog", self.datadog_api_key)
+            send = self.rate_limiter.wrap(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap(send)
+        send = self.timeouts.wrap(send)
+        if self.deduplicator is not None:
+            fingerprint = self.deduplicator.fingerprint(
+                "datadog", title, body, tags
+            )
+            if not self.deduplicator.admit(fingerprint):
+                return
+            send = self.deduplicator.wrap(send, fingerprint)
+        if self.background is not None:
+            self.background.submit(send, **send_kwargs)
+        else:
+            send(**send_kwargs)
+
+    def _send_event(self, event: DatadogEvent) -> Exception | None:
+        try:
+            self.send(event.title, event.body, event.tags, event.alert_type)
+        except Exception as e:
+            return e
+        return None
+
+    def send_many(
+        self,
+        events: Iterable[DatadogEvent],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> List[Exception | None]:
+        """
+        Sends several events to Datadog concurrently.
+
+        Args:
+            events (Iterable[DatadogEvent]): Events to send
+            max_workers (int, Optional): Maximum number of requests in
+                flight at once. Defaults to 4.
+
+        Returns:
+            One entry per event, in order: None if the event was sent,
+            otherwise the exception raised while sending it.
+        """
+        events = list(events)
+        if len(events) <= 1:
+            return [self._send_event(event) for event in events]
+        workers = min(max_workers, len(events))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._send_event, events))
+
+    def batch(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "DatadogBatch":
+        """
+        Returns a context manager that gathers events and sends them with
+        send_many(). See DatadogBatch.
+        """
+        return DatadogBatch(self, batch_size, flush_interval, max_workers)
+
+
+class AsyncDatadogNotifier:
+    """
+    asyncio counterpart of DatadogNotifier. Sends do not block the event
+    loop, and any number of them can be in flight at once.
+    A Datadog API key is required.
+
+    Takes the same optional helpers as DatadogNotifier, except for a
+    BackgroundSender.
+    """
+
+    def __init__(
+        self,
+        datadog_api_key: str,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
+        deduplicator: Deduplicator | None = None,
+        template: EventTemplate | None = None,
+        site: str | None = None,
+    ) -> None:
+        self.datadog_api_key = datadog_api_key
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
+        self.deduplicator = deduplicator
+        self.template = template
+        self.site = site
+
+    async def send(
+        self,
+        title: str,
+        body: str,
+        tags: Dict[str, str] = {},
+        alert_type: str = "",
+    ) -> None:
+        """
+        Sends the event to Datadog with the specified fields.
+        Takes the same arguments as DatadogNotifier.send().
+        """
+        if self.datadog_api_key is None:
+            return
+        send_kwargs: Dict[str, Any] = {
+            "title": title,
+            "text": body,
+            "tags": tags,
+            "datadog_api_key": self.datadog_api_key,
+            "alert_type": alert_type,
+        }
+        if self.template is not None:
+            send_kwargs["template"] = self.template
+        if self.site is not None:
+            send_kwargs["site"] = self.site
+        send: Callable[..., Awaitable[None]] = send_event_async
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("datadog", self.datadog_api_key)
+            send = self.rate_limiter.wrap_async(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap_async(send)
+        send = self.timeouts.wrap_async(send)
+        if self.deduplicator is not None:
+            fingerprint = self.deduplicator.fingerprint(
+                "datadog", title, body, tags
             )
+            if not self.deduplicator.admit(fingerprint):
+                return
+            send = self.deduplicator.wrap_async(send, fingerprint)
+        await send(**send_kwargs)
+
+
+class DatadogBatch:
+    """
+    Gathers Datadog events and sends them in concurrent batches.
+
+    Pending events are flushed once `batch_size` of them have been added,
+    `flush_interval` seconds after the first of them was added, and when the
+    context manager exits. `results` holds one entry per added event, in the
+    order they were added, as returned by DatadogNotifier.send_many().
+
+    Args:
+        notifier (DatadogNotifier): Notifier used to send the events
+        batch_size (int): Number of pending events that triggers a flush
+        flush_interval (float): Seconds a pending event may wait for a flush
+        max_workers (int): Maximum number of requests in flight at once
+    """
+
+    def __init__(
+        self,
+        notifier: DatadogNotifier,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        assert batch_size > 0, "batch_size must be positive"
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_workers = max_workers
+        self.results: List[Exception | None] = []
+        self._pending: List[DatadogEvent] = []
+        self._timer: threading.Timer | None = None
+        # Serializes flushes so results stay in the order events were added.
+        self._lock = threading.RLock()
+
+    def add(
+        self,
+        title: str,
+        body: str,
+        tags: Dict[str, str] = {},
+        alert_type: str = "",
+    ) -> None:
+        """
+        Queues an event. Takes the same arguments as DatadogNotifier.send().
+        """
+        with self._lock:
+            self._pending.append(DatadogEvent(title, body, tags, alert_type))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Sends all pending events.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            events, self._pending = self._pending, []
+            if events:
+                self.results.extend(
+                    self.notifier.send_many(events, self.max_workers)
+                )
+
+    def __enter__(self) -> "DatadogBatch":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
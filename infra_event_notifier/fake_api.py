@@ -0,0 +1,177 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+from infra_event_notifier.backends.transport import ConnectionPool, Response
+
+# Status, headers and body of a response.
+FakeResponse = Tuple[int, Dict[str, str], bytes]
+
+
+class FakeApiServer:
+    """
+    Local stand-in for the Datadog events API, Jira and eng-pipes, for
+    exercising the real request path (connection pool, retries, rate
+    limits) in tests and benchmarks without talking to the real services.
+
+    Install transport() with transport.set_transport() to send every
+    request of the backends to it. It answers like the real APIs: Datadog
+    events get a 202, Jira searches find nothing, Jira creates return new
+    keys, and anything else (e.g. eng-pipes webhooks) gets a 200. It counts
+    the requests it received in `requests`, keyed by "METHOD path".
+
+    Args:
+        latency (float, optional): Seconds to wait before every response.
+            Defaults to 0.
+        throttle_rate (float, optional): Fraction of requests answered with
+            429 Too Many Requests. Defaults to 0.
+        error_rate (float, optional): Fraction of requests answered with
+            503 Service Unavailable. Defaults to 0.
+        seed (int, optional): Seed for picking the requests that fail.
+            Defaults to None.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        assert latency >= 0, "latency must not be negative"
+        assert (
+            0 <= throttle_rate + error_rate <= 1
+        ), "rates must add up to <= 1"
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._issues = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self  # type: ignore[attr-defined]
+        host, port = self._httpd.server_address[:2]
+        self.url = f"http://{host!s}:{port}"
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "FakeApiServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeApiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def transport(self) -> "RedirectTransport":
+        return RedirectTransport(self.url)
+
+    def respond(self, method: str, path: str, body: bytes) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests[f"{method} {path}"] += 1
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429, {"Retry-After": "0"}, b""
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, {}, b""
+
+        if path == "/api/v1/events":
+            return _json(202, {"status": "ok"})
+        if path == "/rest/api/2/search":
+            return _json(200, {"issues": [], "total": 0})
+        if path == "/rest/api/2/issue/bulk":
+            updates = json.loads(body)["issueUpdates"]
+            issues = [{"key": self._new_key()} for _ in updates]
+            return _json(201, {"issues": issues, "errors": []})
+        if path == "/rest/api/2/issue":
+            return _json(201, {"key": self._new_key()})
+        if path.endswith("/comment"):
+            return _json(201, {})
+        if method == "PUT":
+            return 204, {}, b""
+        return _json(200, {})
+
+    def _new_key(self) -> str:
+        with self._lock:
+            self._issues += 1
+            return f"FAKE-{self._issues}"
+
+
+def _json(status: int, body: Any) -> FakeResponse:
+    return (
+        status,
+        {"Content-Type": "application/json"},
+        json.dumps(body).encode(),
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK, adding ~40ms to every
+    # response and drowning out what is being measured.
+    disable_nagle_algorithm = True
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        fake: FakeApiServer = self.server.fake  # type: ignore[attr-defined]
+        path = urlsplit(self.path).path
+        status, headers, data = fake.respond(self.command, path, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_POST = _handle
+    do_PUT = _handle
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class RedirectTransport:
+    """
+    Transport that sends every request to `base_url` instead of the host it
+    was addressed to, keeping its path, through a ConnectionPool of its own.
+
+    Args:
+        base_url (str): Scheme, host and port to send requests to
+    """
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.pool = ConnectionPool()
+
+    def urlopen(self, req: Request) -> Response:
+        parts = urlsplit(req.full_url)
+        url = self.base_url + parts.path
+        if parts.query:
+            url += f"?{parts.query}"
+        redirected = Request(
+            url,
+            data=req.data,
+            headers=dict(req.header_items()),
+            method=req.get_method(),
+        )
+        return self.pool.urlopen(redirected)
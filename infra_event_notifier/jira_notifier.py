@@ -1,11 +1,19 @@
-from typing import Dict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
 
 from infra_event_notifier.backends.jira import (
+    DEFAULT_MAX_WORKERS,
     IssueType,
     JiraConfig,
     JiraFields,
     create_or_update_issue,
+    create_or_update_issue_async,
+    create_or_update_issues,
 )
+from infra_event_notifier.backends.jira_cache import IssueKeyCache
+from infra_event_notifier.backends.rate_limit import RateLimiter
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.backends.timeouts import Timeouts
+from infra_event_notifier.background import BackgroundSender
 
 
 class JiraNotifier:
@@ -13,6 +21,17 @@ class JiraNotifier:
     Class that supports sending Jira notifications.
     A Jira API Key, API URL, Project ID, and User email
     are required.
+
+    If a BackgroundSender is given, send() queues the issue on it and
+    returns without waiting for Jira. If an IssueKeyCache is given, repeat
+    events for the same tags skip the issue search. If a RetryPolicy is
+    given, throttled and failed sends are retried according to it; a retry
+    searches again, so an issue created by a failed attempt is updated
+    rather than duplicated. If a RateLimiter is given, every request of a
+    send (the search, the create or update, any comments) first waits for
+    a token from its "jira" bucket. Every send, searches and updates
+    included, is bounded by `timeouts`, which defaults to Timeouts()
+    (configured from the environment).
     """
 
     def __init__(
@@ -21,13 +40,23 @@ class JiraNotifier:
         jira_url: str,
         jira_project: str,
         jira_user_email: str,
+        background: BackgroundSender | None = None,
+        issue_cache: IssueKeyCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
     ) -> None:
         self.jira_config = JiraConfig(
             url=jira_url,
             user_email=jira_user_email,
             project_key=jira_project,
             api_key=jira_api_key,
+            issue_cache=issue_cache,
         )
+        self.background = background
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
 
     def send(
         self,
@@ -59,9 +88,138 @@ class JiraNotifier:
         assert self.jira_config is not None, "Notification missing config"
 
         fields = JiraFields(title, body, issue_type, tags)
-        create_or_update_issue(
-            jira=self.jira_config,
-            fields=fields,
-            fallback_comment_text=fallback_comment_text,
-            update_text_body=update_text_body,
+        send_kwargs: Dict[str, Any] = {
+            "jira": self.jira_config,
+            "fields": fields,
+            "fallback_comment_text": fallback_comment_text,
+            "update_text_body": update_text_body,
+        }
+        send: Callable[..., None] = create_or_update_issue
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("jira", self.jira_config.api_key)
+            send = self.rate_limiter.wrap_requests(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap(send)
+        send = self.timeouts.wrap(send)
+        if self.background is not None:
+            self.background.submit(send, **send_kwargs)
+        else:
+            send(**send_kwargs)
+
+    def send_many(
+        self,
+        issues: Iterable[JiraFields],
+        fallback_comment_text: str | None = None,
+        update_text_body: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> List[Exception | None]:
+        """
+        Creates or updates many issues at once, e.g. for every finding of a
+        sweep. Existing issues are found with one search, missing ones are
+        created in bulk and existing ones are updated concurrently, so a
+        batch takes a few round-trips rather than two per issue. Always
+        waits for Jira, even if a BackgroundSender is configured.
+
+        The rate limiter applies to every request of the batch, and
+        `timeouts` bounds the batch as a whole. The retry policy only
+        applies to requests that are safe to send twice (see
+        backends.jira.Wrapper): a failed bulk create is retried by
+        searching for its issues and creating those still missing, and
+        comments are never sent again.
+
+        Args:
+            issues (Iterable[JiraFields]): Issues to create or update
+            fallback_comment_text (str, Optional): Comment to include
+                on every issue that already exists. Defaults to None.
+            update_text_body (bool, Optional): If set, will update the
+                body of existing Jira issues. Defaults to False.
+            max_workers (int, Optional): Issues updated at once.
+                Defaults to 8.
+
+        Returns:
+            For every issue in order, None if it was created or updated, or
+            the exception that prevented it.
+        """
+        assert self.jira_config is not None, "Notification missing config"
+
+        def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+            if self.retry_policy is not None:
+                fn = self.retry_policy.wrap(fn)
+            return fn
+
+        send: Callable[..., List[Exception | None]] = create_or_update_issues
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("jira", self.jira_config.api_key)
+            send = self.rate_limiter.wrap_requests(send, bucket)
+        return self.timeouts.wrap(send)(
+            self.jira_config,
+            list(issues),
+            fallback_comment_text,
+            update_text_body,
+            wrap=wrap,
+            max_workers=max_workers,
         )
+
+
+class AsyncJiraNotifier:
+    """
+    asyncio counterpart of JiraNotifier. Sends do not block the event loop,
+    and any number of them can be in flight at once. If an IssueKeyCache is
+    given, repeat events for the same tags skip the issue search. If a
+    RetryPolicy is given, throttled and failed sends are retried. If a
+    RateLimiter is given, every request of a send first waits for a token.
+    A Jira API Key, API URL, Project ID, and User email
+    are required.
+    """
+
+    def __init__(
+        self,
+        jira_api_key: str,
+        jira_url: str,
+        jira_project: str,
+        jira_user_email: str,
+        issue_cache: IssueKeyCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
+    ) -> None:
+        self.jira_config = JiraConfig(
+            url=jira_url,
+            user_email=jira_user_email,
+            project_key=jira_project,
+            api_key=jira_api_key,
+            issue_cache=issue_cache,
+        )
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
+
+    async def send(
+        self,
+        title: str,
+        body: str,
+        issue_type: IssueType,
+        tags: Dict[str, str] = {},
+        fallback_comment_text: str | None = None,
+        update_text_body: bool = False,
+    ) -> None:
+        """
+        Creates an issue on Jira with the specified fields.
+        Takes the same arguments as JiraNotifier.send().
+        """
+        assert self.jira_config is not None, "Notification missing config"
+
+        fields = JiraFields(title, body, issue_type, tags)
+        send_kwargs: Dict[str, Any] = {
+            "jira": self.jira_config,
+            "fields": fields,
+            "fallback_comment_text": fallback_comment_text,
+            "update_text_body": update_text_body,
+        }
+        send: Callable[..., Awaitable[None]] = create_or_update_issue_async
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("jira", self.jira_config.api_key)
+            send = self.rate_limiter.wrap_requests_async(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap_async(send)
+        await self.timeouts.wrap_async(send)(**send_kwargs)
@@ -1,8 +1,48 @@
 import argparse
+import importlib
+import sys
 
-from infra_event_notifier.cli.datadog import DatadogCommand
-from infra_event_notifier.cli.terragrunt import TerragruntCommand
-from infra_event_notifier.cli.command import BaseCommand, add_dryrun
+from infra_event_notifier.cli.command import (
+    BaseCommand,
+    add_dryrun,
+    add_timings,
+    install_timings,
+)
+
+# Subcommand name -> (module, class). Modules are imported only for the
+# subcommand being run, so that e.g. a terragrunt hook does not load the
+# daemon or the bulk ingestion code on every invocation.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "datadog": ("infra_event_notifier.cli.datadog", "DatadogCommand"),
+    "terragrunt": ("infra_event_notifier.cli.terragrunt", "TerragruntCommand"),
+    "serve": ("infra_event_notifier.cli.serve", "ServeCommand"),
+    "flush-spool": (
+        "infra_event_notifier.cli.flush_spool",
+        "FlushSpoolCommand",
+    ),
+    "ingest": ("infra_event_notifier.cli.ingest", "IngestCommand"),
+}
+
+
+def load_command(name: str) -> BaseCommand:
+    module_name, class_name = COMMANDS[name]
+    command: BaseCommand = getattr(
+        importlib.import_module(module_name), class_name
+    )()
+    return command
+
+
+def _requested_commands(argv: list[str]) -> list[str]:
+    """
+    Names of the subcommands to register: only the one on the command line
+    if there is one, otherwise all of them so that --help and argparse's
+    errors list every choice. Only options can precede the subcommand, so
+    the first argument that names one is it.
+    """
+    for arg in argv:
+        if arg in COMMANDS:
+            return [arg]
+    return list(COMMANDS)
 
 
 def parse_args(
@@ -15,10 +55,15 @@ def parse_args(
         "https://github.com/getsentry/infra-event-notifier",
     )
     add_dryrun(parser, False)
+    add_timings(parser, False)
 
     subparsers = parser.add_subparsers(help="sub-commands", required=True)
 
-    for command in [DatadogCommand(), TerragruntCommand()]:
+    if argv is None:
+        argv = sys.argv[1:]
+    if commands is None:
+        commands = [load_command(name) for name in _requested_commands(argv)]
+    for command in commands:
         command.submenu(subparsers)
 
     return parser.parse_args(argv)
@@ -26,6 +71,7 @@ def parse_args(
 
 def main():
     args = parse_args()
+    install_timings(args)
     args.func(args)
 
 
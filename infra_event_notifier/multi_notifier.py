@@ -0,0 +1,96 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from infra_event_notifier.backends.jira import IssueType
+from infra_event_notifier.datadog_notifier import DatadogNotifier
+from infra_event_notifier.jira_notifier import JiraNotifier
+from infra_event_notifier.slack_notifier import SlackNotifier
+
+
+class MultiNotifier:
+    """
+    Class that sends the same event to Datadog, Slack and Jira at once.
+    Each backend is optional; only the configured ones are notified.
+
+    Args:
+        datadog (DatadogNotifier, Optional): Notifier for Datadog events
+        slack (SlackNotifier, Optional): Notifier for Slack messages
+        jira (JiraNotifier, Optional): Notifier for Jira issues
+    """
+
+    def __init__(
+        self,
+        datadog: DatadogNotifier | None = None,
+        slack: SlackNotifier | None = None,
+        jira: JiraNotifier | None = None,
+    ) -> None:
+        self.datadog = datadog
+        self.slack = slack
+        self.jira = jira
+
+    def send(
+        self,
+        title: str,
+        body: str,
+        tags: Dict[str, str] = {},
+        alert_type: str = "",
+        issue_type: IssueType = IssueType.TASK,
+        fallback_comment_text: str | None = None,
+        update_text_body: bool = False,
+    ) -> Dict[str, Exception | None]:
+        """
+        Sends the event to every configured backend concurrently.
+
+        Args:
+            title (str): Title of the event
+            body (str): Main body of the event
+            tags (Dict[str, str], Optional): Tags for the Datadog event and
+                labels for the Jira issue. Defaults to {}.
+            alert_type (str, Optional): Alert type for Datadog event
+                Defaults to "".
+            issue_type (IssueType, Optional): Issue type for jira event.
+                Defaults to Task.
+            fallback_comment_text (str, Optional): Comment to include
+                on jira issue if issue already exists. Defaults to None.
+            update_text_body (bool, Optional): If set, will update the
+                body of an existing Jira issue. Defaults to False.
+
+        Returns:
+            A mapping from backend name ("datadog", "slack", "jira") to None
+            if the send succeeded, or the exception it raised. A failing or
+            slow backend does not stop the others from being notified.
+        """
+        sends: Dict[str, Callable[[], Any]] = {}
+        if self.datadog is not None:
+            datadog = self.datadog
+            sends["datadog"] = lambda: datadog.send(
+                title, body, tags, alert_type
+            )
+        if self.slack is not None:
+            slack = self.slack
+            sends["slack"] = lambda: slack.send(title, body)
+        if self.jira is not None:
+            jira = self.jira
+            sends["jira"] = lambda: jira.send(
+                title,
+                body,
+                issue_type,
+                tags,
+                fallback_comment_text,
+                update_text_body,
+            )
+
+        results: Dict[str, Exception | None] = {}
+        if not sends:
+            return results
+
+        with ThreadPoolExecutor(max_workers=len(sends)) as executor:
+            futures: Dict[str, Future[Any]] = {
+                name: executor.submit(send) for name, send in sends.items()
+            }
+            for name, future in futures.items():
+                exception = future.exception()
+                results[name] = (
+                    exception if isinstance(exception, Exception) else None
+                )
+        return results
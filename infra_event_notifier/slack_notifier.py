@@ -1,15 +1,54 @@
-from infra_event_notifier.backends.slack import send_notification
+from typing import Any, Awaitable, Callable, Dict
+
+from infra_event_notifier.backends.dedup import Deduplicator
+from infra_event_notifier.backends.rate_limit import RateLimiter
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.backends.slack import (
+    NotificationTemplate,
+    send_notification,
+    send_notification_async,
+)
+from infra_event_notifier.backends.timeouts import Timeouts
+from infra_event_notifier.background import BackgroundSender
 
 
 class SlackNotifier:
     """
     Class that supports sending Slack messages.
     A URL for eng-pipes and eng-pipes secret key are required.
+
+    If a BackgroundSender is given, send() queues the message on it and
+    returns without waiting for eng-pipes. If a RetryPolicy is given,
+    throttled and failed sends are retried according to it. If a
+    RateLimiter is given, every request first waits for a token from its
+    "slack" bucket. Every send is bounded by `timeouts`, which defaults to
+    Timeouts() (configured from the environment). If a Deduplicator is
+    given, messages identical to one sent within its window are suppressed.
     """
 
-    def __init__(self, eng_pipes_key: str, eng_pipes_url: str) -> None:
+    def __init__(
+        self,
+        eng_pipes_key: str,
+        eng_pipes_url: str,
+        background: BackgroundSender | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
+        deduplicator: Deduplicator | None = None,
+    ) -> None:
         self.eng_pipes_key = eng_pipes_key
         self.eng_pipes_url = eng_pipes_url
+        self.background = background
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
+        self.deduplicator = deduplicator
+        # Keyed once, rather than for every message.
+        self.template = (
+            None
+            if eng_pipes_key is None
+            else NotificationTemplate(eng_pipes_key)
+        )
 
     def send(self, title: str, body: str) -> None:
         """
@@ -21,9 +60,94 @@ class SlackNotifier:
         if self.eng_pipes_url == "":  # For tests, to avoid sending them out
             return
 
-        send_notification(
-            title=title,
-            text=body,
-            eng_pipes_key=self.eng_pipes_key,
-            eng_pipes_url=self.eng_pipes_url,
+        send_kwargs: Dict[str, Any] = {
+            "title": title,
+            "text": body,
+            "eng_pipes_key": self.eng_pipes_key,
+            "eng_pipes_url": self.eng_pipes_url,
+            "template": self.template,
+        }
+        send: Callable[..., None] = send_notification
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("slack", self.eng_pipes_key)
+            send = self.rate_limiter.wrap(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap(send)
+        send = self.timeouts.wrap(send)
+        if self.deduplicator is not None:
+            fingerprint = self.deduplicator.fingerprint(
+                "slack", title, body, {}
+            )
+            if not self.deduplicator.admit(fingerprint):
+                return
+            send = self.deduplicator.wrap(send, fingerprint)
+        if self.background is not None:
+            self.background.submit(send, **send_kwargs)
+        else:
+            send(**send_kwargs)
+
+
+class AsyncSlackNotifier:
+    """
+    asyncio counterpart of SlackNotifier. Sends do not block the event loop,
+    and any number of them can be in flight at once.
+    A URL for eng-pipes and eng-pipes secret key are required.
+
+    Takes the same optional helpers as SlackNotifier, except for a
+    BackgroundSender.
+    """
+
+    def __init__(
+        self,
+        eng_pipes_key: str,
+        eng_pipes_url: str,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        timeouts: Timeouts | None = None,
+        deduplicator: Deduplicator | None = None,
+    ) -> None:
+        self.eng_pipes_key = eng_pipes_key
+        self.eng_pipes_url = eng_pipes_url
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.timeouts = timeouts or Timeouts()
+        self.deduplicator = deduplicator
+        # Keyed once, rather than for every message.
+        self.template = (
+            None
+            if eng_pipes_key is None
+            else NotificationTemplate(eng_pipes_key)
         )
+
+    async def send(self, title: str, body: str) -> None:
+        """
+        Sends the message to slack
+        """
+        assert self.eng_pipes_key is not None, "Missing Eng-Pipes Signing Key"
+        assert self.eng_pipes_url is not None, "Missing Eng-Pipes API URL"
+
+        if self.eng_pipes_url == "":  # For tests, to avoid sending them out
+            return
+
+        send_kwargs: Dict[str, Any] = {
+            "title": title,
+            "text": body,
+            "eng_pipes_key": self.eng_pipes_key,
+            "eng_pipes_url": self.eng_pipes_url,
+            "template": self.template,
+        }
+        send: Callable[..., Awaitable[None]] = send_notification_async
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket("slack", self.eng_pipes_key)
+            send = self.rate_limiter.wrap_async(send, bucket)
+        if self.retry_policy is not None:
+            send = self.retry_policy.wrap_async(send)
+        send = self.timeouts.wrap_async(send)
+        if self.deduplicator is not None:
+            fingerprint = self.deduplicator.fingerprint(
+                "slack", title, body, {}
+            )
+            if not self.deduplicator.admit(fingerprint):
+                return
+            send = self.deduplicator.wrap_async(send, fingerprint)
+        await send(**send_kwargs)
@@ -0,0 +1,397 @@
+import fcntl
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+SPOOL_ENV = "INFRA_EVENT_NOTIFIER_SPOOL"
+
+# Every record is a big-endian payload length and CRC-32, followed by the
+# payload and the payload length again, so that the last record can be
+# found from the end of the file. The payload is one JSON object, either
+# {"op": "event", "id", "kwargs", "pending"} or {"op": "done", "id",
+# "pending"}, where "pending" counts the events not yet done after it.
+_HEADER = struct.Struct(">II")
+_FOOTER = struct.Struct(">I")
+
+SpoolEntry = Tuple[str, Dict[str, Any]]
+
+
+class SpoolBusy(Exception):
+    pass
+
+
+def default_spool_path() -> str:
+    """
+    Spool used unless told otherwise: $INFRA_EVENT_NOTIFIER_SPOOL if set,
+    otherwise a per-user file that survives reboots.
+    """
+    path = os.environ.get(SPOOL_ENV)
+    if path:
+        return path
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "state"
+    )
+    return os.path.join(state_home, "infra-event-notifier", "spool")
+
+
+def _dedup_key(kwargs: Dict[str, Any]) -> str:
+    canonical = json.dumps(kwargs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Spool:
+    """
+    Append-only file of events that have not been delivered yet.
+
+    The CLI records an event here before sending it and marks it done once
+    Datadog accepted it, so that an event whose send failed, or whose
+    process died mid-send, is replayed by `infra-event-notifier
+    flush-spool`. Every write is fsynced before it returns. Records carry a
+    checksum, so a record torn by a crash is detected and dropped rather
+    than misread. API keys are never written to the spool.
+
+    Appending a record only reads the one before it, so a spool with a
+    large backlog costs no more to write to than an empty one.
+
+    Args:
+        path (str): Spool file, created with its directory if missing
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def append(self, kwargs: Dict[str, Any]) -> str:
+        """
+        Records an event to deliver, given as the keyword arguments for
+        backends.datadog.send_event() minus the API key. Returns its id.
+        """
+        assert "datadog_api_key" not in kwargs, "Do not spool API keys"
+        entry_id = os.urandom(16).hex()
+        self._write({"op": "event", "id": entry_id, "kwargs": kwargs})
+        return entry_id
+
+    def ack(self, entry_id: str) -> None:
+        """
+        Marks an event as delivered.
+        """
+        self._write({"op": "done", "id": entry_id})
+
+    def in_flight(self) -> "InFlight":
+        """
+        Keeps replay() from sending the events this process is about to
+        append and send itself, until released. See InFlight.
+        """
+        return InFlight(self.path)
+
+    def pending(self) -> List[SpoolEntry]:
+        """
+        Returns the (id, kwargs) of every event not yet marked delivered,
+        oldest first.
+        """
+        with self._locked() as fd:
+            return _pending(_read_records(fd)[0])
+
+    def compact(self) -> None:
+        """
+        Rewrites the spool with only the pending events, so that it does
+        not grow without bound.
+        """
+        with self._locked() as fd:
+            pending = _pending(_read_records(fd)[0])
+            directory = os.path.dirname(os.path.abspath(self.path))
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(tmp_fd, "wb") as file:
+                    for count, (entry_id, kwargs) in enumerate(pending, 1):
+                        file.write(
+                            _encode(
+                                {
+                                    "op": "event",
+                                    "id": entry_id,
+                                    "kwargs": kwargs,
+                                    "pending": count,
+                                }
+                            )
+                        )
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            _fsync_dir(directory)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._locked() as fd:
+            size = os.fstat(fd).st_size
+            end, pending = _tail(fd, size)
+            if record["op"] == "event":
+                pending += 1
+            elif pending <= 1:
+                # The count says nothing is left to deliver. It is only a
+                # hint (an event may be acked twice), so make sure before
+                # emptying the spool, rather than letting it grow with
+                # every event the CLI sends.
+                records = _read_records(fd)[0] + [record]
+                pending = len(_pending(records))
+                if not pending:
+                    os.ftruncate(fd, 0)
+                    os.fsync(fd)
+                    return
+            else:
+                pending -= 1
+            # Cut off a record torn by a crash, or the new one would be
+            # read as part of it.
+            if end != size:
+                os.ftruncate(fd, end)
+            os.pwrite(fd, _encode({**record, "pending": pending}), end)
+            os.fsync(fd)
+
+    def _locked(self) -> "_LockedFile":
+        return _LockedFile(self.path)
+
+
+class InFlight:
+    """
+    Held while sending events of a spool from anywhere but replay(), e.g.
+    by the CLI from appending an event until it acked it, so that replay()
+    does not send them a second time: replay() waits until nobody holds
+    one before it looks for pending events. Any number can be held at once,
+    and one held by a process that dies is released with it.
+
+    Args:
+        spool_path (str): Spool the events are appended to
+    """
+
+    def __init__(self, spool_path: str) -> None:
+        self._fd = _open_lock(spool_path, "sending")
+        fcntl.flock(self._fd, fcntl.LOCK_SH)
+
+    def release(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "InFlight":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+def _open_lock(spool_path: str, name: str) -> int:
+    directory = os.path.dirname(os.path.abspath(spool_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.open(
+        f"{spool_path}.{name}.lock",
+        os.O_RDWR | os.O_CREAT | os.O_CLOEXEC,
+        0o600,
+    )
+
+
+class _LockedFile:
+    """
+    Opens the spool (creating it if needed) and holds an exclusive lock on
+    it. The lock is taken on a separate file so that it survives compact()
+    replacing the spool.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock_fd = -1
+        self._fd = -1
+
+    def __enter__(self) -> int:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._lock_fd = os.open(
+            f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600
+        )
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        created = not os.path.exists(self.path)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if created:
+            _fsync_dir(directory)
+        return self._fd
+
+    def __exit__(self, *exc_info: Any) -> None:
+        os.close(self._fd)
+        os.close(self._lock_fd)
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return (
+        _HEADER.pack(len(payload), zlib.crc32(payload))
+        + payload
+        + _FOOTER.pack(len(payload))
+    )
+
+
+def _decode(data: bytes, offset: int) -> Tuple[Dict[str, Any], int] | None:
+    """
+    Returns the record at `offset` and the offset just past it, or None if
+    it is torn or corrupt.
+    """
+    if offset + _HEADER.size > len(data):
+        return None
+    length, crc = _HEADER.unpack_from(data, offset)
+    start = offset + _HEADER.size
+    end = start + length
+    payload = data[start:end]
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+    if end + _FOOTER.size > len(data):
+        return None
+    if _FOOTER.unpack_from(data, end)[0] != length:
+        return None
+    return json.loads(payload), end + _FOOTER.size
+
+
+def _iter_records(data: bytes) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Yields each intact record with the offset just past it, stopping at the
+    first torn or corrupt one.
+    """
+    offset = 0
+    while (decoded := _decode(data, offset)) is not None:
+        record, offset = decoded
+        yield record, offset
+
+
+def _read_records(fd: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Returns the intact records and the offset where they end.
+    """
+    os.lseek(fd, 0, os.SEEK_SET)
+    chunks = []
+    while chunk := os.read(fd, 1 << 16):
+        chunks.append(chunk)
+    records = []
+    end = 0
+    for record, end in _iter_records(b"".join(chunks)):
+        records.append(record)
+    return records, end
+
+
+def _tail(fd: int, size: int) -> Tuple[int, int]:
+    """
+    Returns the offset where the intact records end and the number of
+    pending events after the last of them. Only reads the last record,
+    unless it was torn by a crash.
+    """
+    if size == 0:
+        return 0, 0
+    if size >= _HEADER.size + _FOOTER.size:
+        footer = os.pread(fd, _FOOTER.size, size - _FOOTER.size)
+        (length,) = _FOOTER.unpack(footer)
+        offset = size - _FOOTER.size - length - _HEADER.size
+        if offset >= 0:
+            data = os.pread(fd, size - offset, offset)
+            decoded = _decode(data, 0)
+            if decoded is not None and decoded[1] == len(data):
+                return size, int(decoded[0].get("pending", 0))
+    records, end = _read_records(fd)
+    return end, len(_pending(records))
+
+
+def _pending(records: List[Dict[str, Any]]) -> List[SpoolEntry]:
+    events: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        if record["op"] == "event":
+            events[record["id"]] = record["kwargs"]
+        elif record["op"] == "done":
+            events.pop(record["id"], None)
+    return list(events.items())
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replay(
+    spool: Spool, send: Callable[..., Any], workers: int = 4
+) -> Tuple[int, int]:
+    """
+    Sends every pending event with send(**kwargs), `workers` at a time, and
+    marks the delivered ones done. Identical events, e.g. from a hook that
+    ran twice, are sent once. The spool is compacted afterwards.
+
+    Returns the number of events delivered and the number that failed and
+    are still pending. Raises SpoolBusy if another replay of the same spool
+    is running, since both would send the same events.
+    """
+    directory = os.path.dirname(os.path.abspath(spool.path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    with open(f"{spool.path}.replay.lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise SpoolBusy(f"{spool.path} is already being replayed")
+        return _replay(spool, send, workers)
+
+
+def _replay(
+    spool: Spool, send: Callable[..., Any], workers: int
+) -> Tuple[int, int]:
+    # Wait for everyone sending events of the spool (see InFlight) to be
+    # done, so that none of their events is sent twice. Events spooled
+    # after this are left to whoever spooled them.
+    fd = _open_lock(spool.path, "sending")
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        entries = spool.pending()
+    finally:
+        os.close(fd)
+
+    groups: Dict[str, List[SpoolEntry]] = {}
+    for entry in entries:
+        groups.setdefault(_dedup_key(entry[1]), []).append(entry)
+
+    def deliver(entries: List[SpoolEntry]) -> bool:
+        try:
+            send(**entries[0][1])
+        except Exception as e:
+            print("!! Could not replay a spooled event:", file=sys.stderr)
+            print(e, file=sys.stderr)
+            return False
+        for entry_id, _ in entries:
+            # The event was sent, so count it as delivered either way; a
+            # later replay sends it once more at most.
+            try:
+                spool.ack(entry_id)
+            except OSError as e:
+                print(
+                    "!! Could not remove a replayed event from the spool:",
+                    file=sys.stderr,
+                )
+                print(e, file=sys.stderr)
+        return True
+
+    delivered = failed = 0
+    if groups:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for entries, ok in zip(
+                groups.values(), executor.map(deliver, groups.values())
+            ):
+                if ok:
+                    delivered += len(entries)
+                else:
+                    failed += len(entries)
+    try:
+        spool.compact()
+    except OSError as e:
+        print("!! Could not compact the spool:", file=sys.stderr)
+        print(e, file=sys.stderr)
+    return delivered, failed
@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers["Content-Length"])
+        body = self.rfile.read(length)
+        self.server.peers.append(self.client_address)  # type: ignore
+        self.server.bodies.append(body)  # type: ignore
+        # "drop" hangs up without answering; "last" answers, then hangs up
+        # without saying so, like a server timing out an idle connection.
+        self.close_connection = body in (b"drop", b"last")
+        if body == b"drop":
+            return
+        status = 400 if body == b"bad" else 202
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_PUT = do_POST
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[ThreadingHTTPServer]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.peers: List[tuple] = []  # type: ignore
+    httpd.bodies: List[bytes] = []  # type: ignore
+    host, port = httpd.server_address[:2]
+    httpd.url = f"http://{host}:{port}/api"  # type: ignore
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
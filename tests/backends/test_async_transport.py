@@ -0,0 +1,97 @@
+import asyncio
+from http.client import RemoteDisconnected
+from urllib.error import HTTPError
+from urllib.request import Request
+
+import pytest
+
+from infra_event_notifier.backends.async_transport import AsyncConnectionPool
+
+
+class TestAsyncConnectionPool:
+    def test_reuses_connection(self, server) -> None:
+        async def send_all() -> None:
+            pool = AsyncConnectionPool()
+            for i in range(3):
+                req = Request(server.url, data=f"event {i}".encode())
+                with await pool.urlopen(req) as response:
+                    assert response.status == 202
+                    assert response.read() == f"event {i}".encode()
+            await pool.clear()
+
+        asyncio.run(send_all())
+        assert len(server.peers) == 3
+        assert len(set(server.peers)) == 1
+
+    def test_concurrent_requests(self, server) -> None:
+        async def send_all() -> list:
+            pool = AsyncConnectionPool()
+            responses = await asyncio.gather(
+                *[
+                    pool.urlopen(Request(server.url, data=f"{i}".encode()))
+                    for i in range(8)
+                ]
+            )
+            await pool.clear()
+            return [response.read() for response in responses]
+
+        bodies = asyncio.run(send_all())
+        assert bodies == [f"{i}".encode() for i in range(8)]
+
+    def test_error_status_raises(self, server) -> None:
+        async def send_bad() -> None:
+            pool = AsyncConnectionPool()
+            try:
+                await pool.urlopen(Request(server.url, data=b"bad"))
+            finally:
+                await pool.clear()
+
+        with pytest.raises(HTTPError) as e:
+            asyncio.run(send_bad())
+        assert e.value.code == 400
+
+    def test_replaces_connection_closed_by_server(self, server) -> None:
+        async def send_all() -> bytes:
+            pool = AsyncConnectionPool()
+            try:
+                await pool.urlopen(Request(server.url, data=b"last"))
+                await asyncio.sleep(0.1)
+                req = Request(server.url, data=b"next")
+                with await pool.urlopen(req) as response:
+                    return response.read()
+            finally:
+                await pool.clear()
+
+        assert asyncio.run(send_all()) == b"next"
+        assert server.bodies == [b"last", b"next"]
+        assert len(set(server.peers)) == 2
+
+    def test_does_not_resend_post_after_hang_up(self, server) -> None:
+        async def send_all() -> None:
+            pool = AsyncConnectionPool()
+            try:
+                await pool.urlopen(Request(server.url, data=b"one"))
+                await pool.urlopen(Request(server.url, data=b"drop"))
+            finally:
+                await pool.clear()
+
+        # The server may have acted on a POST before hanging up.
+        with pytest.raises(RemoteDisconnected):
+            asyncio.run(send_all())
+        assert server.bodies == [b"one", b"drop"]
+
+    def test_resends_put_after_hang_up(self, server) -> None:
+        async def send_all() -> None:
+            pool = AsyncConnectionPool()
+            try:
+                await pool.urlopen(Request(server.url, data=b"one"))
+                req = Request(server.url, data=b"drop", method="PUT")
+                await pool.urlopen(req)
+            finally:
+                await pool.clear()
+
+        with pytest.raises(RemoteDisconnected):
+            asyncio.run(send_all())
+        # Sent again once, on a new connection, which hung up too.
+        assert server.bodies == [b"one", b"drop", b"drop"]
+        assert len(set(server.peers)) == 2
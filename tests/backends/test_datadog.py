@@ -4,7 +4,15 @@ from urllib.error import HTTPError
 
 import pytest
 
-from infra_event_notifier.backends.datadog import send_event
+from infra_event_notifier.backends.datadog import (
+    MAX_DATADOG_TEXT_LENGTH,
+    EventTemplate,
+    _encode_event,
+    events_url,
+    markdown_text,
+    send_event,
+    site_from_env,
+)
 
 
 def mock_context_manager() -> MagicMock:
@@ -16,7 +24,7 @@ def mock_context_manager() -> MagicMock:
 
 
 class TestDatadog:
-    @patch("infra_event_notifier.backends.datadog.urllib.request.urlopen")
+    @patch("infra_event_notifier.backends.transport.urlopen")
     @patch("time.time", MagicMock(return_value=12345))
     def test_send_event_request(self, mock_urlopen) -> None:
         mock_urlopen.return_value = mock_context_manager()
@@ -46,7 +54,7 @@ class TestDatadog:
         assert req._data == data
         assert req.headers == headers
 
-    @patch("infra_event_notifier.backends.datadog.urllib.request.urlopen")
+    @patch("infra_event_notifier.backends.transport.urlopen")
     def test_bad_request(self, mock_urlopen) -> None:
         mock_urlopen.return_value = mock_context_manager()
         mock_urlopen.side_effect = HTTPError(
@@ -64,3 +72,130 @@ class TestDatadog:
                 datadog_api_key="fakeapikey",
                 alert_type="user_update",
             )
+
+    @patch("infra_event_notifier.backends.transport.urlopen")
+    def test_send_event_truncates_long_text(self, mock_urlopen) -> None:
+        mock_urlopen.return_value = mock_context_manager()
+
+        send_event(
+            title="test",
+            text=markdown_text("x" * 5000),
+            tags={},
+            datadog_api_key="fakeapikey",
+            alert_type="info",
+        )
+
+        text = json.loads(mock_urlopen.call_args.args[0].data)["text"]
+        assert len(text) == MAX_DATADOG_TEXT_LENGTH
+        assert text.startswith("%%%\nxxx")
+        assert text.endswith("more characters truncated]\n%%%")
+
+
+class TestEventTemplate:
+    SHARED = {"source": "terragrunt", "sentry_user": "me"}
+
+    @pytest.mark.parametrize(
+        "tags, alert_type",
+        [
+            # Only shared tags, and extra ones.
+            (SHARED, "info"),
+            ({**SHARED, "slice": "us/kafka", "quote": '"'}, "info"),
+            ({**SHARED, "slice": "us/kafka"}, "error"),
+            # Shared tags after, and between, the event's own ones.
+            ({"slice": "us/kafka", **SHARED}, "info"),
+            (
+                {
+                    "slice": "us",
+                    "source": "terragrunt",
+                    "x": "y",
+                    "sentry_user": "me",
+                },
+                "info",
+            ),
+            # Events without the shared tags are encoded in full.
+            ({"source": "terragrunt"}, "info"),
+            ({**SHARED, "sentry_user": "you"}, "info"),
+        ],
+    )
+    def test_same_payload(self, tags, alert_type) -> None:
+        template = EventTemplate(self.SHARED)
+        text = markdown_text("x" * (MAX_DATADOG_TEXT_LENGTH + 1))
+        rendered = template.render("title é", text, tags, alert_type, 12345)
+        assert rendered == _encode_event(
+            "title é", text, tags, alert_type, 12345
+        )
+
+    def test_no_shared_tags(self) -> None:
+        template = EventTemplate({})
+        tags = {"slice": "us/kafka"}
+        assert template.render("title", "text", tags, None, 1) == (
+            _encode_event("title", "text", tags, "info", 1)
+        )
+
+    @patch("infra_event_notifier.backends.transport.urlopen")
+    def test_send_event(self, mock_urlopen) -> None:
+        mock_urlopen.return_value = mock_context_manager()
+        send_event(
+            "title",
+            "text",
+            {**self.SHARED, "slice": "us/kafka"},
+            "fakeapikey",
+            "info",
+            EventTemplate(self.SHARED),
+        )
+        payload = json.loads(mock_urlopen.call_args.args[0].data)
+        assert payload["tags"] == [
+            "source:terragrunt",
+            "sentry_user:me",
+            "slice:us/kafka",
+        ]
+
+    @patch("infra_event_notifier.backends.transport.urlopen")
+    def test_send_event_date_happened(self, mock_urlopen) -> None:
+        mock_urlopen.return_value = mock_context_manager()
+        for template in (None, EventTemplate(self.SHARED)):
+            send_event(
+                "title",
+                "text",
+                dict(self.SHARED),
+                "fakeapikey",
+                "info",
+                template,
+                date_happened=1234,
+            )
+            payload = json.loads(mock_urlopen.call_args.args[0].data)
+            assert payload["date_happened"] == 1234
+
+
+class TestSite:
+    @pytest.mark.parametrize(
+        "value, site",
+        [
+            (None, "datadoghq.com"),
+            ("", "datadoghq.com"),
+            ("datadoghq.eu", "datadoghq.eu"),
+            ("us5.datadoghq.com", "us5.datadoghq.com"),
+            ("https://app.datadoghq.eu/", "datadoghq.eu"),
+            ("https://us3.datadoghq.com", "us3.datadoghq.com"),
+        ],
+    )
+    def test_site_from_env(self, monkeypatch, value, site) -> None:
+        if value is None:
+            monkeypatch.delenv("DD_SITE", raising=False)
+        else:
+            monkeypatch.setenv("DD_SITE", value)
+        assert site_from_env() == site
+
+    def test_events_url(self, monkeypatch) -> None:
+        monkeypatch.setenv("DD_SITE", "us5.datadoghq.com")
+        assert events_url() == "https://api.us5.datadoghq.com/api/v1/events"
+        assert events_url("datadoghq.eu") == (
+            "https://api.datadoghq.eu/api/v1/events"
+        )
+
+    @patch("infra_event_notifier.backends.transport.urlopen")
+    def test_send_event_to_site(self, mock_urlopen) -> None:
+        mock_urlopen.return_value = mock_context_manager()
+        send_event("title", "text", {}, "fakeapikey", "info", site="ddog.eu")
+        req = mock_urlopen.call_args.args[0]
+        assert req.full_url == "https://api.ddog.eu/api/v1/events"
@@ -0,0 +1,72 @@
+import pathlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infra_event_notifier.backends.dedup import Deduplicator
+
+TAGS = {"service": "kafka", "region": "us"}
+
+
+class TestDeduplicator:
+    def test_fingerprint(self) -> None:
+        dedup = Deduplicator()
+        fingerprint = dedup.fingerprint("datadog", "title", "body", TAGS)
+        assert fingerprint.startswith("datadog:")
+        reordered = {"region": "us", "service": "kafka"}
+        assert dedup.fingerprint("datadog", "title", "body", reordered) == (
+            fingerprint
+        )
+        assert dedup.fingerprint("slack", "title", "body", TAGS) != (
+            fingerprint
+        )
+        assert dedup.fingerprint("datadog", "title", "other", TAGS) != (
+            fingerprint
+        )
+
+    def test_ignores_body(self) -> None:
+        dedup = Deduplicator(include_body=False)
+        assert dedup.fingerprint("datadog", "title", "one", TAGS) == (
+            dedup.fingerprint("datadog", "title", "two", TAGS)
+        )
+
+    def test_window(self) -> None:
+        dedup = Deduplicator(window=60)
+        with patch("time.time", MagicMock(return_value=1000)):
+            assert dedup.admit("datadog:a")
+            assert not dedup.admit("datadog:a")
+            assert dedup.admit("datadog:b")
+        # Repeats do not extend the window.
+        with patch("time.time", MagicMock(return_value=1059)):
+            assert not dedup.admit("datadog:a")
+        with patch("time.time", MagicMock(return_value=1060)):
+            assert dedup.admit("datadog:a")
+        assert dedup.suppressed == {"datadog": 2}
+
+    def test_evicts_oldest(self) -> None:
+        dedup = Deduplicator(maxsize=2)
+        for fingerprint in ["slack:a", "slack:b", "slack:c"]:
+            assert dedup.admit(fingerprint)
+        assert dedup.admit("slack:a")
+        assert not dedup.admit("slack:c")
+
+    def test_forgets_failed_sends(self) -> None:
+        dedup = Deduplicator()
+        assert dedup.admit("slack:a")
+        send = dedup.wrap(MagicMock(side_effect=ValueError()), "slack:a")
+        with pytest.raises(ValueError):
+            send()
+        assert dedup.admit("slack:a")
+
+    def test_shared_file(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "dedup")
+        assert Deduplicator(path=path).admit("datadog:a")
+        other = Deduplicator(path=path)
+        assert not other.admit("datadog:a")
+        other.forget("datadog:a")
+        assert Deduplicator(path=path).admit("datadog:a")
+
+    def test_damaged_file(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "dedup"
+        path.write_text("not json")
+        assert Deduplicator(path=str(path)).admit("datadog:a")
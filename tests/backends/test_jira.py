@@ -1,17 +1,29 @@
+import asyncio
 import json
+import time
 from base64 import b64encode
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.error import HTTPError
 
 import pytest
 
 from infra_event_notifier.backends.jira import (
+    MAX_JIRA_DESCRIPTION_LENGTH,
+    IssueType,
     JiraApiException,
     JiraConfig,
+    JiraFields,
     _add_jira_comment,
     _create_jira_issue,
     _find_jira_issue,
     _update_jira_issue,
+    create_or_update_issue,
+    create_or_update_issue_async,
+    create_or_update_issues,
+    find_issues,
 )
+from infra_event_notifier.backends.jira_cache import IssueKeyCache
+from infra_event_notifier.backends.retry import RetryPolicy
 
 
 @pytest.fixture(autouse=True)
@@ -30,7 +42,8 @@ def test_create_issue_success(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         body = "tokyo drift"
         title = "[Infra Event] Test"
@@ -76,7 +89,8 @@ def test_create_issue_failure(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         body = "tokyo drift"
         title = "[Infra Event] Test"
@@ -122,7 +136,8 @@ def test_update_ticket_success(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_put:
         body = "tokyo drift"
         issue_key = "JIRA-123"
@@ -154,7 +169,8 @@ def test_update_ticket_failure(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_put:
         body = "tokyo drift"
         issue_key = "JIRA-123"
@@ -187,7 +203,8 @@ def test_find_jira_issue_success(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         title = "[Infra Event] Test"
         tags = {
@@ -232,7 +249,8 @@ def test_find_jira_issue_not_found(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         title = "[Infra Event] Test"
         tags = {
@@ -277,7 +295,8 @@ def test_find_jira_issue_failure(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         title = ""
         tags = {}
@@ -316,7 +335,8 @@ def test_create_comment_success(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         issue_key = "JIRA-123"
         test_comment = "test comment"
@@ -351,7 +371,8 @@ def test_create_comment_failure(setup):
     mock_response.__enter__.return_value = mock_response
 
     with patch(
-        "urllib.request.urlopen", return_value=mock_response
+        "infra_event_notifier.backends.transport.urlopen",
+        return_value=mock_response,
     ) as mock_post:
         issue_key = "JIRA-123"
         test_comment = "test comment"
@@ -378,3 +399,542 @@ def test_create_comment_failure(setup):
             == f"Basic {base64string.decode('utf-8')}"
         )
         assert req.get_method() == "POST"
+
+
+def test_create_or_update_issue_async_existing(setup):
+    jiraConf = setup
+    search_response = MagicMock()
+    search_response.status = 200
+    search_response.read.return_value = b'{"issues": [{"key": "JIRA-123"}]}'
+    search_response.__enter__.return_value = search_response
+    update_response = MagicMock()
+    update_response.status = 204
+    update_response.__enter__.return_value = update_response
+
+    with patch(
+        "infra_event_notifier.backends.async_transport.urlopen",
+        AsyncMock(side_effect=[search_response, update_response]),
+    ) as mock_urlopen:
+        fields = JiraFields("title", "body", IssueType.TASK, {"foo": "bar"})
+        asyncio.run(
+            create_or_update_issue_async(
+                jiraConf, fields, "comment", update_text_body=True
+            )
+        )
+
+        reqs = [call.args[0] for call in mock_urlopen.call_args_list]
+        assert [req.get_method() for req in reqs] == ["POST", "PUT"]
+        assert reqs[0]._full_url == f"{jiraConf.url}/rest/api/2/search"
+        assert reqs[1]._full_url == f"{jiraConf.url}/rest/api/2/issue/JIRA-123"
+        # The comment is added by the same request as the new description.
+        assert json.loads(reqs[1].data) == {
+            "fields": {"description": "body"},
+            "update": {"comment": [{"add": {"body": "comment"}}]},
+        }
+
+
+def test_create_or_update_issue_update_and_comment(setup):
+    jiraConf = setup
+    search = _response(200, b'{"issues": [{"key": "JIRA-123"}]}')
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[search, _response(204)],
+    ) as mock_urlopen:
+        fields = JiraFields("title", "body", IssueType.TASK, {"foo": "bar"})
+        create_or_update_issue(
+            jiraConf, fields, "comment", update_text_body=True
+        )
+
+        reqs = [call.args[0] for call in mock_urlopen.call_args_list]
+        assert [req.get_method() for req in reqs] == ["POST", "PUT"]
+        assert json.loads(reqs[1].data)["update"] == {
+            "comment": [{"add": {"body": "comment"}}]
+        }
+
+
+def _response(status: int, body: bytes = b"") -> MagicMock:
+    response = MagicMock()
+    response.status = status
+    response.read.return_value = body
+    response.__enter__.return_value = response
+    return response
+
+
+def test_create_or_update_issue_uses_cache(setup):
+    jiraConf = setup
+    jiraConf.issue_cache = IssueKeyCache()
+    fields = JiraFields("title", "body", IssueType.TASK, {"foo": "bar"})
+    search = _response(200, b'{"issues": [{"key": "JIRA-123"}]}')
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[search, _response(201), _response(201)],
+    ) as mock_urlopen:
+        create_or_update_issue(jiraConf, fields, "first")
+        create_or_update_issue(jiraConf, fields, "second")
+
+        urls = [call.args[0]._full_url for call in mock_urlopen.call_args_list]
+        comment_url = f"{jiraConf.url}/rest/api/2/issue/JIRA-123/comment"
+        # Only the first event searched.
+        assert urls == [
+            f"{jiraConf.url}/rest/api/2/search",
+            comment_url,
+            comment_url,
+        ]
+
+
+def test_create_or_update_issue_cache_invalidated_on_404(setup):
+    jiraConf = setup
+    jiraConf.issue_cache = IssueKeyCache()
+    jiraConf.issue_cache.set(jiraConf.project_key, {"foo": "bar"}, "JIRA-1")
+    fields = JiraFields("title", "body", IssueType.TASK, {"foo": "bar"})
+    not_found = HTTPError("url", 404, "Not Found", hdrs=None, fp=None)
+    search = _response(200, b'{"issues": [{"key": "JIRA-2"}]}')
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[not_found, search, _response(201)],
+    ) as mock_urlopen:
+        create_or_update_issue(jiraConf, fields, "comment")
+
+        urls = [call.args[0]._full_url for call in mock_urlopen.call_args_list]
+        assert urls == [
+            f"{jiraConf.url}/rest/api/2/issue/JIRA-1/comment",
+            f"{jiraConf.url}/rest/api/2/search",
+            f"{jiraConf.url}/rest/api/2/issue/JIRA-2/comment",
+        ]
+    assert (
+        jiraConf.issue_cache.get(jiraConf.project_key, {"foo": "bar"})
+        == "JIRA-2"
+    )
+
+
+class FakeJira:
+    """
+    Answers the requests of create_or_update_issues() by URL, since updates
+    are sent concurrently and may arrive in any order.
+    """
+
+    def __init__(
+        self, url, existing, bulk_errors=(), delay=None, lost_answers=()
+    ):
+        self.url = url
+        self.existing = existing
+        self.bulk_errors = set(bulk_errors)
+        # Seconds to wait before answering a request, to let later ones
+        # overtake it if they are sent concurrently.
+        self.delay = delay
+        # (method, URL suffix) of requests that are carried out but whose
+        # answer is lost, once each, like when Jira times out.
+        self.lost_answers = list(lost_answers)
+        # Descriptions of the issues, as Jira stores them.
+        self.descriptions = {}
+        self.requests = []
+        self.answered = []
+
+    def __call__(self, req):
+        self.requests.append(req)
+        payload = json.loads(req.data)
+        if self.delay is not None:
+            time.sleep(self.delay(req))
+        self.answered.append(req)
+        response = self._answer(req, payload)
+        for lost in self.lost_answers:
+            method, suffix = lost
+            if req.get_method() == method and req.full_url.endswith(suffix):
+                self.lost_answers.remove(lost)
+                raise TimeoutError("The read operation timed out")
+        return response
+
+    def _answer(self, req, payload):
+        if req.full_url == f"{self.url}/rest/api/2/search":
+            issues = [
+                {
+                    "key": key,
+                    "fields": {
+                        "labels": labels,
+                        "description": self.descriptions.get(key),
+                    },
+                }
+                for key, labels in self.existing.items()
+            ]
+            body = {"issues": issues, "total": len(issues)}
+            return _response(200, json.dumps(body).encode())
+        if req.full_url == f"{self.url}/rest/api/2/issue/bulk":
+            body = {"issues": [], "errors": []}
+            for n, update in enumerate(payload["issueUpdates"]):
+                if n in self.bulk_errors:
+                    body["errors"].append(
+                        {
+                            "failedElementNumber": n,
+                            "elementErrors": {"errors": {"labels": "bad"}},
+                        }
+                    )
+                else:
+                    key = f"NEW-{len(self.existing) + 1}"
+                    self.existing[key] = update["fields"]["labels"]
+                    body["issues"].append({"key": key})
+            return _response(201, json.dumps(body).encode())
+        if req.get_method() == "PUT":
+            key = req.full_url.rsplit("/", 1)[1]
+            self.descriptions[key] = payload["fields"]["description"]
+            return _response(204)
+        return _response(201)
+
+
+def test_create_or_update_issues(setup):
+    jiraConf = setup
+    jiraConf.issue_cache = IssueKeyCache()
+    fake = FakeJira(jiraConf.url, {"JIRA-1": ["alert:a", "region:us"]})
+    issues = [
+        JiraFields("a", "body", IssueType.TASK, {"alert": "a"}),
+        JiraFields("b", "body", IssueType.TASK, {"alert": "b"}),
+        JiraFields("c", "body", IssueType.BUG, {"alert": "c"}),
+        JiraFields("b again", "body", IssueType.TASK, {"alert": "b"}),
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(jiraConf, issues, "seen again")
+
+    assert results == [None, None, None, None]
+    urls = sorted(req.full_url for req in fake.requests)
+    assert urls == [
+        f"{jiraConf.url}/rest/api/2/issue/JIRA-1/comment",
+        f"{jiraConf.url}/rest/api/2/issue/NEW-2/comment",
+        f"{jiraConf.url}/rest/api/2/issue/bulk",
+        f"{jiraConf.url}/rest/api/2/search",
+    ]
+    bulk = json.loads(fake.requests[1].data)
+    # The repeated label set is created once.
+    assert [u["fields"]["summary"] for u in bulk["issueUpdates"]] == ["b", "c"]
+    assert bulk["issueUpdates"][1]["fields"]["issuetype"] == {"name": "Bug"}
+    assert (
+        jiraConf.issue_cache.get(jiraConf.project_key, {"alert": "c"})
+        == "NEW-3"
+    )
+
+
+def test_create_or_update_issues_same_key_in_order(setup):
+    jiraConf = setup
+    # The first update of JIRA-1 is slow; the second must still follow it.
+    fake = FakeJira(
+        jiraConf.url,
+        {"JIRA-1": ["alert:a"]},
+        delay=lambda req: 0.05 if b"first" in req.data else 0,
+    )
+    issues = [
+        JiraFields("a", "first body", IssueType.TASK, {"alert": "a"}),
+        JiraFields("a", "second body", IssueType.TASK, {"alert": "a"}),
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(
+            jiraConf, issues, None, update_text_body=True
+        )
+
+    assert results == [None, None]
+    updates = [
+        json.loads(req.data)["fields"]["description"]
+        for req in fake.answered
+        if req.get_method() == "PUT"
+    ]
+    assert updates == ["first body", "second body"]
+
+
+def test_create_or_update_issues_comments_before_duplicates(setup):
+    jiraConf = setup
+    fake = FakeJira(
+        jiraConf.url,
+        {},
+        delay=lambda req: 0.05 if req.full_url.endswith("/comment") else 0,
+    )
+    long_body = "x" * (MAX_JIRA_DESCRIPTION_LENGTH + 100)
+    issues = [
+        JiraFields("b", long_body, IssueType.TASK, {"alert": "b"}),
+        JiraFields("b", "short body", IssueType.TASK, {"alert": "b"}),
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(
+            jiraConf, issues, None, update_text_body=True
+        )
+
+    assert results == [None, None]
+    # The rest of the long body lands before the duplicate replaces it.
+    requests = [
+        (req.get_method(), req.full_url.rsplit("/", 2)[-1])
+        for req in fake.answered
+        if "NEW-1" in req.full_url
+    ]
+    assert requests == [("POST", "comment"), ("PUT", "NEW-1")]
+    assert json.loads(fake.answered[-1].data)["fields"]["description"] == (
+        "short body"
+    )
+
+
+def test_create_or_update_issues_chunks_and_failures(setup):
+    jiraConf = setup
+    fake = FakeJira(jiraConf.url, {}, bulk_errors={1})
+    issues = [
+        JiraFields(f"t{n}", "body", IssueType.TASK, {"n": str(n)})
+        for n in range(51)
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(jiraConf, issues, None)
+
+    bulk = [
+        json.loads(req.data)
+        for req in fake.requests
+        if req.full_url.endswith("/bulk")
+    ]
+    assert sorted(len(b["issueUpdates"]) for b in bulk) == [1, 50]
+    assert len(fake.requests) == 3
+    assert isinstance(results[1], JiraApiException)
+    assert results[:1] + results[2:] == [None] * 50
+
+
+def test_find_issues_pages_and_indexes(setup):
+    jiraConf = setup
+    pages = [
+        {
+            "issues": [
+                {"key": "JIRA-3", "fields": {"labels": ["a:1", "b:2"]}},
+                {"key": "JIRA-2", "fields": {"labels": ["a:1"]}},
+            ],
+            "total": 3,
+        },
+        {
+            "issues": [{"key": "JIRA-1", "fields": {"labels": ["a:1"]}}],
+            "total": 3,
+        },
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[_response(200, json.dumps(p).encode()) for p in pages],
+    ) as mock_urlopen:
+        index = find_issues(jiraConf, [{"a": "1"}, {"a": "1", "b": "2"}])
+
+    payloads = [
+        json.loads(c.args[0].data) for c in mock_urlopen.call_args_list
+    ]
+    assert [p["startAt"] for p in payloads] == [0, 2]
+    assert payloads[0]["jql"] == (
+        f"project = {jiraConf.project_key} AND status != Closed "
+        "AND status != DONE AND ((labels = a:1) OR "
+        "(labels = a:1 AND labels = b:2))"
+    )
+    # Every match is returned, so duplicates can be spotted.
+    assert index.matches({"a": "1"}) == ["JIRA-3", "JIRA-2", "JIRA-1"]
+    assert index.find({"a": "1", "b": "2"}) == "JIRA-3"
+    assert index.find({"c": "3"}) is None
+
+
+def test_find_issues_splits_long_queries(setup):
+    jiraConf = setup
+    empty = b'{"issues": [], "total": 0}'
+    tag_sets = [{"alert": f"a{n}"} for n in range(10)]
+
+    with (
+        patch("infra_event_notifier.backends.jira.MAX_JQL_LENGTH", 200),
+        patch(
+            "infra_event_notifier.backends.transport.urlopen",
+            side_effect=lambda req: _response(200, empty),
+        ) as mock_urlopen,
+    ):
+        find_issues(jiraConf, tag_sets)
+
+    queries = [
+        json.loads(c.args[0].data)["jql"] for c in mock_urlopen.call_args_list
+    ]
+    assert len(queries) > 1
+    assert all(len(jql) <= 200 for jql in queries)
+    assert sum(jql.count("labels =") for jql in queries) == 10
+
+
+def test_create_or_update_issue_skips_unchanged_description(setup):
+    jiraConf = setup
+    issue = {"key": "JIRA-123", "fields": {"description": "body"}}
+    search = _response(200, json.dumps({"issues": [issue]}).encode())
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[search, _response(201)],
+    ) as mock_urlopen:
+        fields = JiraFields("title", "body", IssueType.TASK, {"foo": "bar"})
+        create_or_update_issue(
+            jiraConf, fields, "comment", update_text_body=True
+        )
+
+        reqs = [call.args[0] for call in mock_urlopen.call_args_list]
+        assert "description" in json.loads(reqs[0].data)["fields"]
+        # Only the comment is sent.
+        assert [req.full_url for req in reqs[1:]] == [
+            f"{jiraConf.url}/rest/api/2/issue/JIRA-123/comment"
+        ]
+
+
+def test_create_or_update_issue_caches_description_hash(setup):
+    jiraConf = setup
+    jiraConf.issue_cache = IssueKeyCache()
+    issue = {"key": "JIRA-123", "fields": {"description": "old"}}
+    search = _response(200, json.dumps({"issues": [issue]}).encode())
+    fields = JiraFields("title", "new", IssueType.TASK, {"foo": "bar"})
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[search, _response(204)],
+    ) as mock_urlopen:
+        create_or_update_issue(jiraConf, fields, None, update_text_body=True)
+        # A repeat of the event changes nothing, so it makes no request.
+        create_or_update_issue(jiraConf, fields, None, update_text_body=True)
+
+        methods = [c.args[0].get_method() for c in mock_urlopen.call_args_list]
+        assert methods == ["POST", "PUT"]
+
+
+def test_create_issue_continues_long_body_in_comments(setup):
+    jiraConf = setup
+    body = "x" * (MAX_JIRA_DESCRIPTION_LENGTH + 100)
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen",
+        side_effect=[_response(201, b'{"key": "JIRA-9"}'), _response(201)],
+    ) as mock_urlopen:
+        _create_jira_issue(jiraConf, "title", body, {}, "Task")
+
+        reqs = [call.args[0] for call in mock_urlopen.call_args_list]
+        description = json.loads(reqs[0].data)["fields"]["description"]
+        comment = json.loads(reqs[1].data)["body"]
+        assert len(description) <= MAX_JIRA_DESCRIPTION_LENGTH
+        assert "continued in comments" in description
+        assert reqs[1].full_url.endswith("/issue/JIRA-9/comment")
+        assert description.index("\n") + len(comment) == len(body)
+
+
+def _retry_wrapper(fn):
+    return RetryPolicy(backoff=0).wrap(fn)
+
+
+def test_create_or_update_issues_does_not_recreate(setup):
+    jiraConf = setup
+    # Jira creates the issues, but the answer never arrives.
+    fake = FakeJira(jiraConf.url, {}, lost_answers=[("POST", "/issue/bulk")])
+    issues = [
+        JiraFields("b", "body", IssueType.TASK, {"alert": "b"}),
+        JiraFields("c", "body", IssueType.TASK, {"alert": "c"}),
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(
+            jiraConf, issues, None, wrap=_retry_wrapper
+        )
+
+    assert results == [None, None]
+    # The retry searched again and found both issues.
+    assert [req.full_url.rsplit("/", 1)[1] for req in fake.requests] == [
+        "search",
+        "bulk",
+        "search",
+    ]
+    assert list(fake.existing) == ["NEW-1", "NEW-2"]
+
+
+def test_create_or_update_issues_does_not_resend_comments(setup):
+    jiraConf = setup
+    fake = FakeJira(
+        jiraConf.url,
+        {"JIRA-1": ["alert:a"]},
+        lost_answers=[("POST", "/comment"), ("PUT", "/issue/JIRA-1")],
+    )
+    issues = [
+        JiraFields("a", "new body", IssueType.TASK, {"alert": "a"}),
+        JiraFields("a", "newer body", IssueType.TASK, {"alert": "a"}),
+    ]
+
+    with patch(
+        "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+    ):
+        results = create_or_update_issues(
+            jiraConf, issues, None, update_text_body=True, wrap=_retry_wrapper
+        )
+        comment = [JiraFields("a", "body", IssueType.TASK, {"alert": "a"})]
+        comment_results = create_or_update_issues(
+            jiraConf, comment, "seen again", wrap=_retry_wrapper
+        )
+
+    # The description is only replaced, so it is safe to send again.
+    assert results == [None, None]
+    descriptions = [
+        json.loads(req.data)["fields"]["description"]
+        for req in fake.requests
+        if req.get_method() == "PUT"
+    ]
+    assert descriptions == ["new body", "new body", "newer body"]
+    # The comment may have been added, so it is not.
+    assert isinstance(comment_results[0], TimeoutError)
+    assert [req.full_url.endswith("/comment") for req in fake.requests].count(
+        True
+    ) == 1
+
+
+def _update_one(jiraConf, fields):
+    create_or_update_issue(jiraConf, fields, None, update_text_body=True)
+
+
+def _update_one_async(jiraConf, fields):
+    asyncio.run(
+        create_or_update_issue_async(
+            jiraConf, fields, None, update_text_body=True
+        )
+    )
+
+
+def _update_many(jiraConf, fields):
+    results = create_or_update_issues(
+        jiraConf, [fields], None, update_text_body=True
+    )
+    assert results == [None]
+
+
+@pytest.mark.parametrize(
+    "update", [_update_one, _update_one_async, _update_many]
+)
+def test_oversized_body_not_sent_again(setup, update):
+    jiraConf = setup
+    fake = FakeJira(jiraConf.url, {"JIRA-1": ["alert:a"]})
+    long_body = "x" * (MAX_JIRA_DESCRIPTION_LENGTH + 100)
+    fields = JiraFields("a", long_body, IssueType.TASK, {"alert": "a"})
+
+    with (
+        patch(
+            "infra_event_notifier.backends.transport.urlopen", side_effect=fake
+        ),
+        patch(
+            "infra_event_notifier.backends.async_transport.urlopen",
+            AsyncMock(side_effect=fake),
+        ),
+    ):
+        update(jiraConf, fields)
+        # Jira stores the cut description; the same body again matches it.
+        update(jiraConf, fields)
+
+    # The overflow rode along with the description, as a comment; the
+    # second update found nothing to change.
+    assert [req.full_url.rsplit("/", 1)[1] for req in fake.requests] == [
+        "search",
+        "JIRA-1",
+        "search",
+    ]
@@ -0,0 +1,58 @@
+import pathlib
+from unittest.mock import MagicMock, patch
+
+from infra_event_notifier.backends.jira_cache import IssueKeyCache
+
+TAGS = {"service": "kafka", "region": "us"}
+
+
+class TestIssueKeyCache:
+    def test_tag_order_does_not_matter(self) -> None:
+        cache = IssueKeyCache()
+        cache.set("TESTINC", TAGS, "TESTINC-1")
+        reordered = {"region": "us", "service": "kafka"}
+        assert cache.get("TESTINC", reordered) == "TESTINC-1"
+        assert cache.get("OTHER", TAGS) is None
+        assert cache.get("TESTINC", {"service": "kafka"}) is None
+
+    def test_expiry(self) -> None:
+        cache = IssueKeyCache(ttl=60)
+        with patch("time.time", MagicMock(return_value=1000)):
+            cache.set("TESTINC", TAGS, "TESTINC-1")
+        with patch("time.time", MagicMock(return_value=1059)):
+            assert cache.get("TESTINC", TAGS) == "TESTINC-1"
+        with patch("time.time", MagicMock(return_value=1060)):
+            assert cache.get("TESTINC", TAGS) is None
+
+    def test_content_hash(self) -> None:
+        cache = IssueKeyCache()
+        cache.set("TESTINC", TAGS, "TESTINC-1")
+        assert cache.lookup("TESTINC", TAGS) == ("TESTINC-1", None)
+        cache.set("TESTINC", TAGS, "TESTINC-1", "abc123")
+        assert cache.lookup("TESTINC", TAGS) == ("TESTINC-1", "abc123")
+
+    def test_invalidate(self) -> None:
+        cache = IssueKeyCache()
+        cache.set("TESTINC", TAGS, "TESTINC-1")
+        cache.invalidate("TESTINC", TAGS)
+        assert cache.get("TESTINC", TAGS) is None
+
+    def test_shared_file(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "issues.json")
+        IssueKeyCache(path=path).set("TESTINC", TAGS, "TESTINC-1")
+
+        other_process = IssueKeyCache(path=path)
+        assert other_process.get("TESTINC", TAGS) == "TESTINC-1"
+
+        other_process.invalidate("TESTINC", TAGS)
+        assert IssueKeyCache(path=path).get("TESTINC", TAGS) is None
+
+    def test_corrupt_file_is_ignored(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "issues.json"
+        path.write_text("{not json")
+        cache = IssueKeyCache(path=str(path))
+        assert cache.get("TESTINC", TAGS) is None
+        cache.set("TESTINC", TAGS, "TESTINC-1")
+        assert IssueKeyCache(path=str(path)).get("TESTINC", TAGS) == (
+            "TESTINC-1"
+        )
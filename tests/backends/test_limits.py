@@ -0,0 +1,33 @@
+from infra_event_notifier.backends.limits import chunks, fit, truncate
+
+
+def test_fit_short_text_is_unchanged() -> None:
+    text = "short"
+    head, overflow = fit(text, 10)
+    assert head is text
+    assert overflow == ""
+
+
+def test_fit_long_text() -> None:
+    text = "x" * 100 + "y" * 100
+    head, overflow = fit(text, 100)
+    assert len(head) <= 100
+    kept = head.index("\n")
+    assert (
+        head[kept:] == f"\n\n[... {len(overflow)} more characters truncated]"
+    )
+    assert head[:kept] + overflow == text
+
+
+def test_truncate_and_chunks() -> None:
+    assert len(truncate("x" * 1000, 50)) <= 50
+    assert chunks("abcdefg", 3) == ["abc", "def", "g"]
+    assert chunks("", 3) == []
+
+
+def test_fit_limit_shorter_than_marker() -> None:
+    text = "x" * 100
+    head, overflow = fit(text, 5)
+    assert head == "xxxxx"
+    assert head + overflow == text
+    assert truncate(text, 0) == ""
@@ -0,0 +1,91 @@
+import socket
+from typing import Iterator, List
+from urllib.error import HTTPError
+from urllib.request import Request
+
+import pytest
+
+from infra_event_notifier.backends import metrics, slack
+from infra_event_notifier.backends.transport import ConnectionPool
+
+
+@pytest.fixture
+def timings() -> Iterator[List[metrics.Timing]]:
+    reported: List[metrics.Timing] = []
+    previous = metrics.set_sink(reported.append)
+    yield reported
+    metrics.set_sink(previous)
+
+
+class TestMeasure:
+    def test_phases_of_backend_call(self, server, timings) -> None:
+        for _ in range(2):
+            slack.send_notification("title", "body", "key", server.url)
+
+        first, second = timings
+        assert first.tags == {
+            "backend": "slack",
+            "endpoint": "notification",
+            "status": "202",
+        }
+        assert set(first.phases) == {
+            "encode",
+            "dns",
+            "connect",
+            "server",
+            "read",
+        }
+        assert first.total >= sum(first.phases.values())
+        # The second request reused the connection.
+        assert set(second.phases) == {"encode", "server", "read"}
+        assert str(first).startswith("slack notification 202: ")
+
+    def test_error_status(self, server, timings) -> None:
+        pool = ConnectionPool()
+        with pytest.raises(HTTPError):
+            with metrics.measure("test", "api"):
+                pool.urlopen(Request(server.url, data=b"bad"))
+        pool.clear()
+        assert timings[0].status == "400"
+
+    def test_failed_call(self, timings) -> None:
+        with pytest.raises(ValueError):
+            with metrics.measure("test", "api"):
+                raise ValueError()
+        assert timings[0].status == "error"
+
+    def test_not_timed_without_sink(self) -> None:
+        assert metrics.set_sink(None) is None
+        with metrics.measure("test", "api"):
+            assert metrics.current() is None
+
+    def test_sink_errors_do_not_fail_calls(self, capsys) -> None:
+        def sink(timing: metrics.Timing) -> None:
+            raise RuntimeError("sink is broken")
+
+        previous = metrics.set_sink(sink)
+        try:
+            with metrics.measure("test", "api"):
+                pass
+        finally:
+            metrics.set_sink(previous)
+        assert "sink is broken" in capsys.readouterr().err
+
+
+def test_dogstatsd_sink() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as agent:
+        agent.bind(("127.0.0.1", 0))
+        agent.settimeout(5)
+        timing = metrics.Timing("jira", "search")
+        timing.status = "200"
+        timing.total = 0.5
+        timing.add("server", 0.25)
+        with metrics.DogStatsdSink(port=agent.getsockname()[1]) as sink:
+            sink(timing)
+        lines = agent.recv(4096).decode().splitlines()
+
+    tags = "#backend:jira,endpoint:search,status:200"
+    assert lines == [
+        f"infra_event_notifier.request.total:500.000|ms|{tags}",
+        f"infra_event_notifier.request.server:250.000|ms|{tags}",
+    ]
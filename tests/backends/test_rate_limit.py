@@ -0,0 +1,157 @@
+import asyncio
+import multiprocessing
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infra_event_notifier.backends.jira import IssueType
+from infra_event_notifier.backends.rate_limit import (
+    RateLimiter,
+    RateLimitTimeout,
+)
+from infra_event_notifier.datadog_notifier import DatadogNotifier
+from infra_event_notifier.jira_notifier import JiraNotifier
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("time.time", fake.time), patch("time.sleep", fake.sleep):
+        yield fake
+
+
+def _acquire_many(path: str, count: int) -> None:
+    limiter = RateLimiter(rate=0.001, burst=100, path=path)
+    for _ in range(count):
+        limiter.acquire("datadog", timeout=0)
+
+
+class TestRateLimiter:
+    def test_burst_then_paced(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(rate=2, burst=3)
+        for _ in range(5):
+            limiter.acquire("datadog")
+        assert clock.sleeps == [0.5, 0.5]
+
+    def test_refills_over_time(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(rate=1, burst=2)
+        limiter.acquire("datadog")
+        limiter.acquire("datadog")
+        clock.now += 10
+        limiter.acquire("datadog")
+        limiter.acquire("datadog")
+        assert clock.sleeps == []
+
+    def test_buckets_are_independent(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(rate=1, burst=1)
+        limiter.acquire("datadog")
+        limiter.acquire("jira")
+        assert clock.sleeps == []
+
+    def test_per_key_buckets(self) -> None:
+        shared = RateLimiter()
+        assert shared.bucket("datadog", "a") == shared.bucket("datadog", "b")
+        per_key = RateLimiter(per_key=True)
+        bucket = per_key.bucket("datadog", "secret")
+        assert bucket != per_key.bucket("datadog", "other")
+        assert "secret" not in bucket
+
+    def test_timeout(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(rate=1, burst=1)
+        limiter.acquire("datadog")
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire("datadog", timeout=0.5)
+        # A timed out caller does not use up a token.
+        limiter.acquire("datadog", timeout=1)
+        assert clock.sleeps == [1]
+
+    def test_shared_file(self, tmp_path, clock: FakeClock) -> None:
+        path = str(tmp_path / "ratelimit")
+        first = RateLimiter(rate=1, burst=2, path=path)
+        second = RateLimiter(rate=1, burst=2, path=path)
+        first.acquire("datadog")
+        second.acquire("datadog")
+        first.acquire("datadog")
+        assert clock.sleeps == [1]
+
+    def test_damaged_file(self, tmp_path) -> None:
+        path = tmp_path / "ratelimit"
+        path.write_text("{not json")
+        RateLimiter(path=str(path)).acquire("datadog", timeout=0)
+
+    def test_processes_share_budget(self, tmp_path) -> None:
+        path = str(tmp_path / "ratelimit")
+        processes = [
+            multiprocessing.Process(target=_acquire_many, args=(path, 25))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+        # The 4 processes took the whole burst between them; had any update
+        # been lost to a concurrent rewrite, a token would be left over.
+        limiter = RateLimiter(rate=0.001, burst=100, path=path)
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire("datadog", timeout=0)
+
+    def test_acquire_async(self) -> None:
+        limiter = RateLimiter(rate=100, burst=1)
+
+        async def acquire_twice() -> float:
+            started = time.monotonic()
+            await limiter.acquire_async("datadog")
+            await limiter.acquire_async("datadog")
+            return time.monotonic() - started
+
+        assert asyncio.run(acquire_twice()) >= 0.009
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_notifier_waits_for_token(
+        self, send_event: MagicMock, clock: FakeClock
+    ) -> None:
+        limiter = RateLimiter(rate=1, burst=1)
+        notifier = DatadogNotifier("fakeapikey", rate_limiter=limiter)
+        notifier.send("title", "body")
+        notifier.send("title", "body")
+        assert send_event.call_count == 2
+        assert clock.sleeps == [1]
+
+    def test_jira_takes_token_per_request(self, clock: FakeClock) -> None:
+        limiter = RateLimiter(rate=1, burst=1)
+        notifier = JiraNotifier(
+            "fakeapikey",
+            "https://example.atlassian.net",
+            "TESTINC",
+            "test@example.com",
+            rate_limiter=limiter,
+        )
+        search = MagicMock(status=200)
+        search.read.return_value = b'{"issues": []}'
+        created = MagicMock(status=201)
+        created.read.return_value = b'{"key": "TESTINC-1"}'
+        for response in (search, created):
+            response.__enter__.return_value = response
+
+        with patch(
+            "infra_event_notifier.backends.transport.urlopen",
+            side_effect=[search, created],
+        ):
+            notifier.send("title", "body", IssueType.TASK, {"foo": "bar"})
+        # The search took the only token; the create waited for the next.
+        assert clock.sleeps == [1]
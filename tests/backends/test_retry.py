@@ -0,0 +1,93 @@
+import asyncio
+from email.message import Message
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.error import HTTPError
+
+import pytest
+
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.slack_notifier import SlackNotifier
+
+
+def _http_error(code: int, headers: dict = {}) -> HTTPError:
+    hdrs = Message()
+    for name, value in headers.items():
+        hdrs[name] = value
+    return HTTPError("https://example.com/", code, "error", hdrs, None)
+
+
+@pytest.fixture
+def sleep():
+    with patch("time.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+class TestRetryPolicy:
+    def test_retries_until_success(self, sleep: MagicMock) -> None:
+        fn = MagicMock(
+            side_effect=[_http_error(503), ConnectionResetError(), "ok"]
+        )
+        policy = RetryPolicy(max_attempts=3, jitter=False)
+        assert policy.call(fn, "arg", key="value") == "ok"
+        assert fn.call_count == 3
+        fn.assert_called_with("arg", key="value")
+        assert [call.args[0] for call in sleep.call_args_list] == [0.5, 1.0]
+
+    def test_gives_up_after_max_attempts(self, sleep: MagicMock) -> None:
+        fn = MagicMock(side_effect=_http_error(500))
+        with pytest.raises(HTTPError):
+            RetryPolicy(max_attempts=2).call(fn)
+        assert fn.call_count == 2
+
+    def test_client_errors_are_not_retried(self, sleep: MagicMock) -> None:
+        fn = MagicMock(side_effect=_http_error(400))
+        with pytest.raises(HTTPError):
+            RetryPolicy().call(fn)
+        assert fn.call_count == 1
+        sleep.assert_not_called()
+
+    def test_honors_retry_after(self, sleep: MagicMock) -> None:
+        fn = MagicMock(side_effect=[_http_error(429, {"Retry-After": "2"}), 1])
+        RetryPolicy().call(fn)
+        sleep.assert_called_once_with(2.0)
+
+    def test_honors_datadog_rate_limit_reset(self, sleep: MagicMock) -> None:
+        error = _http_error(429, {"X-RateLimit-Reset": "7"})
+        fn = MagicMock(side_effect=[error, 1])
+        RetryPolicy().call(fn)
+        sleep.assert_called_once_with(7.0)
+
+    def test_deadline(self, sleep: MagicMock) -> None:
+        error = _http_error(429, {"Retry-After": "60"})
+        fn = MagicMock(side_effect=error)
+        with pytest.raises(HTTPError):
+            RetryPolicy(max_attempts=5, deadline=30).call(fn)
+        assert fn.call_count == 1
+        sleep.assert_not_called()
+
+    def test_backoff_is_capped_and_jittered(self) -> None:
+        policy = RetryPolicy(backoff=1, max_backoff=4)
+        error = ConnectionResetError()
+        for attempt in range(1, 10):
+            assert 0 <= policy.delay(attempt, error) <= 4
+        policy.jitter = False
+        assert policy.delay(9, error) == 4
+
+    def test_call_async(self) -> None:
+        fn = AsyncMock(side_effect=[_http_error(502), "ok"])
+        with patch("asyncio.sleep", AsyncMock()) as async_sleep:
+            result = asyncio.run(RetryPolicy().call_async(fn))
+        assert result == "ok"
+        assert fn.call_count == 2
+        async_sleep.assert_called_once()
+
+    @patch("infra_event_notifier.slack_notifier.send_notification")
+    def test_notifier_retries(
+        self, send_notification: MagicMock, sleep: MagicMock
+    ) -> None:
+        send_notification.side_effect = [_http_error(503), None]
+        notifier = SlackNotifier(
+            "fakeapikey", "https://example.com/", retry_policy=RetryPolicy()
+        )
+        notifier.send("title", "body")
+        assert send_notification.call_count == 2
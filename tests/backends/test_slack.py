@@ -4,7 +4,13 @@ from urllib.error import HTTPError
 
 import pytest
 
-from infra_event_notifier.backends.slack import send_notification
+from infra_event_notifier.backends.slack import (
+    NotificationTemplate,
+    _notification_request,
+    send_notification,
+)
+
+URL = "https://example.com/slack"
 
 
 def mock_context_manager() -> MagicMock:
@@ -16,7 +22,7 @@ def mock_context_manager() -> MagicMock:
 
 
 class TestSlack:
-    @patch("infra_event_notifier.backends.datadog.urllib.request.urlopen")
+    @patch("infra_event_notifier.backends.transport.urlopen")
     def test_send_notification_request(self, mock_urlopen):
         mock_urlopen.return_value = mock_context_manager()
 
@@ -45,7 +51,7 @@ class TestSlack:
         assert req._data == data
         assert req.headers == headers
 
-    @patch("infra_event_notifier.backends.datadog.urllib.request.urlopen")
+    @patch("infra_event_notifier.backends.transport.urlopen")
     def test_bad_request(self, mock_urlopen) -> None:
         mock_urlopen.return_value = mock_context_manager()
         mock_urlopen.side_effect = HTTPError(
@@ -62,3 +68,22 @@ class TestSlack:
                 eng_pipes_key="fakeapikey",
                 eng_pipes_url="https://example.com/",
             )
+
+
+class TestNotificationTemplate:
+    @pytest.mark.parametrize(
+        "title, text", [("test", "test"), ('"quoted"', "ünïcode\nlines")]
+    )
+    def test_same_request(self, title: str, text: str) -> None:
+        template = NotificationTemplate("fakeapikey")
+        plain = _notification_request(title, text, "fakeapikey", URL)
+        templated = _notification_request(
+            title, text, "fakeapikey", URL, template
+        )
+        assert templated.data == plain.data
+        assert templated.header_items() == plain.header_items()
+
+    def test_other_key(self) -> None:
+        template = NotificationTemplate("fakeapikey")
+        with pytest.raises(ValueError):
+            _notification_request("test", "test", "otherkey", URL, template)
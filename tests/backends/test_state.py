@@ -0,0 +1,100 @@
+import os
+import pathlib
+
+import pytest
+
+from infra_event_notifier.backends.state import (
+    RUNTIME_DIR_ENV,
+    StateFile,
+    private_dir,
+    runtime_path,
+)
+
+
+class TestStateFile:
+    def test_missing_file_is_empty(self, tmp_path: pathlib.Path) -> None:
+        assert StateFile(str(tmp_path / "state"), 1).read() == {}
+
+    def test_round_trip(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "state")
+        state = StateFile(path, 1)
+        with state.lock():
+            state.write({"entries": {"a": 1}})
+        assert StateFile(path, 1).read() == {"entries": {"a": 1}}
+        # Only the state and its lock file are left behind.
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "state",
+            "state.lock",
+        ]
+
+    def test_other_version_is_ignored(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "state")
+        StateFile(path, 1).write({"entries": {"a": 1}})
+        assert StateFile(path, 2).read() == {}
+
+    @pytest.mark.parametrize("content", ["{not json", "[1, 2]", ""])
+    def test_damaged_file_is_empty(
+        self, tmp_path: pathlib.Path, content: str
+    ) -> None:
+        path = tmp_path / "state"
+        path.write_text(content)
+        assert StateFile(str(path), 1).read() == {}
+
+    def test_creates_private_directory(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "new" / "state"
+        StateFile(str(path), 1).write({})
+        assert (path.parent.stat().st_mode & 0o777) == 0o700
+
+    def test_refuses_shared_directory(self, tmp_path: pathlib.Path) -> None:
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o1777)
+        state = StateFile(str(shared / "state"), 1)
+        with pytest.raises(PermissionError):
+            state.read()
+        with pytest.raises(PermissionError):
+            with state.lock():
+                pass
+
+    def test_refuses_symlinks(self, tmp_path: pathlib.Path) -> None:
+        target = tmp_path / "target"
+        target.write_text("")
+        path = tmp_path / "state"
+        os.symlink(target, f"{path}.lock")
+        os.symlink(target, path)
+        state = StateFile(str(path), 1)
+        with pytest.raises(OSError):
+            state.read()
+        with pytest.raises(OSError):
+            with state.lock():
+                pass
+        assert target.read_text() == ""
+
+
+class TestRuntimePath:
+    def test_configured(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(RUNTIME_DIR_ENV, "/srv/notifier")
+        assert runtime_path("dedup") == "/srv/notifier/dedup"
+
+    def test_runtime_dir(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(RUNTIME_DIR_ENV)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert runtime_path("dedup") == (
+            "/run/user/1000/infra-event-notifier/dedup"
+        )
+
+    def test_tmp(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(RUNTIME_DIR_ENV)
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        assert runtime_path("dedup") == (
+            f"/tmp/infra-event-notifier-{os.getuid()}/dedup"
+        )
+
+    def test_private_dir(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "runtime")
+        assert private_dir(path) == path
+        # A directory that already exists and is private is fine too.
+        assert private_dir(path) == path
+        os.chmod(path, 0o770)
+        with pytest.raises(PermissionError):
+            private_dir(path)
@@ -0,0 +1,105 @@
+import asyncio
+import socket
+import time
+from unittest.mock import MagicMock, patch
+from urllib.request import Request
+
+import pytest
+
+from infra_event_notifier.backends import async_transport, timeouts, transport
+from infra_event_notifier.backends.retry import RetryPolicy
+from infra_event_notifier.backends.timeouts import DeadlineExceeded, Timeouts
+
+
+@pytest.fixture
+def hung_url():
+    """
+    URL of a server that accepts connections but never responds.
+    """
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        yield f"http://127.0.0.1:{listener.getsockname()[1]}/"
+
+
+class TestTimeouts:
+    def test_defaults(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(timeouts.READ_TIMEOUT_ENV, raising=False)
+        assert Timeouts().read == timeouts.DEFAULT_READ_TIMEOUT
+
+    def test_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(timeouts.CONNECT_TIMEOUT_ENV, "1.5")
+        monkeypatch.setenv(timeouts.READ_TIMEOUT_ENV, "2")
+        monkeypatch.setenv(timeouts.DEADLINE_ENV, "4")
+        limits = Timeouts(read=3)
+        assert (limits.connect, limits.read, limits.deadline) == (1.5, 3, 4)
+
+    def test_bad_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(timeouts.DEADLINE_ENV, "soon")
+        with pytest.raises(ValueError):
+            Timeouts()
+
+    def test_request_timeouts_capped_by_deadline(self) -> None:
+        def check() -> None:
+            connect, read = timeouts.request_timeouts()
+            assert connect == 3
+            assert 0 < read <= 5
+
+        Timeouts(connect=3, read=10, deadline=5).wrap(check)()
+        assert timeouts.remaining() is None
+
+    def test_nested_scope_keeps_outer_deadline(self) -> None:
+        def inner() -> float | None:
+            return timeouts.remaining()
+
+        outer = Timeouts(deadline=1).wrap(Timeouts(deadline=60).wrap(inner))
+        left = outer()
+        assert left is not None and left <= 1
+
+    def test_expired_deadline(self) -> None:
+        def late() -> None:
+            time.sleep(0.02)
+            timeouts.request_timeouts()
+
+        with pytest.raises(DeadlineExceeded):
+            Timeouts(deadline=0.01).wrap(late)()
+
+    def test_read_timeout(self, hung_url: str) -> None:
+        send = Timeouts(read=0.2).wrap(transport.ConnectionPool().urlopen)
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            send(Request(hung_url))
+        assert time.monotonic() - started < 2
+
+    def test_deadline_bounds_send(self, hung_url: str) -> None:
+        pool = transport.ConnectionPool()
+
+        def two_requests() -> None:
+            for _ in range(2):
+                try:
+                    pool.urlopen(Request(hung_url))
+                except DeadlineExceeded:
+                    raise
+                except TimeoutError:
+                    pass
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            Timeouts(read=10, deadline=0.3).wrap(two_requests)()
+        assert time.monotonic() - started < 2
+
+    def test_async_read_timeout(self, hung_url: str) -> None:
+        pool = async_transport.AsyncConnectionPool()
+        send = Timeouts(read=0.2).wrap_async(pool.urlopen)
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            asyncio.run(send(Request(hung_url)))
+        assert time.monotonic() - started < 2
+
+    @patch("time.sleep")
+    def test_retry_stops_at_deadline(self, sleep: MagicMock) -> None:
+        fn = MagicMock(side_effect=DeadlineExceeded())
+        with pytest.raises(DeadlineExceeded):
+            RetryPolicy().call(fn)
+        assert fn.call_count == 1
+        sleep.assert_not_called()
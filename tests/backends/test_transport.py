@@ -0,0 +1,69 @@
+import time
+from http.client import RemoteDisconnected
+from urllib.error import HTTPError
+from urllib.request import Request
+
+import pytest
+
+from infra_event_notifier.backends.transport import ConnectionPool
+
+
+class TestConnectionPool:
+    def test_reuses_connection(self, server) -> None:
+        pool = ConnectionPool()
+        for i in range(3):
+            req = Request(server.url, data=f"event {i}".encode())
+            with pool.urlopen(req) as response:
+                assert response.status == 202
+                assert response.read() == f"event {i}".encode()
+
+        # All three requests came from the same client socket.
+        assert len(server.peers) == 3
+        assert len(set(server.peers)) == 1
+        pool.clear()
+
+    def test_reconnects_after_clear(self, server) -> None:
+        pool = ConnectionPool()
+        pool.urlopen(Request(server.url, data=b"one"))
+        pool.clear()
+        pool.urlopen(Request(server.url, data=b"two"))
+        assert len(set(server.peers)) == 2
+        pool.clear()
+
+    def test_error_status_raises(self, server) -> None:
+        pool = ConnectionPool()
+        with pytest.raises(HTTPError) as e:
+            pool.urlopen(Request(server.url, data=b"bad"))
+        assert e.value.code == 400
+        # The connection is still usable after an error response.
+        pool.urlopen(Request(server.url, data=b"good"))
+        assert len(set(server.peers)) == 1
+        pool.clear()
+
+    def test_replaces_connection_closed_by_server(self, server) -> None:
+        pool = ConnectionPool()
+        pool.urlopen(Request(server.url, data=b"last"))
+        time.sleep(0.1)
+        with pool.urlopen(Request(server.url, data=b"next")) as response:
+            assert response.read() == b"next"
+        assert len(set(server.peers)) == 2
+        pool.clear()
+
+    def test_does_not_resend_post_after_hang_up(self, server) -> None:
+        pool = ConnectionPool()
+        pool.urlopen(Request(server.url, data=b"one"))
+        # The server may have acted on a POST before hanging up.
+        with pytest.raises(RemoteDisconnected):
+            pool.urlopen(Request(server.url, data=b"drop"))
+        assert server.bodies == [b"one", b"drop"]
+        pool.clear()
+
+    def test_resends_put_after_hang_up(self, server) -> None:
+        pool = ConnectionPool()
+        pool.urlopen(Request(server.url, data=b"one"))
+        with pytest.raises(RemoteDisconnected):
+            pool.urlopen(Request(server.url, data=b"drop", method="PUT"))
+        # Sent again once, on a new connection, which hung up too.
+        assert server.bodies == [b"one", b"drop", b"drop"]
+        assert len(set(server.peers)) == 2
+        pool.clear()
@@ -5,6 +5,7 @@ from argparse import Namespace
 from unittest.mock import MagicMock, patch
 
 from infra_event_notifier.cli.datadog import DatadogCommand
+from infra_event_notifier.spool import Spool
 
 FAKE_DD_KEY = "I_AM_A_DATADOG_KEY"
 
@@ -102,6 +103,9 @@ class TestCLI:
             source=None,
             tag=None,
             dry_run=None,
+            socket=None,
+            spool=None,
+            dedup_window=0,
         )
         command = DatadogCommand()
 
@@ -116,6 +120,9 @@ class TestCLI:
             source=None,
             tag=None,
             dry_run=True,
+            socket=None,
+            spool=None,
+            dedup_window=0,
         )
 
         command = DatadogCommand()
@@ -135,6 +142,9 @@ class TestCLI:
             source=None,
             tag=None,
             dry_run=None,
+            socket=None,
+            spool=None,
+            dedup_window=0,
         )
         command = DatadogCommand()
         with patch("os.getenv", getenv_set):
@@ -155,3 +165,124 @@ class TestCLI:
                     },
                     alert_type="info",
                 )
+
+    def test_send_via_daemon(
+        self, getenv_set: MagicMock, send_event: MagicMock
+    ):
+        args = Namespace(
+            title="This is really important you gotta tell The Dog!!!",
+            message=None,
+            source=None,
+            tag=None,
+            dry_run=None,
+            socket="/run/infra-event-notifier.sock",
+            spool=None,
+            dedup_window=0,
+        )
+        command = DatadogCommand()
+        via_daemon = MagicMock(return_value=True)
+        with patch("os.getenv", getenv_set):
+            with patch(
+                "infra_event_notifier.backends.datadog.send_event", send_event
+            ):
+                with patch(
+                    "infra_event_notifier.daemon.send_event_via_daemon",
+                    via_daemon,
+                ):
+                    command.execute(args)
+
+                    via_daemon.assert_called_once()
+                    assert (
+                        via_daemon.call_args.args[0]
+                        == "/run/infra-event-notifier.sock"
+                    )
+                    send_event.assert_not_called()
+
+    def test_send_daemon_fallback(
+        self, getenv_set: MagicMock, send_event: MagicMock
+    ):
+        args = Namespace(
+            title="This is really important you gotta tell The Dog!!!",
+            message=None,
+            source=None,
+            tag=None,
+            dry_run=None,
+            socket="/nonexistent/infra-event-notifier.sock",
+            spool=None,
+            dedup_window=0,
+        )
+        command = DatadogCommand()
+        with patch("os.getenv", getenv_set):
+            with patch(
+                "infra_event_notifier.backends.datadog.send_event", send_event
+            ):
+                command.execute(args)
+
+                send_event.assert_called_once()
+
+    def test_send_spools_until_delivered(
+        self, getenv_set: MagicMock, send_event: MagicMock, tmp_path
+    ):
+        spool_path = str(tmp_path / "spool")
+        args = Namespace(
+            title="This is really important you gotta tell The Dog!!!",
+            message=None,
+            source=None,
+            tag=None,
+            dry_run=None,
+            socket=None,
+            spool=spool_path,
+            dedup_window=0,
+        )
+        command = DatadogCommand()
+        send_event.side_effect = ConnectionRefusedError()
+        with patch("os.getenv", getenv_set):
+            with patch(
+                "infra_event_notifier.backends.datadog.send_event", send_event
+            ):
+                with patch("time.sleep"):
+                    command.execute(args)
+                pending = Spool(spool_path).pending()
+                assert len(pending) == 1
+                assert "datadog_api_key" not in pending[0][1]
+                # A replay must say when the event happened, not when it
+                # was finally sent.
+                date_happened = pending[0][1]["date_happened"]
+                assert send_event.call_args.kwargs["date_happened"] == (
+                    date_happened
+                )
+
+                send_event.side_effect = None
+                command.execute(args)
+                assert len(Spool(spool_path).pending()) == 1
+
+    def test_send_dedup_window(
+        self, getenv_set: MagicMock, send_event: MagicMock, tmp_path, capsys
+    ):
+        args = Namespace(
+            title="This is really important you gotta tell The Dog!!!",
+            message=None,
+            source=None,
+            tag=None,
+            dry_run=None,
+            socket=None,
+            spool=None,
+            dedup_window=60,
+        )
+        command = DatadogCommand()
+        with patch("os.getenv", getenv_set):
+            with (
+                patch(
+                    "infra_event_notifier.backends.datadog.send_event",
+                    send_event,
+                ),
+                patch(
+                    "infra_event_notifier.backends.dedup.default_state_path",
+                    return_value=str(tmp_path / "dedup"),
+                ),
+            ):
+                command.execute(args)
+                command.execute(args)
+
+                send_event.assert_called_once()
+                assert "Not reporting the event" in capsys.readouterr().out
@@ -0,0 +1,138 @@
+import io
+import json
+import threading
+import time
+from argparse import Namespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infra_event_notifier.cli.ingest import (
+    IngestCommand,
+    parse_events,
+    send_events,
+    validate_tags,
+)
+
+FAKE_DD_KEY = "I_AM_A_DATADOG_KEY"
+
+LINES = [
+    '{"title": "first", "text": "hello", "tags": {"user": "me"}}\n',
+    "\n",
+    "not json\n",
+    '{"title": "second", "tags": ["team=infra"], "alert_type": "error"}\n',
+    '{"text": "no title"}\n',
+]
+
+
+class TestIngest:
+    def test_validate_tags(self):
+        assert validate_tags({"a": "b", "n": 1}) == {"a": "b", "n": "1"}
+        assert validate_tags(["a=b=c"]) == {"a": "b=c"}
+        for bad in [
+            {"a:b": "c"},
+            {"": "c"},
+            {"a": "b,c"},
+            {"a": None},
+            {"a": "x" * 200},
+            ["novalue"],
+            "a=b",
+        ]:
+            with pytest.raises(ValueError):
+                validate_tags(bad)
+
+    def test_parse_events(self):
+        parsed = list(parse_events(LINES, "audit"))
+        assert [number for number, _ in parsed] == [1, 3, 4, 5]
+        assert parsed[0][1] == {
+            "title": "first",
+            "text": "hello",
+            "tags": {
+                "source": "audit",
+                "source_tool": "audit",
+                "source_category": "infra-tools",
+                "user": "me",
+            },
+            "alert_type": "info",
+        }
+        assert isinstance(parsed[1][1], ValueError)
+        assert parsed[2][1]["tags"]["team"] == "infra"
+        assert isinstance(parsed[3][1], ValueError)
+
+    def test_parse_is_lazy(self):
+        consumed = []
+
+        def lines():
+            for line in LINES:
+                consumed.append(line)
+                yield line
+
+        parsed = parse_events(lines(), "audit")
+        next(parsed)
+        assert len(consumed) == 1
+
+    def test_bounded_in_flight(self):
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def send(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            if kwargs["title"] == "7":
+                raise ConnectionRefusedError()
+
+        lines = [json.dumps({"title": str(i)}) for i in range(20)]
+        results = dict(send_events(parse_events(lines, "audit"), send, 3))
+        assert sorted(results) == list(range(1, 21))
+        assert isinstance(results[8], ConnectionRefusedError)
+        assert sum(error is None for error in results.values()) == 19
+        assert peak <= 3
+
+    def test_execute(self, capsys):
+        send_event = MagicMock()
+        args = Namespace(
+            input=io.StringIO("".join(LINES)),
+            source=None,
+            max_in_flight=2,
+            dry_run=None,
+        )
+        with patch.dict("os.environ", {"DATADOG_API_KEY": FAKE_DD_KEY}):
+            with patch(
+                "infra_event_notifier.backends.datadog.send_event", send_event
+            ):
+                with pytest.raises(SystemExit):
+                    IngestCommand().execute(args)
+
+        assert send_event.call_count == 2
+        assert send_event.call_args.kwargs["datadog_api_key"] == FAKE_DD_KEY
+        captured = capsys.readouterr()
+        report = [json.loads(line) for line in captured.out.splitlines()]
+        assert sorted((r["line"], r["ok"]) for r in report) == [
+            (1, True),
+            (3, False),
+            (4, True),
+            (5, False),
+        ]
+        assert "Sent 2 events, 2 failed" in captured.err
+
+    def test_dry_run(self, capsys):
+        send_event = MagicMock()
+        args = Namespace(
+            input=io.StringIO(LINES[0]),
+            source=None,
+            max_in_flight=2,
+            dry_run=True,
+        )
+        with patch(
+            "infra_event_notifier.backends.datadog.send_event", send_event
+        ):
+            IngestCommand().execute(args)
+
+        send_event.assert_not_called()
+        assert "Would send 1 events" in capsys.readouterr().err
@@ -1,12 +1,15 @@
 import argparse
+import json
 import pathlib
 import pytest
 from argparse import Namespace
 from unittest.mock import MagicMock, patch
 
+from infra_event_notifier.cli import terragrunt
 from infra_event_notifier.cli.terragrunt import (
     TerragruntCommand,
     RegionsConfig,
+    load_regions_config,
 )
 
 FAKE_DD_KEY = "I_AM_A_DATADOG_KEY"
@@ -91,7 +94,14 @@ class TestCLI:
         self, getenv_unset_key: MagicMock, config_path: pathlib.Path
     ):
         args = Namespace(
-            cli_args="destroy-all", dry_run=None, region_map=config_path
+            cli_args="destroy-all",
+            dry_run=None,
+            region_map=config_path,
+            socket=None,
+            spool=None,
+            dedup_window=0,
+            region_map_cache=None,
+            aggregate=False,
         )
         command = TerragruntCommand()
 
@@ -108,7 +118,14 @@ class TestCLI:
         config_path: pathlib.Path,
     ):
         args = Namespace(
-            cli_args="apply all", dry_run=True, region_map=config_path
+            cli_args="apply all",
+            dry_run=True,
+            region_map=config_path,
+            socket=None,
+            spool=None,
+            dedup_window=0,
+            region_map_cache=None,
+            aggregate=False,
         )
 
         command = TerragruntCommand()
@@ -130,6 +147,59 @@ class TestCLI:
             assert config.terragrunt_to_sentry_region["us"] == "us"
             assert config.terragrunt_to_sentry_region["de"] == "de"
 
+    def test_load_config_memoized(self, config_path: pathlib.Path):
+        terragrunt._REGIONS_CACHE.clear()
+        first = load_regions_config(str(config_path))
+        assert load_regions_config(str(config_path)) is first
+
+        # A changed file is read again.
+        config_path.write_text('{"terragrunt_to_sentry_region": {"de": "eu"}}')
+        changed = load_regions_config(str(config_path))
+        assert changed.terragrunt_to_sentry_region == {"de": "eu"}
+
+    def test_load_config_disk_cache(
+        self, config_path: pathlib.Path, tmp_path: pathlib.Path
+    ):
+        cache_dir = str(tmp_path / "cache")
+        terragrunt._REGIONS_CACHE.clear()
+        expected = load_regions_config(str(config_path), cache_dir)
+        assert len(list((tmp_path / "cache").iterdir())) == 1
+
+        # A new process finds the map in the disk cache without parsing the
+        # region map itself.
+        terragrunt._REGIONS_CACHE.clear()
+        with patch.object(
+            RegionsConfig, "__init__", side_effect=AssertionError
+        ):
+            cached = load_regions_config(str(config_path), cache_dir)
+        assert (
+            cached.terragrunt_to_sentry_region
+            == expected.terragrunt_to_sentry_region
+        )
+
+    @pytest.mark.parametrize("mapping", [None, ["us"], "us"])
+    def test_load_config_damaged_disk_cache(
+        self, config_path: pathlib.Path, tmp_path: pathlib.Path, mapping
+    ):
+        cache_dir = tmp_path / "cache"
+        terragrunt._REGIONS_CACHE.clear()
+        expected = load_regions_config(str(config_path), str(cache_dir))
+        (cache_file,) = cache_dir.iterdir()
+        cached = json.loads(cache_file.read_text())
+        if mapping is None:
+            del cached["terragrunt_to_sentry_region"]
+        else:
+            cached["terragrunt_to_sentry_region"] = mapping
+        cache_file.write_text(json.dumps(cached))
+
+        # The region map is parsed again instead.
+        terragrunt._REGIONS_CACHE.clear()
+        config = load_regions_config(str(config_path), str(cache_dir))
+        assert (
+            config.terragrunt_to_sentry_region
+            == expected.terragrunt_to_sentry_region
+        )
+
     def test_send_unmapped_slice(
         self,
         getenv_set_key: MagicMock,
@@ -144,7 +214,14 @@ class TestCLI:
         sentry_region reported as unknown.
         """
         args = Namespace(
-            cli_args="run-all apply", dry_run=None, region_map=config_path
+            cli_args="run-all apply",
+            dry_run=None,
+            region_map=config_path,
+            socket=None,
+            spool=None,
+            dedup_window=0,
+            region_map_cache=None,
+            aggregate=False,
         )
         command = TerragruntCommand()
         with patch("os.getenv", getenv_set_key):
@@ -170,7 +247,14 @@ class TestCLI:
         config_path: pathlib.Path,
     ):
         args = Namespace(
-            cli_args="run-all plan", dry_run=None, region_map=config_path
+            cli_args="run-all plan",
+            dry_run=None,
+            region_map=config_path,
+            socket=None,
+            spool=None,
+            dedup_window=0,
+            region_map_cache=None,
+            aggregate=False,
         )
         command = TerragruntCommand()
         with patch("os.getenv", getenv_set_key):
@@ -203,3 +287,51 @@ class TestCLI:
                     },
                     alert_type="info",
                 )
+
+    def test_aggregate(
+        self,
+        getenv_set_key: MagicMock,
+        send_event: MagicMock,
+        config_path: pathlib.Path,
+        tmp_path: pathlib.Path,
+    ):
+        args = Namespace(
+            cli_args="run-all apply",
+            dry_run=None,
+            region_map=config_path,
+            socket=None,
+            spool=None,
+            dedup_window=0,
+            region_map_cache=None,
+            aggregate=True,
+            run_id="run-1",
+            aggregate_window=0,
+            per_slice_events=False,
+        )
+        command = TerragruntCommand()
+        with (
+            patch("os.getenv", getenv_set_key),
+            patch(
+                "infra_event_notifier.backends.datadog.send_event", send_event
+            ),
+            patch(
+                "infra_event_notifier.aggregate.default_buffer_dir",
+                return_value=str(tmp_path),
+            ),
+            patch("infra_event_notifier.aggregate.run_detached") as detach,
+        ):
+            for tgslice in ("terragrunt/regions/de", "terragrunt/us/de"):
+                command._execute_impl(args, cwd=tgslice, user="bob")
+            # Events are only buffered until the detached flusher runs.
+            send_event.assert_not_called()
+            for call in detach.call_args_list:
+                call.args[0]()
+                assert call.args[1] == str(tmp_path / "run-1.log")
+
+        send_event.assert_called_once()
+        assert send_event.call_args.kwargs["title"] == (
+            "terragrunt: Ran 'run-all apply' for 2 slices in region 'de'"
+        )
+        assert send_event.call_args.kwargs["tags"]["terragrunt_run_id"] == (
+            "run-1"
+        )
@@ -0,0 +1,16 @@
+import pathlib
+
+import pytest
+
+from infra_event_notifier.backends.state import RUNTIME_DIR_ENV
+
+
+@pytest.fixture(autouse=True)
+def runtime_dir(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> pathlib.Path:
+    # Keeps the per-user state files every test writes, e.g. the rate limit
+    # state of the CLI, out of the real runtime directory.
+    path = tmp_path / "runtime"
+    monkeypatch.setenv(RUNTIME_DIR_ENV, str(path))
+    return path
@@ -0,0 +1,141 @@
+import os
+import pathlib
+import time
+import uuid
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import pytest
+
+from infra_event_notifier.aggregate import (
+    RUN_ID_ENV,
+    RunBuffer,
+    default_run_id,
+    flush_run,
+    run_detached,
+    summarize,
+)
+
+
+def _record(region: str, tgslice: str) -> Dict[str, Any]:
+    return {
+        "region": region,
+        "slice": tgslice,
+        "root": "terragrunt",
+        "user": "bob",
+        "cli_args": "run-all apply",
+        "event": {
+            "title": f"terragrunt: Ran 'run-all apply' for slice '{tgslice}'",
+            "text": "",
+            "tags": {"sentry_region": region, "terragrunt_slice": tgslice},
+            "alert_type": "info",
+        },
+    }
+
+
+def test_summarize_per_region() -> None:
+    records = [
+        _record("us", "regions/us/snuba"),
+        _record("de", "regions/de/snuba"),
+        _record("us", "regions/us/relay"),
+    ]
+    summaries = summarize(records, "run-1")
+
+    assert [s["tags"]["sentry_region"] for s in summaries] == ["us", "de"]
+    us = summaries[0]
+    assert us["title"] == (
+        "terragrunt: Ran 'run-all apply' for 2 slices in region 'us'"
+    )
+    assert "* regions/us/relay\n* regions/us/snuba" in us["text"]
+    assert us["tags"] == {
+        "sentry_region": "us",
+        "terragrunt_run_id": "run-1",
+        "terragrunt_slice_count": "2",
+    }
+
+
+def test_flush_run(tmp_path: pathlib.Path) -> None:
+    buffer = RunBuffer(str(tmp_path), "ppid-1234")
+    for tgslice in ("regions/us/snuba", "regions/us/relay"):
+        RunBuffer(str(tmp_path), "ppid-1234").add(_record("us", tgslice))
+
+    assert buffer.try_lock()
+    # Another hook of the same run does not become a second flusher.
+    assert not RunBuffer(str(tmp_path), "ppid-1234").try_lock()
+
+    sent: List[Dict[str, Any]] = []
+    flush_run(buffer, sent.append, window=0, per_slice=True)
+
+    assert len(sent) == 3
+    assert sent[0]["tags"]["terragrunt_slice_count"] == "2"
+    assert {e["tags"].get("terragrunt_slice") for e in sent[1:]} == {
+        "regions/us/snuba",
+        "regions/us/relay",
+    }
+    assert buffer.read() == ([], [])
+    # The lock was released.
+    assert RunBuffer(str(tmp_path), "ppid-1234").try_lock()
+
+
+def test_runs_are_separate(tmp_path: pathlib.Path) -> None:
+    RunBuffer(str(tmp_path), "run/a").add(_record("us", "regions/us/snuba"))
+    RunBuffer(str(tmp_path), "run-b").add(_record("de", "regions/de/snuba"))
+
+    buffer = RunBuffer(str(tmp_path), "run/a")
+    assert buffer.try_lock()
+    sent: List[Dict[str, Any]] = []
+    flush_run(buffer, sent.append, window=0)
+
+    assert [e["tags"]["sentry_region"] for e in sent] == ["us"]
+    assert len(RunBuffer(str(tmp_path), "run-b").read()[1]) == 1
+
+
+def test_refuses_shared_buffer_dir(tmp_path: pathlib.Path) -> None:
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o1777)
+    with pytest.raises(PermissionError):
+        RunBuffer(str(shared), "run-1").add(_record("us", "regions/us/snuba"))
+    assert not list(shared.iterdir())
+
+
+def test_default_run_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(RUN_ID_ENV, raising=False)
+    run_id = default_run_id()
+    # Every hook of the run, i.e. with the same parent, gets the same one.
+    assert uuid.UUID(run_id)
+    assert default_run_id() == run_id
+    # A parent that got the PID of an earlier one does not.
+    with patch("infra_event_notifier.aggregate._start_time", return_value=""):
+        assert default_run_id() != run_id
+
+    monkeypatch.setenv(RUN_ID_ENV, "run-1")
+    assert default_run_id() == "run-1"
+
+
+def _wait_for(condition: Any) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "detached process did not finish"
+        time.sleep(0.01)
+
+
+def test_run_detached_logs_failures(tmp_path: pathlib.Path) -> None:
+    log = tmp_path / "run.log"
+
+    def fail() -> None:
+        print("!! Could not report an event to DataDog:")
+        raise RuntimeError("boom")
+
+    run_detached(fail, str(log))
+    _wait_for(lambda: log.exists() and "RuntimeError" in log.read_text())
+    assert log.read_text().startswith("!! Could not report")
+    assert (log.stat().st_mode & 0o777) == 0o600
+
+
+def test_run_detached_removes_empty_log(tmp_path: pathlib.Path) -> None:
+    log = tmp_path / "run.log"
+    done = tmp_path / "done"
+
+    run_detached(lambda: os.mkdir(done), str(log))
+    _wait_for(lambda: done.exists() and not log.exists())
@@ -0,0 +1,88 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from infra_event_notifier.background import BackgroundSender, QueueFullPolicy
+from infra_event_notifier.datadog_notifier import DatadogNotifier
+
+
+class TestBackgroundSender:
+    def test_flush_runs_queued_sends(self) -> None:
+        sender = BackgroundSender(workers=2)
+        fn = MagicMock()
+        for i in range(10):
+            assert sender.submit(fn, i)
+        assert sender.flush(timeout=5)
+        assert fn.call_count == 10
+        assert sender.close(timeout=5)
+
+    def test_errors_are_counted(self) -> None:
+        sender = BackgroundSender()
+        sender.submit(MagicMock(side_effect=ValueError("boom")))
+        sender.flush(timeout=5)
+        assert sender.errors == 1
+        sender.close(timeout=5)
+
+    def _blocked_sender(
+        self, policy: QueueFullPolicy
+    ) -> tuple[BackgroundSender, threading.Event, list]:
+        """
+        Returns a sender whose only worker is stuck on a first send, with a
+        queue of two that is already full.
+        """
+        release = threading.Event()
+        started = threading.Event()
+        sent: list = []
+
+        def slow(value: int) -> None:
+            started.set()
+            release.wait()
+            sent.append(value)
+
+        sender = BackgroundSender(maxsize=2, policy=policy)
+        sender.submit(slow, 0)
+        started.wait(5)
+        sender.submit(sent.append, 1)
+        sender.submit(sent.append, 2)
+        return sender, release, sent
+
+    def test_drop_oldest(self) -> None:
+        sender, release, sent = self._blocked_sender(
+            QueueFullPolicy.DROP_OLDEST
+        )
+        assert sender.submit(sent.append, 3)
+        release.set()
+        sender.close(timeout=5)
+        assert sent == [0, 2, 3]
+        assert sender.dropped == 1
+
+    def test_drop_newest(self) -> None:
+        sender, release, sent = self._blocked_sender(
+            QueueFullPolicy.DROP_NEWEST
+        )
+        assert not sender.submit(sent.append, 3)
+        release.set()
+        sender.close(timeout=5)
+        assert sent == [0, 1, 2]
+        assert sender.dropped == 1
+
+    def test_block(self) -> None:
+        sender, release, sent = self._blocked_sender(QueueFullPolicy.BLOCK)
+        threading.Timer(0.1, release.set).start()
+        assert sender.submit(sent.append, 3)
+        sender.close(timeout=5)
+        assert sent == [0, 1, 2, 3]
+        assert sender.dropped == 0
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_notifier_queues_send(self, send_event: MagicMock) -> None:
+        sender = BackgroundSender()
+        notifier = DatadogNotifier("fakeapikey", background=sender)
+        notifier.send("title", "body", {"foo": "bar"})
+        sender.close(timeout=5)
+        send_event.assert_called_once_with(
+            title="title",
+            text="body",
+            tags={"foo": "bar"},
+            datadog_api_key="fakeapikey",
+            alert_type="",
+        )
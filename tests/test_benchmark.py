@@ -0,0 +1,45 @@
+from typing import Iterator
+
+import pytest
+
+from infra_event_notifier.backends import transport
+from infra_event_notifier.benchmark import main, run, senders
+from infra_event_notifier.fake_api import FakeApiServer
+
+
+@pytest.fixture
+def fake_api() -> Iterator[FakeApiServer]:
+    with FakeApiServer(throttle_rate=0.1, seed=1) as server:
+        previous = transport.set_transport(server.transport())
+        yield server
+        transport.set_transport(previous)
+
+
+@pytest.mark.parametrize("backend", ["datadog", "slack", "jira"])
+def test_notifiers_through_fake_api(
+    fake_api: FakeApiServer, backend: str
+) -> None:
+    result = run(backend, senders(fake_api)[backend], 20, 1)
+
+    # Throttled requests were retried until they went through.
+    assert result.failed == 0
+    assert len(result.latencies) == 20
+    assert result.percentile(0.5) <= result.percentile(0.99)
+    assert sum(fake_api.requests.values()) > 20
+
+
+def test_fake_api_routes(fake_api: FakeApiServer) -> None:
+    fake_api.throttle_rate = 0
+    senders(fake_api)["jira"](1)
+    assert fake_api.requests == {
+        "POST /rest/api/2/search": 1,
+        "POST /rest/api/2/issue": 1,
+    }
+
+
+def test_main(capsys: pytest.CaptureFixture[str]) -> None:
+    main(["--backend", "datadog", "--events", "10", "--concurrency", "2"])
+    out = capsys.readouterr().out
+    assert out.startswith("datadog: 10 sent, 0 failed, p50 ")
+    # The default transport is back.
+    assert transport.set_transport(None) is transport._POOL
@@ -0,0 +1,126 @@
+import pathlib
+import socket
+import threading
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from infra_event_notifier.daemon import (
+    DaemonError,
+    NotifierDaemon,
+    send_event_via_daemon,
+)
+from infra_event_notifier.spool import Spool
+
+EVENT = {
+    "datadog_api_key": "fakeapikey",
+    "title": "title",
+    "text": "text",
+    "tags": {"foo": "bar"},
+    "alert_type": "info",
+}
+
+
+@pytest.fixture
+def socket_path(tmp_path: pathlib.Path) -> str:
+    return str(tmp_path / "notifier.sock")
+
+
+@pytest.fixture
+def daemon(socket_path: str) -> Iterator[NotifierDaemon]:
+    server = NotifierDaemon(socket_path, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestDaemon:
+    def test_no_daemon(self, socket_path: str) -> None:
+        assert not send_event_via_daemon(socket_path, **EVENT)
+
+    def test_not_a_socket(self, socket_path: str) -> None:
+        pathlib.Path(socket_path).write_text("")
+        assert not send_event_via_daemon(socket_path, **EVENT)
+
+    def test_garbled_reply(self, socket_path: str) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(socket_path)
+            listener.listen()
+
+            def reply() -> None:
+                conn, _ = listener.accept()
+                with conn:
+                    conn.recv(65536)
+                    conn.sendall(b"not json\n")
+
+            thread = threading.Thread(target=reply, daemon=True)
+            thread.start()
+            assert not send_event_via_daemon(socket_path, **EVENT)
+            thread.join()
+
+    @patch("infra_event_notifier.backends.datadog.send_event")
+    def test_send_via_daemon(
+        self, send_event: MagicMock, daemon: NotifierDaemon, socket_path: str
+    ) -> None:
+        assert send_event_via_daemon(socket_path, **EVENT)
+        assert send_event_via_daemon(socket_path, **EVENT)
+        daemon.sender.flush(timeout=5)
+        assert send_event.call_count == 2
+        send_event.assert_called_with(**EVENT)
+
+    @patch("infra_event_notifier.backends.datadog.send_event")
+    def test_acks_spooled_event(
+        self,
+        send_event: MagicMock,
+        daemon: NotifierDaemon,
+        socket_path: str,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        spool = Spool(str(tmp_path / "spool"))
+        kwargs = {k: v for k, v in EVENT.items() if k != "datadog_api_key"}
+        entry_id = spool.append(kwargs)
+        assert send_event_via_daemon(
+            socket_path, spool_entry=(spool.path, entry_id), **EVENT
+        )
+        daemon.sender.flush(timeout=5)
+        send_event.assert_called_once_with(**EVENT)
+        assert spool.pending() == []
+
+    def test_refuses_second_daemon(
+        self, daemon: NotifierDaemon, socket_path: str
+    ) -> None:
+        with pytest.raises(DaemonError):
+            NotifierDaemon(socket_path)
+
+    def test_refuses_shared_directory(self, tmp_path: pathlib.Path) -> None:
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o1777)
+        with pytest.raises(PermissionError):
+            NotifierDaemon(str(shared / "notifier.sock"))
+
+    @patch("infra_event_notifier.backends.datadog.send_event")
+    def test_client_refuses_shared_directory(
+        self,
+        send_event: MagicMock,
+        daemon: NotifierDaemon,
+        socket_path: str,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        # Whoever else can write to the directory could have planted the
+        # socket to collect API keys.
+        tmp_path.chmod(0o1777)
+        assert not send_event_via_daemon(socket_path, **EVENT)
+        tmp_path.chmod(0o700)
+        send_event.assert_not_called()
+
+    def test_replaces_stale_socket(self, socket_path: str) -> None:
+        server = NotifierDaemon(socket_path)
+        # Closing the listening socket without unlinking it leaves the file
+        # behind, as a crashed daemon would.
+        server.socket.close()
+        server.sender.close()
+        NotifierDaemon(socket_path).server_close()
@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock, patch
+
+from infra_event_notifier.backends.dedup import Deduplicator
+from infra_event_notifier.datadog_notifier import DatadogEvent, DatadogNotifier
+
+
+def _fail_on_title(title: str, **kwargs) -> None:
+    if title == "bad":
+        raise ValueError("boom")
+
+
+class TestDatadogNotifier:
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_send_many(self, send_event: MagicMock) -> None:
+        send_event.side_effect = _fail_on_title
+        events = [
+            DatadogEvent("good", "body"),
+            DatadogEvent("bad", "body"),
+            DatadogEvent("good", "body", {"foo": "bar"}, "info"),
+        ]
+
+        results = DatadogNotifier("fakeapikey").send_many(events)
+
+        assert send_event.call_count == 3
+        assert results[0] is None
+        assert isinstance(results[1], ValueError)
+        assert results[2] is None
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_batch_flushes_on_size_and_exit(
+        self, send_event: MagicMock
+    ) -> None:
+        notifier = DatadogNotifier("fakeapikey")
+        with notifier.batch(batch_size=2, flush_interval=0) as batch:
+            batch.add("one", "body")
+            assert send_event.call_count == 0
+            batch.add("two", "body")
+            assert send_event.call_count == 2
+            batch.add("bad", "body")
+            assert send_event.call_count == 2
+        assert send_event.call_count == 3
+        assert len(batch.results) == 3
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_batch_results_in_order(self, send_event: MagicMock) -> None:
+        send_event.side_effect = _fail_on_title
+        notifier = DatadogNotifier("fakeapikey")
+        with notifier.batch(batch_size=2, flush_interval=0) as batch:
+            for title in ["good", "bad", "good", "bad", "good"]:
+                batch.add(title, "body")
+        sent = [result is None for result in batch.results]
+        assert sent == [True, False, True, False, True]
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_deduplicates(self, send_event: MagicMock) -> None:
+        dedup = Deduplicator()
+        notifier = DatadogNotifier("fakeapikey", deduplicator=dedup)
+        notifier.send("title", "body", {"foo": "bar"})
+        notifier.send("title", "body", {"foo": "bar"})
+        notifier.send("title", "body", {"foo": "baz"})
+        assert send_event.call_count == 2
+        assert dedup.suppressed == {"datadog": 1}
+
+    @patch("infra_event_notifier.datadog_notifier.send_event")
+    def test_site(self, send_event: MagicMock) -> None:
+        DatadogNotifier("fakeapikey", site="datadoghq.eu").send("t", "b")
+        assert send_event.call_args.kwargs["site"] == "datadoghq.eu"
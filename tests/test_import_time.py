@@ -0,0 +1,222 @@
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import infra_event_notifier
+from infra_event_notifier.daemon import NotifierDaemon
+from infra_event_notifier.main import COMMANDS
+
+# Generous compared to the ~25ms they take on a laptop, so that only a real
+# regression, such as a module that does expensive work at import time,
+# trips it. Only the package's own modules are counted: they are what this
+# budget is about, and the standard library's import times vary too much
+# from one machine to the next.
+IMPORT_TIME_BUDGET_US = 100_000
+
+# Modules that must not be loaded before a subcommand is dispatched.
+HEAVY_MODULES = [
+    "asyncio",
+    "http.client",
+    "json",
+    "pprint",
+    "ssl",
+    "urllib.request",
+    "infra_event_notifier.backends.datadog",
+    "infra_event_notifier.daemon",
+]
+
+# Modules only needed to talk to Datadog directly. A hook that does not
+# (a dry run, or one that hands its event to the daemon) must not load
+# them: they are most of what a hook spends starting up.
+HTTP_MODULES = [
+    "asyncio",
+    "email",
+    "http.client",
+    "ssl",
+    "urllib.request",
+    "infra_event_notifier.backends.async_transport",
+    "infra_event_notifier.backends.transport",
+]
+
+# Runs the CLI the way the console script does, then lists what it loaded.
+RUN_MAIN = (
+    "import sys\n"
+    "from infra_event_notifier import main\n"
+    "sys.argv[1:] = {argv!r}\n"
+    "main.main()\n"
+    "print('\\n'.join(sys.modules), file=sys.stderr)"
+)
+
+
+def _run(code: str, *options: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        **kwargs,
+    )
+
+
+def _run_hook(
+    argv: list[str], *options: str, cwd: str | None = None, preamble: str = ""
+) -> str:
+    """
+    Runs the CLI with `argv`, after the code in `preamble`, and returns its
+    stderr, which ends with the modules it loaded, one per line.
+    """
+    # The hook runs in the slice's directory, where the package under test
+    # is not on the path unless it was installed.
+    source = os.path.dirname(os.path.dirname(infra_event_notifier.__file__))
+    pythonpath = os.pathsep.join(
+        filter(None, [source, os.environ.get("PYTHONPATH")])
+    )
+    env = {**os.environ, "DD_API_KEY": "fakeapikey", "PYTHONPATH": pythonpath}
+    code = preamble + RUN_MAIN.format(argv=argv)
+    return _run(code, *options, cwd=cwd, env=env).stderr
+
+
+def _terragrunt_dry_run(region_map: pathlib.Path) -> list[str]:
+    return [
+        "terragrunt",
+        "-n",
+        "--cli-args",
+        "apply",
+        "--region-map",
+        str(region_map),
+    ]
+
+
+def _hook_modules(argv: list[str], cwd: str | None = None) -> set[str]:
+    return set(_run_hook(argv, cwd=cwd).split())
+
+
+def _package_import_us(importtime: str) -> int:
+    """
+    Sums the time the package's own modules took to import, leaving out
+    the modules they imported in turn.
+    """
+    total = 0
+    # Lines look like "import time: <self us> | <cumulative us> | <module>".
+    for line in importtime.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        if name.strip().startswith("infra_event_notifier"):
+            total += int(self_us)
+    return total
+
+
+@pytest.fixture
+def slice_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "terragrunt" / "kafka" / "us"
+    path.mkdir(parents=True)
+    return path
+
+
+@pytest.fixture
+def region_map(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "regions.json"
+    path.write_text('{"terragrunt_to_sentry_region": {"us": "us"}}')
+    return path
+
+
+@pytest.fixture
+def daemon(runtime_dir: pathlib.Path) -> Iterator[NotifierDaemon]:
+    server = NotifierDaemon(str(runtime_dir / "sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class TestImportTime:
+    def test_main_imports_no_backends(self):
+        result = _run(
+            "import sys, infra_event_notifier.main\n"
+            "print('\\n'.join(sys.modules))"
+        )
+        loaded = set(result.stdout.split())
+        assert not loaded & set(HEAVY_MODULES)
+
+    def test_only_requested_command_is_loaded(self):
+        result = _run(
+            "import sys\n"
+            "from infra_event_notifier.main import parse_args\n"
+            "parse_args(['datadog', '--title', 'serve'])\n"
+            "print('\\n'.join(sys.modules))"
+        )
+        loaded = set(result.stdout.split())
+        assert "infra_event_notifier.cli.datadog" in loaded
+        assert "infra_event_notifier.cli.serve" not in loaded
+        assert "infra_event_notifier.cli.ingest" not in loaded
+        assert "asyncio" not in loaded
+
+    def test_terragrunt_dry_run(
+        self, slice_dir: pathlib.Path, region_map: pathlib.Path
+    ):
+        loaded = _hook_modules(
+            _terragrunt_dry_run(region_map), cwd=str(slice_dir)
+        )
+        assert "infra_event_notifier.cli.terragrunt" in loaded
+        assert not loaded & set(HTTP_MODULES)
+
+    def test_datadog_dry_run(self):
+        loaded = _hook_modules(["datadog", "-n", "--title", "title"])
+        assert "infra_event_notifier.cli.datadog" in loaded
+        assert not loaded & set(HTTP_MODULES)
+
+    @patch("infra_event_notifier.backends.datadog.send_event")
+    def test_send_via_daemon(
+        self,
+        send_event: MagicMock,
+        daemon: NotifierDaemon,
+        tmp_path: pathlib.Path,
+    ):
+        loaded = _hook_modules(
+            [
+                "datadog",
+                "--title",
+                "title",
+                "--socket",
+                daemon.socket_path,
+                "--spool",
+                str(tmp_path / "spool"),
+            ]
+        )
+        daemon.sender.flush(timeout=5)
+        send_event.assert_called_once()
+        assert "infra_event_notifier.daemon" in loaded
+        assert not loaded & set(HTTP_MODULES)
+
+    def test_import_time_budget(
+        self, slice_dir: pathlib.Path, region_map: pathlib.Path
+    ):
+        argv = _terragrunt_dry_run(region_map)
+        # -X importtime leaves out modules loaded by importlib.import_module()
+        # rather than an import statement, such as the subcommand main loads.
+        module = COMMANDS["terragrunt"][0]
+        # Best of a few runs, to keep a busy machine from failing the test.
+        best = min(
+            _package_import_us(
+                _run_hook(
+                    argv,
+                    "-X",
+                    "importtime",
+                    cwd=str(slice_dir),
+                    preamble=f"import {module}\n",
+                )
+            )
+            for _ in range(3)
+        )
+        assert 0 < best < IMPORT_TIME_BUDGET_US
@@ -1,3 +1,4 @@
+from infra_event_notifier.daemon import default_socket_path
 from infra_event_notifier.main import parse_args
 
 
@@ -26,3 +27,15 @@ class TestCLI:
         example = ["terragrunt", "--cli-args=foo", "--region-map=foo"]
         args = parse_args(example)
         assert not args.dry_run
+
+    def test_parse_timings(self):
+        for example in (["--timings", "datadog"], ["datadog", "--timings"]):
+            args = parse_args(example)
+            assert args.timings
+            assert not args.statsd
+        assert not parse_args(["datadog"]).timings
+
+    def test_parse_socket_defaults_to_serve(self):
+        # Clients find a daemon started without --socket by default.
+        for command in ("datadog", "serve"):
+            assert parse_args([command]).socket == default_socket_path()
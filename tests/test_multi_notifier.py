@@ -0,0 +1,49 @@
+import threading
+from unittest.mock import MagicMock
+
+from infra_event_notifier.backends.jira import IssueType
+from infra_event_notifier.multi_notifier import MultiNotifier
+
+
+class TestMultiNotifier:
+    def test_sends_to_all_backends(self) -> None:
+        datadog, slack, jira = MagicMock(), MagicMock(), MagicMock()
+        notifier = MultiNotifier(datadog=datadog, slack=slack, jira=jira)
+
+        results = notifier.send(
+            "title", "body", {"foo": "bar"}, "info", IssueType.BUG
+        )
+
+        assert results == {"datadog": None, "slack": None, "jira": None}
+        datadog.send.assert_called_once_with(
+            "title", "body", {"foo": "bar"}, "info"
+        )
+        slack.send.assert_called_once_with("title", "body")
+        jira.send.assert_called_once_with(
+            "title", "body", IssueType.BUG, {"foo": "bar"}, None, False
+        )
+
+    def test_failure_is_isolated(self) -> None:
+        datadog, slack = MagicMock(), MagicMock()
+        datadog.send.side_effect = ValueError("boom")
+        notifier = MultiNotifier(datadog=datadog, slack=slack)
+
+        results = notifier.send("title", "body")
+
+        assert isinstance(results["datadog"], ValueError)
+        assert results["slack"] is None
+        assert "jira" not in results
+
+    def test_sends_concurrently(self) -> None:
+        # Each backend waits for the others to start, which only works if
+        # they run at the same time.
+        barrier = threading.Barrier(3, timeout=5)
+        backends = [MagicMock() for _ in range(3)]
+        for backend in backends:
+            backend.send.side_effect = lambda *args: barrier.wait()
+        datadog, slack, jira = backends
+        notifier = MultiNotifier(datadog=datadog, slack=slack, jira=jira)
+
+        results = notifier.send("title", "body")
+
+        assert results == {"datadog": None, "slack": None, "jira": None}
@@ -0,0 +1,159 @@
+import os
+import pathlib
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from infra_event_notifier.spool import Spool, SpoolBusy, replay
+
+EVENT = {
+    "title": "title",
+    "text": "text",
+    "tags": {"foo": "bar"},
+    "alert_type": "info",
+}
+
+
+@pytest.fixture
+def spool(tmp_path: pathlib.Path) -> Spool:
+    return Spool(str(tmp_path / "state" / "spool"))
+
+
+class TestSpool:
+    def test_append_and_ack(self, spool: Spool) -> None:
+        first = spool.append(EVENT)
+        second = spool.append({**EVENT, "title": "other"})
+        spool.ack(first)
+        assert spool.pending() == [(second, {**EVENT, "title": "other"})]
+        spool.ack(second)
+        assert spool.pending() == []
+        # Acking the last pending event empties the file.
+        assert os.path.getsize(spool.path) == 0
+
+    def test_refuses_api_keys(self, spool: Spool) -> None:
+        with pytest.raises(AssertionError):
+            spool.append({**EVENT, "datadog_api_key": "secret"})
+
+    def test_file_is_private(self, spool: Spool) -> None:
+        spool.append(EVENT)
+        assert os.stat(spool.path).st_mode & 0o777 == 0o600
+
+    def test_torn_record(self, spool: Spool) -> None:
+        kept = spool.append(EVENT)
+        spool.append({**EVENT, "title": "torn"})
+        # Simulate a crash in the middle of writing the second record.
+        size = os.path.getsize(spool.path)
+        os.truncate(spool.path, size - 5)
+        assert spool.pending() == [(kept, EVENT)]
+        # A new record is not swallowed by the torn one.
+        added = spool.append({**EVENT, "title": "new"})
+        assert [entry_id for entry_id, _ in spool.pending()] == [kept, added]
+
+    def test_append_reads_only_last_record(
+        self, spool: Spool, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        first = spool.append(EVENT)
+        spool.append(EVENT)
+        read_records = MagicMock(side_effect=AssertionError("full read"))
+        monkeypatch.setattr(
+            "infra_event_notifier.spool._read_records", read_records
+        )
+        spool.append(EVENT)
+        spool.ack(first)
+        monkeypatch.undo()
+        assert len(spool.pending()) == 2
+
+    def test_concurrent_appends(self, spool: Spool) -> None:
+        threads = [
+            threading.Thread(target=spool.append, args=(EVENT,))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(spool.pending()) == 20
+
+    def test_compact(self, spool: Spool) -> None:
+        entry_ids = [
+            spool.append({**EVENT, "title": str(i)}) for i in range(5)
+        ]
+        for entry_id in entry_ids[:4]:
+            spool.ack(entry_id)
+        size = os.path.getsize(spool.path)
+        spool.compact()
+        assert os.path.getsize(spool.path) < size
+        assert spool.pending() == [(entry_ids[4], {**EVENT, "title": "4"})]
+
+
+class TestReplay:
+    def test_replay(self, spool: Spool) -> None:
+        spool.append(EVENT)
+        spool.append({**EVENT, "title": "fails"})
+        spool.append({**EVENT, "title": "other"})
+
+        def send(**kwargs) -> None:
+            if kwargs["title"] == "fails":
+                raise ConnectionRefusedError()
+
+        assert replay(spool, send) == (2, 1)
+        assert [kwargs["title"] for _, kwargs in spool.pending()] == ["fails"]
+
+    def test_dedup(self, spool: Spool) -> None:
+        for _ in range(3):
+            spool.append(EVENT)
+        send = MagicMock()
+        assert replay(spool, send) == (3, 0)
+        send.assert_called_once_with(**EVENT)
+        assert spool.pending() == []
+
+    def test_ack_failure(
+        self,
+        spool: Spool,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        spool.append(EVENT)
+        spool.append({**EVENT, "title": "other"})
+        monkeypatch.setattr(
+            Spool, "ack", MagicMock(side_effect=OSError("disk full"))
+        )
+        send = MagicMock()
+        # Both events were sent, so neither counts as left.
+        assert replay(spool, send) == (2, 0)
+        assert send.call_count == 2
+        assert "disk full" in capsys.readouterr().err
+
+    def test_waits_for_in_flight(self, spool: Spool) -> None:
+        in_flight = spool.in_flight()
+        entry_id = spool.append(EVENT)
+        send = MagicMock()
+        thread = threading.Thread(target=replay, args=(spool, send))
+        thread.start()
+        thread.join(0.2)
+        # The event is being sent by whoever spooled it.
+        assert thread.is_alive()
+        spool.ack(entry_id)
+        in_flight.release()
+        thread.join(5)
+        send.assert_not_called()
+
+    def test_busy(self, spool: Spool) -> None:
+        spool.append(EVENT)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_send(**kwargs) -> None:
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=replay, args=(spool, slow_send))
+        thread.start()
+        started.wait(5)
+        try:
+            with pytest.raises(SpoolBusy):
+                replay(spool, MagicMock())
+        finally:
+            release.set()
+            thread.join()